@@ -1,7 +1,9 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from .config import settings
 
 # Create SQLAlchemy engine
@@ -15,6 +17,50 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derive the asyncio driver URL from a sync database URL.
+
+    Args:
+        database_url: SQLAlchemy URL using a sync driver (e.g. psycopg2)
+
+    Returns:
+        str: The same URL pointing at the asyncio driver (asyncpg/aiosqlite)
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Create asyncio engine used by the non-blocking request paths
+async_database_url = settings.async_database_url or get_async_database_url(settings.database_url)
+async_pool_options = {}
+if make_url(async_database_url).get_backend_name() != "sqlite":
+    async_pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow
+    }
+
+async_engine = create_async_engine(
+    async_database_url,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=settings.debug,
+    **async_pool_options
+)
+
+# Create AsyncSessionLocal class
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -31,6 +77,11 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def create_tables():
-    """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an asyncio database session.
+    Yields an AsyncSession so queries don't block the event loop,
+    and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
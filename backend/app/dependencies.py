@@ -0,0 +1,68 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_async_db
+from .models.user import User
+from .utils.auth import verify_token
+from .utils.principals import Principal, principal_cache
+from .utils.revocation import revocation_store
+
+# Security
+security = HTTPBearer()
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Dependency to get current authenticated user.
+
+    Resolves the principal from the cache when possible; the database is
+    only queried (and a connection only checked out) on a cache miss.
+    """
+    token = credentials.credentials
+    payload = verify_token(token)
+    
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if await revocation_store.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_id = payload.get("user_id")
+    principal = await principal_cache.get(user_id) if user_id is not None else None
+    
+    if principal is None:
+        if user_id is not None:
+            query = select(User).where(User.id == user_id)
+        else:
+            query = select(User).where(User.email == payload.get("sub"))
+        result = await db.execute(query)
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal.from_user(user)
+        await principal_cache.set(principal)
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return principal
@@ -1,21 +1,37 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
-import uvicorn
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from sqlalchemy.orm import Session
+import asyncio
 
 from .config import settings
-from .database import create_tables, get_db
+from .database import engine
+from .dependencies import get_current_user
+from .migrate import check_revision
 from .routes import auth, users, medicines, family, health
-from .utils.auth import verify_token
-from .models.user import User
-
-# Initialize Sentry for error tracking
-if settings.sentry_dsn:
+from .utils.auth import HashingPoolSaturated, password_hash_pool, token_cache
+from .utils.principals import principal_cache
+from .utils.revocation import revocation_store
+from .utils.smtp import close_smtp_pool, get_smtp_pool
+from .services.device_tokens import device_token_registry
+from .services.emergency import emergency_lane
+from .services.outbox import outbox_worker
+from .services.partitions import partition_maintainer
+from .services.reminder_dispatch import reminder_dispatcher
+from .services.reminder_scheduler import reminder_scheduler, run_scheduler
+
+
+def init_sentry() -> None:
+    """
+    Initialize Sentry for error tracking.
+    Called at server startup rather than import so CLI tools, tests and
+    migrations that import the app do not load the SDK.
+    """
+    if not settings.sentry_dsn:
+        return
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
         integrations=[
@@ -26,6 +42,7 @@ if settings.sentry_dsn:
         environment="development" if settings.debug else "production"
     )
 
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -44,51 +61,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Security
-security = HTTPBearer()
-
-
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Dependency to get current authenticated user.
-    """
-    token = credentials.credentials
-    payload = verify_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = db.query(User).filter(User.email == payload.get("sub")).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    
-    return user
-
 
 @app.on_event("startup")
 async def startup_event():
     """
     Application startup event.
-    Create database tables if they don't exist.
+    Refuse to start unless the database is at the latest migration.
     """
-    create_tables()
+    init_sentry()
+    check_revision(engine)
+    app.state.revocation_sync = asyncio.create_task(revocation_store.run_sync_loop())
+    app.state.emergency_lane = asyncio.create_task(emergency_lane.run())
+    if settings.reminder_scheduler_enabled:
+        app.state.reminder_scheduler = asyncio.create_task(
+            run_scheduler(handler=reminder_dispatcher.dispatch)
+        )
+    if settings.outbox_worker_enabled:
+        app.state.outbox_worker = asyncio.create_task(outbox_worker.run())
+    if settings.partition_maintenance_enabled:
+        app.state.partition_maintenance = asyncio.create_task(partition_maintainer.run())
     print(f"🚀 {settings.app_name} v{settings.app_version} is starting up...")
 
 
@@ -97,6 +88,15 @@ async def shutdown_event():
     """
     Application shutdown event.
     """
+    password_hash_pool.shutdown()
+    for task_name in (
+        "revocation_sync", "emergency_lane", "reminder_scheduler", "outbox_worker", "partition_maintenance"
+    ):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    emergency_lane.shutdown()
+    await close_smtp_pool()
     print(f"🛑 {settings.app_name} is shutting down...")
 
 
@@ -125,6 +125,41 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Runtime metrics for monitoring.
+    """
+    return {
+        "password_hashing": password_hash_pool.stats(),
+        "token_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_revocation": revocation_store.stats(),
+        "reminder_scheduler": reminder_scheduler.stats(),
+        "reminder_dispatch": reminder_dispatcher.stats(),
+        "notification_outbox": outbox_worker.stats(),
+        "device_tokens": device_token_registry.stats(),
+        "emergency_alerts": emergency_lane.stats(),
+        "partitions": partition_maintainer.stats(),
+        "smtp": get_smtp_pool().stats() if settings.smtp_host else None
+    }
+
+
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated_handler(request, exc):
+    """
+    Shed load quickly when the password hashing pool is full.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Server busy, please retry shortly",
+            "type": "service_unavailable"
+        },
+        headers={"Retry-After": "1"}
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """
@@ -179,6 +214,8 @@ app.include_router(
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
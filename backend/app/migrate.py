@@ -0,0 +1,139 @@
+"""
+Database migrations.
+
+Alembic revisions in ``migrations/`` are the source of truth for the schema.
+Run them with this entry point before starting (or after deploying) the API:
+
+    python -m app.migrate upgrade          # to the latest revision
+    python -m app.migrate check            # exit 1 unless the database is current
+    python -m app.migrate current
+"""
+from pathlib import Path
+from typing import Optional, Tuple
+import argparse
+import sys
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from .config import settings
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    """The database is not at the revision this code was written for."""
+
+
+def alembic_config(url: Optional[str] = None):
+    """
+    Build the Alembic config for this project.
+
+    Args:
+        url: Database URL (defaults to DATABASE_URL)
+
+    Returns:
+        alembic.config.Config
+    """
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    if url:
+        config.attributes["url"] = url
+    return config
+
+
+def head_revision() -> str:
+    """Latest revision among the migration scripts (read from disk, no database access)."""
+    from alembic.script import ScriptDirectory
+
+    heads = ScriptDirectory.from_config(alembic_config()).get_heads()
+    if len(heads) != 1:
+        raise SchemaRevisionMismatch(f"Migrations have {len(heads)} heads; merge them first")
+    return heads[0]
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """
+    Revision recorded in the database, with a single query.
+
+    Returns:
+        str or None when the database has never been migrated
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None  # no alembic_version table yet
+
+
+def check_revision(engine: Engine) -> Tuple[Optional[str], str]:
+    """
+    Fail fast unless the database is at the head revision.
+
+    Args:
+        engine: Engine for the application database
+
+    Returns:
+        tuple: (database revision, head revision) when they match
+
+    Raises:
+        SchemaRevisionMismatch: If the database is behind, ahead or unmigrated
+    """
+    current, head = current_revision(engine), head_revision()
+    if current != head:
+        raise SchemaRevisionMismatch(
+            f"Database schema is at revision {current or 'none'} but the code expects {head}; "
+            f"run `python -m app.migrate upgrade`"
+        )
+    return current, head
+
+
+def upgrade(revision: str = "head", url: Optional[str] = None) -> None:
+    """Apply migrations up to ``revision``."""
+    from alembic import command
+
+    command.upgrade(alembic_config(url), revision)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="database URL (defaults to DATABASE_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply migrations")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+    downgrade_parser = commands.add_parser("downgrade", help="revert migrations")
+    downgrade_parser.add_argument("revision")
+    commands.add_parser("check", help="exit 1 unless the database is at the head revision")
+    commands.add_parser("current", help="print the database revision")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        upgrade(args.revision, args.url)
+        return 0
+    if args.command == "downgrade":
+        from alembic import command
+
+        command.downgrade(alembic_config(args.url), args.revision)
+        return 0
+
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.url or settings.database_url)
+    try:
+        if args.command == "current":
+            print(current_revision(engine) or "none")
+            return 0
+        try:
+            check_revision(engine)
+        except SchemaRevisionMismatch as e:
+            print(e, file=sys.stderr)
+            return 1
+        print("Database schema is up to date")
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
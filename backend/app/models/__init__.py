@@ -1,7 +1,8 @@
 from .user import User, UserProfile
 from .medicine import Medicine, MedicineReminder, MedicineLog
 from .family import FamilyConnection, FamilyMessage
-from .health import HealthRecord, VitalSigns
+from .health import HealthRecord, VitalSigns, VitalThreshold, VitalRollupHourly, VitalRollupDaily
+from .notification import NotificationOutbox, NotificationDedupKey, DeviceToken
 
 __all__ = [
     "User",
@@ -12,5 +13,11 @@ __all__ = [
     "FamilyConnection",
     "FamilyMessage", 
     "HealthRecord",
-    "VitalSigns"
+    "VitalSigns",
+    "VitalThreshold",
+    "VitalRollupHourly",
+    "VitalRollupDaily",
+    "NotificationOutbox",
+    "NotificationDedupKey",
+    "DeviceToken"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -23,6 +23,12 @@ class FamilyConnection(Base):
     elder = relationship("User", foreign_keys=[elder_id], back_populates="family_connections_as_elder")
     caregiver = relationship("User", foreign_keys=[caregiver_id], back_populates="family_connections_as_caregiver")
 
+    __table_args__ = (
+        # elders a caregiver looks after / an elder's caregivers, by status
+        Index("ix_family_connections_caregiver_status", "caregiver_id", "status"),
+        Index("ix_family_connections_elder_status", "elder_id", "status"),
+    )
+
 
 class FamilyMessage(Base):
     """Family message model for secure communication between family members."""
@@ -46,4 +52,10 @@ class FamilyMessage(Base):
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
-    reply_to = relationship("FamilyMessage", remote_side=[id])
\ No newline at end of file
+    reply_to = relationship("FamilyMessage", remote_side=[id])
+
+    __table_args__ = (
+        # inbox and unread badge, newest first
+        Index("ix_family_messages_receiver_unread", "receiver_id", "is_read", "created_at"),
+        Index("ix_family_messages_receiver_created", "receiver_id", "created_at"),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, Float, Date, PrimaryKeyConstraint
+from sqlalchemy.orm import declared_attr, relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -29,6 +29,10 @@ class HealthRecord(Base):
     # Relationships
     user = relationship("User", back_populates="health_records")
 
+    __table_args__ = (
+        Index("ix_health_records_user_recorded", "user_id", "date_recorded"),
+    )
+
 
 class VitalSigns(Base):
     """Vital signs model for tracking health measurements."""
@@ -46,19 +50,19 @@ class VitalSigns(Base):
     heart_rate = Column(Integer)  # bpm
     
     # Temperature
-    temperature = Column(Float)  # Celsius
+    temperature = Column(Float)  # in temperature_unit
     temperature_unit = Column(String(1), default="C")  # C or F
     
     # Weight and BMI
-    weight = Column(Float)  # kg
+    weight = Column(Float)  # in weight_unit
     weight_unit = Column(String(2), default="kg")  # kg or lb
-    height = Column(Float)  # cm
+    height = Column(Float)  # in height_unit
     height_unit = Column(String(2), default="cm")  # cm or in
-    bmi = Column(Float)
+    bmi = Column(Float)  # from weight_kg and height_cm when both are measured
     
     # Blood glucose
-    blood_glucose = Column(Float)  # mg/dL
-    glucose_unit = Column(String(5), default="mg/dL")  # mg/dL or mmol/L
+    blood_glucose = Column(Float)  # in glucose_unit
+    glucose_unit = Column(String(10), default="mg/dL")  # mg/dL or mmol/L
     glucose_time_relation = Column(String(20))  # fasting, before_meal, after_meal, bedtime
     
     # Oxygen saturation
@@ -68,13 +72,75 @@ class VitalSigns(Base):
     respiratory_rate = Column(Integer)  # breaths per minute
     blood_pressure_medication_taken = Column(Boolean, default=False)
     
+    # Canonical units, written server-side from the measured values and units
+    temperature_c = Column(Float)
+    weight_kg = Column(Float)
+    height_cm = Column(Float)
+    glucose_mg_dl = Column(Float)
+    
     # Metadata
     measurement_method = Column(String(50))  # manual, device, estimated
     device_name = Column(String(100))
     notes = Column(Text)
     is_flagged = Column(Boolean, default=False)  # flagged for abnormal values
+    flag_reason = Column(String(255))  # which values crossed which thresholds
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="vital_signs")
\ No newline at end of file
+    user = relationship("User", back_populates="vital_signs")
+
+    # On Postgres the table is partitioned by month on measurement_date (migration 0005,
+    # app.services.partitions), so its primary key there is (id, measurement_date).
+    __table_args__ = (
+        # a user's readings over a time window (latest, trends, exports)
+        Index("ix_vital_signs_user_measurement", "user_id", "measurement_date"),
+        # a device reading is stored once, however often the device resyncs it
+        Index("uq_vital_signs_user_device_measurement", "user_id", "device_name", "measurement_date", unique=True),
+    )
+
+
+class VitalThreshold(Base):
+    """Per-user override of the abnormal-value thresholds for one metric (canonical units)."""
+    __tablename__ = "vital_thresholds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    metric = Column(String(30), nullable=False)  # VitalSigns column, e.g. "blood_glucose"
+    low = Column(Float)  # flag values below; None keeps the default
+    high = Column(Float)  # flag values above; None keeps the default
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("uq_vital_thresholds_user_metric", "user_id", "metric", unique=True),
+    )
+
+
+class VitalRollup:
+    """Aggregates of one metric of a user's vital signs over a UTC time bucket."""
+    __table_args__ = (
+        # a user's trend for one metric over a time window
+        PrimaryKeyConstraint("user_id", "metric", "bucket_start"),
+    )
+
+    @declared_attr
+    def user_id(cls):
+        return Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    metric = Column(String(30), nullable=False)  # VitalSigns column, e.g. "systolic_bp"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)  # mean = value_sum / sample_count
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+
+
+class VitalRollupHourly(VitalRollup, Base):
+    """Hourly vital signs aggregates."""
+    __tablename__ = "vital_rollups_hourly"
+
+
+class VitalRollupDaily(VitalRollup, Base):
+    """Daily vital signs aggregates."""
+    __tablename__ = "vital_rollups_daily"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, Time
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index, Float, Time
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -32,6 +32,10 @@ class Medicine(Base):
     reminders = relationship("MedicineReminder", back_populates="medicine")
     logs = relationship("MedicineLog", back_populates="medicine")
 
+    __table_args__ = (
+        Index("ix_medicines_user_created", "user_id", "created_at"),
+    )
+
 
 class MedicineReminder(Base):
     """Medicine reminder model for scheduling medication alerts."""
@@ -54,6 +58,10 @@ class MedicineReminder(Base):
     user = relationship("User", back_populates="medicine_reminders")
     medicine = relationship("Medicine", back_populates="reminders")
 
+    __table_args__ = (
+        Index("ix_medicine_reminders_user_created", "user_id", "created_at"),
+    )
+
 
 class MedicineLog(Base):
     """Medicine log model for tracking medication intake."""
@@ -75,4 +83,11 @@ class MedicineLog(Base):
 
     # Relationships
     user = relationship("User", back_populates="medicine_logs")
-    medicine = relationship("Medicine", back_populates="logs")
\ No newline at end of file
+    medicine = relationship("Medicine", back_populates="logs")
+
+    # On Postgres the table is partitioned by month on scheduled_time (migration 0005,
+    # app.services.partitions), so its primary key there is (id, scheduled_time).
+    __table_args__ = (
+        # a user's doses over a time window (history, adherence)
+        Index("ix_medicine_logs_user_scheduled", "user_id", "scheduled_time"),
+    )
\ No newline at end of file
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class NotificationOutbox(Base):
+    """Outbox of notifications written in the same transaction as the change that triggers them."""
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String(20), nullable=False)  # push, email
+    recipient_user_id = Column(Integer, ForeignKey("users.id"))
+    payload = Column(Text, nullable=False)  # JSON: title/body/data for push, to_email/subject/body for email
+    dedup_key = Column(String(200), index=True)  # same key is delivered at most once
+    status = Column(String(20), default="pending", nullable=False)  # pending, sent, failed, skipped
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text)
+    sent_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class NotificationDedupKey(Base):
+    """Claim on a dedup key by the outbox row allowed to deliver it."""
+    __tablename__ = "notification_dedup_keys"
+
+    dedup_key = Column(String(200), primary_key=True)
+    outbox_id = Column(Integer, ForeignKey("notification_outbox.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DeviceToken(Base):
+    """Push registration token for one of a user's devices."""
+    __tablename__ = "device_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token = Column(String(512), unique=True, nullable=False)
+    platform = Column(String(20))  # android, ios, web
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
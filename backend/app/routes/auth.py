@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models.user import User, UserProfile
 from ..schemas.auth import UserLogin, UserRegister, Token, UserResponse
-from ..utils.auth import verify_password, get_password_hash, create_access_token, create_refresh_token, verify_token
+from ..utils.auth import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    create_refresh_token,
+    verify_token
+)
+from ..utils.revocation import revocation_store
 from ..config import settings
 
 router = APIRouter()
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(token: str, db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str, db: AsyncSession = Depends(get_async_db)) -> User:
     """Get current user from JWT token."""
     payload = verify_token(token)
     if payload is None:
@@ -21,7 +32,8 @@ async def get_current_user(token: str, db: Session = Depends(get_db)) -> User:
             detail="Invalid authentication credentials",
         )
     
-    user = db.query(User).filter(User.email == payload.get("sub")).first()
+    result = await db.execute(select(User).where(User.email == payload.get("sub")))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,12 +44,13 @@ async def get_current_user(token: str, db: Session = Depends(get_db)) -> User:
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -45,7 +58,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -53,8 +66,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
     
     # Create user profile
     user_profile = UserProfile(
@@ -65,20 +77,22 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
     
     db.add(user_profile)
-    db.commit()
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return access token.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    result = await db.execute(select(User).where(User.email == user_credentials.email))
+    user = result.scalars().first()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -112,20 +126,25 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_async_db)):
     """
     Refresh access token using refresh token.
     """
     payload = verify_token(refresh_token)
     
-    if payload is None or payload.get("type") != "refresh":
+    if (
+        payload is None
+        or payload.get("type") != "refresh"
+        or await revocation_store.is_revoked(payload.get("jti"))
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == payload.get("sub")).first()
+    result = await db.execute(select(User).where(User.email == payload.get("sub")))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,6 +158,10 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         expires_delta=access_token_expires
     )
     
+    # Rotate: the presented refresh token can't be used again
+    if payload.get("jti"):
+        await revocation_store.revoke(payload["jti"], payload["exp"])
+    
     # Create new refresh token
     new_refresh_token = create_refresh_token(
         data={"sub": user.email, "user_id": user.id}
@@ -164,8 +187,21 @@ async def get_current_user_info(db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    refresh_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
     """
-    Logout user (client should remove token).
+    Logout user by revoking the bearer access token and, if given, the refresh token.
+    Revoked tokens stay on the denylist until they expire.
     """
+    tokens = [refresh_token]
+    if credentials is not None:
+        tokens.append(credentials.credentials)
+    
+    for token in tokens:
+        payload = verify_token(token) if token else None
+        if payload and payload.get("jti"):
+            await revocation_store.revoke(payload["jti"], payload["exp"])
+    
     return {"message": "Successfully logged out"}
\ No newline at end of file
@@ -1,9 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import uuid
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_async_db, get_db
+from ..dependencies import get_current_user
 from ..models.family import FamilyConnection, FamilyMessage
+from ..models.user import User
+from ..schemas.family import EmergencyAlertCreate, FamilyMessageCreate, FamilyMessageResponse
+from ..schemas.pagination import Page
+from ..services.emergency import emergency_lane
+from ..services.outbox import enqueue_push
+from ..utils.attachment_crypto import EncryptedAttachmentReader, StreamEncryptor
+from ..utils.pagination import PageParams, page_params, paginate
+from ..utils.principals import Principal
+from ..utils.security import conversation_key_id, decrypt_messages, encrypt_message
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -20,13 +42,271 @@ async def create_family_connection(db: Session = Depends(get_db)):
     return {"message": "Create family connection endpoint"}
 
 
-@router.get("/messages")
-async def get_family_messages(db: Session = Depends(get_db)):
-    """Get family messages."""
-    return {"message": "Get family messages endpoint"}
+@router.post("/emergency", status_code=status.HTTP_202_ACCEPTED)
+async def raise_emergency_alert(
+    alert: EmergencyAlertCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Alert the current user's emergency contacts.
+    The alert is recorded in the notification outbox before it is acknowledged,
+    then pushed from the emergency lane.
+    """
+    alert_id = await emergency_lane.trigger(db, current_user.id, alert.emergency_type, alert.details or "")
+    return {"alert_id": alert_id, "message": "Emergency contacts are being alerted"}
+
+
+@router.get("/messages", response_model=Page[FamilyMessageResponse])
+async def get_family_messages(
+    unread_only: bool = False,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get family messages received by the current user, newest first.
+    Encrypted contents of the page are decrypted in one batch.
+    """
+    stmt = select(FamilyMessage).where(FamilyMessage.receiver_id == current_user.id)
+    if unread_only:
+        stmt = stmt.where(FamilyMessage.is_read.is_(False))
+    messages, next_cursor = await paginate(db, stmt, FamilyMessage.created_at, FamilyMessage.id, page)
+    
+    encrypted = [m for m in messages if m.is_encrypted]
+    results = await run_in_threadpool(decrypt_messages, [load_envelope(m.content) for m in encrypted])
+    plaintext = {}
+    for message, result in zip(encrypted, results):
+        if result.plaintext is None:
+            logger.warning(f"Could not decrypt family message {message.id}: {result.error}")
+        plaintext[message.id] = result.plaintext
+    
+    items = []
+    for message in messages:
+        item = FamilyMessageResponse.model_validate(message)
+        if message.is_encrypted:
+            item.content = plaintext[message.id] or ""
+            if plaintext[message.id] is None:
+                item.decryption_error = "Message could not be decrypted"
+        items.append(item)
+    return Page[FamilyMessageResponse](items=items, next_cursor=next_cursor)
+
+
+@router.post("/messages", response_model=FamilyMessageResponse, status_code=status.HTTP_201_CREATED)
+async def send_family_message(
+    message_data: FamilyMessageCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send family message to a user the sender has an accepted family connection with.
+    The content is stored encrypted with the conversation's data key, and the
+    receiver's push notification is queued in the outbox in the same transaction.
+    """
+    receiver = await db.get(User, message_data.receiver_id)
+    if not receiver or not receiver.is_active or not await is_connected(db, current_user.id, receiver.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Receiver not found"
+        )
+    
+    encrypted = encrypt_message(
+        message_data.content,
+        key_id=conversation_key_id(current_user.id, receiver.id)
+    )
+    message = FamilyMessage(
+        sender_id=current_user.id,
+        receiver_id=receiver.id,
+        subject=message_data.subject,
+        content=json.dumps(encrypted),
+        message_type=message_data.message_type,
+        priority=message_data.priority,
+        is_encrypted=True,
+        reply_to_message_id=message_data.reply_to_message_id
+    )
+    db.add(message)
+    await db.flush()
+    
+    enqueue_push(
+        db,
+        recipient_user_id=receiver.id,
+        title=message_data.subject or "New family message",
+        body="You have a new message",
+        data={"message_id": str(message.id), "action": "open_message"},
+        notification_type="family_message",
+        dedup_key=f"family_message:{message.id}"
+    )
+    await db.commit()
+    await db.refresh(message)
+    
+    response = FamilyMessageResponse.model_validate(message)
+    response.content = message_data.content
+    return response
+
+
+async def is_connected(db: AsyncSession, user_id: int, other_id: int) -> bool:
+    """Whether two users have an accepted family connection, in either direction."""
+    result = await db.execute(
+        select(FamilyConnection.id).where(
+            FamilyConnection.status == "accepted",
+            or_(
+                and_(FamilyConnection.elder_id == user_id, FamilyConnection.caregiver_id == other_id),
+                and_(FamilyConnection.elder_id == other_id, FamilyConnection.caregiver_id == user_id)
+            )
+        ).limit(1)
+    )
+    return result.first() is not None
+
+
+def load_envelope(content: str) -> dict:
+    """Parse stored message content; malformed content decrypts as an error."""
+    try:
+        return json.loads(content)
+    except ValueError:
+        return {}
+
+
+def attachment_path(message_id: int) -> str:
+    """Storage path of a message's encrypted attachment."""
+    return os.path.join(settings.attachment_storage_dir, f"message-{message_id}.enc")
+
+
+async def get_participant_message(
+    message_id: int,
+    current_user: Principal,
+    db: AsyncSession
+) -> FamilyMessage:
+    """Load a message the current user sent or received, or raise 404."""
+    result = await db.execute(select(FamilyMessage).where(FamilyMessage.id == message_id))
+    message = result.scalars().first()
+    if not message or current_user.id not in (message.sender_id, message.receiver_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found"
+        )
+    return message
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=...`` header.
+    
+    Returns:
+        tuple: (start, end) with end exclusive, or None to send the whole file
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    else:
+        start, end = max(0, size - int(last)), size
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.put("/messages/{message_id}/attachment", status_code=status.HTTP_201_CREATED)
+async def upload_message_attachment(
+    message_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload a message attachment as a streaming request body.
+    The body is encrypted chunk by chunk as it arrives, so memory use doesn't
+    grow with the file size.
+    """
+    message = await get_participant_message(message_id, current_user, db)
+    if message.sender_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the sender can attach files"
+        )
+    
+    os.makedirs(settings.attachment_storage_dir, exist_ok=True)
+    final_path = attachment_path(message_id)
+    temp_path = f"{final_path}.{uuid.uuid4().hex}.part"
+    encryptor = StreamEncryptor(chunk_size=settings.attachment_chunk_size)
+    received = 0
+    
+    out = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        async for piece in request.stream():
+            received += len(piece)
+            if received > settings.attachment_max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Attachment too large"
+                )
+            ciphertext = encryptor.update(piece)
+            if ciphertext:
+                await run_in_threadpool(out.write, ciphertext)
+        await run_in_threadpool(out.write, encryptor.finalize())
+        await run_in_threadpool(out.close)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        out.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    message.attachment_url = f"/api/v1/family/messages/{message_id}/attachment"
+    await db.commit()
+    
+    return {"attachment_url": message.attachment_url, "size": received}
 
 
-@router.post("/messages")
-async def send_family_message(db: Session = Depends(get_db)):
-    """Send family message."""
-    return {"message": "Send family message endpoint"}
\ No newline at end of file
+@router.get("/messages/{message_id}/attachment")
+async def download_message_attachment(
+    message_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Download a message attachment as a streaming, decrypted response body.
+    Single byte ranges are supported and only decrypt the chunks they cover.
+    """
+    await get_participant_message(message_id, current_user, db)
+    path = attachment_path(message_id)
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment not found"
+        )
+    
+    fileobj = open(path, "rb")
+    try:
+        reader = EncryptedAttachmentReader(fileobj)
+        byte_range = parse_range(request.headers.get("range"), reader.size)
+    except BaseException:
+        fileobj.close()
+        raise
+    
+    start, end = byte_range or (0, reader.size)
+    
+    def body() -> Iterator[bytes]:
+        try:
+            yield from reader.iter_range(start, end)
+        finally:
+            fileobj.close()
+    
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+    status_code = status.HTTP_200_OK
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{reader.size}"
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+    
+    return StreamingResponse(
+        body(),
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers
+    )
@@ -1,17 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from ..database import get_db
-from ..models.health import HealthRecord, VitalSigns
+from ..config import settings
+from ..database import get_async_db, get_db
+from ..dependencies import get_current_user
+from ..models.health import HealthRecord, VitalSigns, VitalThreshold
+from ..schemas.health import VitalSignsBulkResult, VitalSignsCreate, HealthRecordResponse, VitalSignsResponse
+from ..schemas.health import VitalMetric, VitalTrendResponse
+from ..schemas.health import ThresholdMetric, VitalThresholdResponse, VitalThresholdUpdate
+from ..schemas.pagination import Page
+from ..services.export import EXPORT_TABLES, MEDIA_TYPES, export_history
+from ..services.flags import METRIC_UNITS, UNIT_COLUMNS, Threshold, flag_engine, load_overrides
+from ..services.rollups import trend
+from ..services.vitals import create_vital, insert_vitals
+from ..utils.pagination import PageParams, page_params, paginate
+from ..utils.principals import Principal
+from ..utils.units import is_known_unit, to_canonical
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+vital_signs_list = TypeAdapter(List[VitalSignsCreate])
 
-@router.get("/records")
-async def get_health_records(db: Session = Depends(get_db)):
-    """Get health records."""
-    return {"message": "Get health records endpoint"}
+
+def too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {settings.vitals_bulk_max_rows} readings per upload"
+    )
+
+
+async def read_ndjson_vitals(request: Request) -> List[VitalSignsCreate]:
+    """
+    Validate an NDJSON body line by line as it streams in.
+
+    Returns:
+        list: Validated readings
+
+    Raises:
+        RequestValidationError: With every invalid line, located as ("body", line number, field)
+        HTTPException: 413 once the upload passes vitals_bulk_max_rows
+    """
+    readings, errors = [], []
+    line_no = 0
+    buffer = b""
+
+    def parse(line: bytes) -> None:
+        nonlocal line_no
+        line_no += 1
+        if not line.strip():
+            return
+        if len(readings) + len(errors) >= settings.vitals_bulk_max_rows:
+            raise too_many_rows()
+        try:
+            readings.append(VitalSignsCreate.model_validate_json(line))
+        except ValidationError as e:
+            errors.extend(
+                {**error, "loc": ("body", line_no) + tuple(error["loc"])}
+                for error in e.errors(include_url=False)
+            )
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+    parse(buffer)
+
+    if errors:
+        raise RequestValidationError(errors)
+    return readings
+
+
+@router.get("/records", response_model=Page[HealthRecordResponse])
+async def get_health_records(
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get health records, most recent first."""
+    items, next_cursor = await paginate(
+        db,
+        select(HealthRecord).where(HealthRecord.user_id == current_user.id),
+        HealthRecord.date_recorded,
+        HealthRecord.id,
+        page
+    )
+    return Page[HealthRecordResponse](items=items, next_cursor=next_cursor)
 
 
 @router.post("/records")
@@ -20,13 +102,198 @@ async def create_health_record(db: Session = Depends(get_db)):
     return {"message": "Create health record endpoint"}
 
 
-@router.get("/vitals")
-async def get_vital_signs(db: Session = Depends(get_db)):
-    """Get vital signs."""
-    return {"message": "Get vital signs endpoint"}
+@router.get("/vitals", response_model=Page[VitalSignsResponse])
+async def get_vital_signs(
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get vital signs, most recent measurement first."""
+    items, next_cursor = await paginate(
+        db,
+        select(VitalSigns).where(VitalSigns.user_id == current_user.id),
+        VitalSigns.measurement_date,
+        VitalSigns.id,
+        page
+    )
+    return Page[VitalSignsResponse](items=items, next_cursor=next_cursor)
+
+
+@router.get("/vitals/trend", response_model=VitalTrendResponse)
+async def get_vital_trend(
+    metric: VitalMetric,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(settings.vitals_trend_points_default, ge=1, le=settings.vitals_trend_points_max),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a vital sign's trend (count, mean, min, max per bucket) from the rollups.
+    The resolution is the finest of hour and day that keeps the window within
+    ``max_points``; longer windows merge several days per point.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=settings.vitals_trend_window_days)
+    start, end = (value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (start, end))
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    resolution, bucket_seconds, points = await trend(db, current_user.id, metric, start, end, max_points)
+    return VitalTrendResponse(metric=metric, resolution=resolution, bucket_seconds=bucket_seconds, points=points)
+
+
+@router.post("/vitals", response_model=VitalSignsResponse, status_code=status.HTTP_201_CREATED)
+async def create_vital_signs(
+    reading: VitalSignsCreate,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a vital signs record; a device reading that was already stored is returned as is."""
+    vital, created = await create_vital(db, current_user.id, reading)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return vital
+
+
+@router.post("/vitals/bulk", response_model=VitalSignsBulkResult)
+async def bulk_create_vital_signs(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Store a batch of device readings in one transaction.
+    The body is either a JSON array of readings or NDJSON (one reading per
+    line, ``Content-Type: application/x-ndjson``). All readings are validated
+    before any is stored: one invalid reading rejects the upload with 422.
+    Readings already stored for the same device and measurement time are
+    counted as duplicates and skipped.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        readings = await read_ndjson_vitals(request)
+    else:
+        try:
+            readings = vital_signs_list.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body",) + tuple(error["loc"])} for error in e.errors(include_url=False)]
+            )
+        if len(readings) > settings.vitals_bulk_max_rows:
+            raise too_many_rows()
+
+    inserted = await insert_vitals(db, current_user.id, readings)
+    await db.commit()
+    return VitalSignsBulkResult(received=len(readings), inserted=inserted, duplicates=len(readings) - inserted)
+
+
+async def effective_thresholds(db: AsyncSession, user_id: int) -> List[VitalThresholdResponse]:
+    overrides = await load_overrides(db, [user_id])
+    own = overrides.get(user_id, {})
+    return [
+        VitalThresholdResponse(
+            metric=metric, low=threshold.low, high=threshold.high,
+            unit=METRIC_UNITS[metric], is_override=metric in own
+        )
+        for metric, threshold in flag_engine.thresholds(user_id, overrides).items()
+    ]
+
+
+@router.get("/thresholds", response_model=List[VitalThresholdResponse])
+async def get_vital_thresholds(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the thresholds the current user's readings are flagged against."""
+    return await effective_thresholds(db, current_user.id)
+
+
+@router.put("/thresholds/{metric}", response_model=List[VitalThresholdResponse])
+async def set_vital_threshold(
+    metric: ThresholdMetric,
+    threshold: VitalThresholdUpdate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Override one metric's thresholds for the current user (e.g. a diabetic's glucose target).
+    Bounds may be given in any supported unit and are stored in the canonical one.
+    New readings are flagged against them; stored readings on the next backfill.
+    """
+    low, high = threshold.low, threshold.high
+    if metric in UNIT_COLUMNS:
+        quantity = UNIT_COLUMNS[metric][1]
+        if not is_known_unit(quantity, threshold.unit):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported unit for {metric}: {threshold.unit}"
+            )
+        low, high = to_canonical(low, threshold.unit, quantity), to_canonical(high, threshold.unit, quantity)
+    elif threshold.unit not in (None, METRIC_UNITS[metric]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{metric} thresholds are in {METRIC_UNITS[metric]}"
+        )
+    # a one-sided override is merged with the other default bound
+    effective = flag_engine.thresholds(current_user.id, {current_user.id: {metric: Threshold(low, high)}})[metric]
+    if effective.low is not None and effective.high is not None and effective.low >= effective.high:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{metric} low ({effective.low:g}) must be below high ({effective.high:g} {METRIC_UNITS[metric]})"
+        )
+
+    override = (await db.execute(
+        select(VitalThreshold).where(VitalThreshold.user_id == current_user.id, VitalThreshold.metric == metric)
+    )).scalars().first()
+    if override is None:
+        override = VitalThreshold(user_id=current_user.id, metric=metric)
+        db.add(override)
+    override.low, override.high = low, high
+    await db.commit()
+    return await effective_thresholds(db, current_user.id)
+
+
+@router.delete("/thresholds/{metric}", response_model=List[VitalThresholdResponse])
+async def reset_vital_threshold(
+    metric: ThresholdMetric,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Go back to the default thresholds for one metric."""
+    await db.execute(
+        delete(VitalThreshold).where(VitalThreshold.user_id == current_user.id, VitalThreshold.metric == metric)
+    )
+    await db.commit()
+    return await effective_thresholds(db, current_user.id)
 
 
-@router.post("/vitals")
-async def create_vital_signs(db: Session = Depends(get_db)):
-    """Create vital signs record."""
-    return {"message": "Create vital signs endpoint"}
\ No newline at end of file
+@router.get("/export")
+async def export_health_history(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include: Optional[List[Literal["health_records", "vital_signs", "medicine_logs"]]] = Query(None),
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Download the current user's full health history.
+    Rows are streamed from the database and serialized as they are read, so
+    the export size is not limited by worker memory. NDJSON can mix record
+    kinds (each line has a "type"); CSV exports one kind per file.
+    """
+    kinds = include or list(EXPORT_TABLES)
+    if fmt == "csv" and len(kinds) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports one record kind; pass a single include"
+        )
+    filename = f"{kinds[0] if len(kinds) == 1 else 'health-history'}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_history(db.bind, current_user.id, kinds, fmt, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
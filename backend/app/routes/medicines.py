@@ -1,17 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_async_db, get_db
+from ..dependencies import get_current_user
 from ..models.medicine import Medicine, MedicineReminder, MedicineLog
+from ..schemas.medicine import MedicineReminderResponse, MedicineResponse
+from ..schemas.pagination import Page
+from ..utils.pagination import PageParams, page_params, paginate
+from ..utils.principals import Principal
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_medicines(db: Session = Depends(get_db)):
-    """Get user's medicines."""
-    return {"message": "Get medicines endpoint"}
+@router.get("/", response_model=Page[MedicineResponse])
+async def get_medicines(
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get user's medicines, newest first."""
+    items, next_cursor = await paginate(
+        db,
+        select(Medicine).where(Medicine.user_id == current_user.id),
+        Medicine.created_at,
+        Medicine.id,
+        page
+    )
+    return Page[MedicineResponse](items=items, next_cursor=next_cursor)
 
 
 @router.post("/")
@@ -20,10 +38,21 @@ async def create_medicine(db: Session = Depends(get_db)):
     return {"message": "Create medicine endpoint"}
 
 
-@router.get("/reminders")
-async def get_medicine_reminders(db: Session = Depends(get_db)):
-    """Get medicine reminders."""
-    return {"message": "Get medicine reminders endpoint"}
+@router.get("/reminders", response_model=Page[MedicineReminderResponse])
+async def get_medicine_reminders(
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get medicine reminders, newest first."""
+    items, next_cursor = await paginate(
+        db,
+        select(MedicineReminder).where(MedicineReminder.user_id == current_user.id),
+        MedicineReminder.created_at,
+        MedicineReminder.id,
+        page
+    )
+    return Page[MedicineReminderResponse](items=items, next_cursor=next_cursor)
 
 
 @router.post("/reminders")
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_async_db, get_db
+from ..dependencies import get_current_user
 from ..models.user import User, UserProfile
+from ..schemas.user import FCMTokenRegister
+from ..services.device_tokens import device_token_registry
+from ..utils.principals import Principal
 
 router = APIRouter()
 
@@ -21,6 +26,33 @@ async def update_user_profile(db: Session = Depends(get_db)):
 
 
 @router.post("/fcm-token")
-async def register_fcm_token(db: Session = Depends(get_db)):
+async def register_fcm_token(
+    registration: FCMTokenRegister,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Register FCM token for push notifications."""
-    return {"message": "FCM token registration endpoint"}
\ No newline at end of file
+    if registration.platform not in (None, "android", "ios", "web"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Platform must be android, ios or web"
+        )
+    await device_token_registry.register(
+        db, current_user.id, registration.token, registration.platform
+    )
+    return {"message": "FCM token registered"}
+
+
+@router.delete("/fcm-token")
+async def unregister_fcm_token(
+    registration: FCMTokenRegister,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stop push notifications to a device, e.g. on sign-out."""
+    if not await device_token_registry.unregister(db, current_user.id, registration.token):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="FCM token not registered"
+        )
+    return {"message": "FCM token removed"}
\ No newline at end of file
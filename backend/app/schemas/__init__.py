@@ -1,12 +1,14 @@
 from .auth import Token, UserLogin, UserRegister, UserResponse
-from .user import UserProfileCreate, UserProfileUpdate, UserProfileResponse
+from .user import UserProfileCreate, UserProfileUpdate, UserProfileResponse, FCMTokenRegister
 from .medicine import MedicineCreate, MedicineUpdate, MedicineResponse
 from .medicine import MedicineReminderCreate, MedicineReminderUpdate, MedicineReminderResponse
 from .medicine import MedicineLogCreate, MedicineLogUpdate, MedicineLogResponse
 from .family import FamilyConnectionCreate, FamilyConnectionResponse
-from .family import FamilyMessageCreate, FamilyMessageResponse
+from .family import FamilyMessageCreate, FamilyMessageResponse, EmergencyAlertCreate
 from .health import HealthRecordCreate, HealthRecordResponse
-from .health import VitalSignsCreate, VitalSignsResponse
+from .health import VitalSignsCreate, VitalSignsResponse, VitalSignsBulkResult
+from .health import VitalTrendPoint, VitalTrendResponse, VitalThresholdUpdate, VitalThresholdResponse
+from .pagination import Page
 
 __all__ = [
     "Token",
@@ -16,6 +18,7 @@ __all__ = [
     "UserProfileCreate",
     "UserProfileUpdate", 
     "UserProfileResponse",
+    "FCMTokenRegister",
     "MedicineCreate",
     "MedicineUpdate",
     "MedicineResponse",
@@ -29,8 +32,15 @@ __all__ = [
     "FamilyConnectionResponse",
     "FamilyMessageCreate", 
     "FamilyMessageResponse",
+    "EmergencyAlertCreate",
     "HealthRecordCreate",
     "HealthRecordResponse",
     "VitalSignsCreate",
-    "VitalSignsResponse"
+    "VitalSignsResponse",
+    "VitalSignsBulkResult",
+    "VitalTrendPoint",
+    "VitalTrendResponse",
+    "VitalThresholdUpdate",
+    "VitalThresholdResponse",
+    "Page"
 ]
\ No newline at end of file
@@ -30,6 +30,12 @@ class FamilyConnectionResponse(BaseModel):
         from_attributes = True
 
 
+class EmergencyAlertCreate(BaseModel):
+    """Schema for raising an emergency alert."""
+    emergency_type: str  # fall, chest_pain, breathing, other
+    details: Optional[str] = ""
+
+
 class FamilyMessageCreate(BaseModel):
     """Schema for creating family message."""
     receiver_id: int
@@ -56,6 +62,7 @@ class FamilyMessageResponse(BaseModel):
     attachment_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    decryption_error: Optional[str] = None  # set (with empty content) when the message could not be decrypted
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime, date
+from ..utils.units import is_known_unit
 
 
 class HealthRecordCreate(BaseModel):
@@ -67,6 +68,14 @@ class VitalSignsCreate(BaseModel):
     device_name: Optional[str] = None
     notes: Optional[str] = None
 
+    @field_validator("temperature_unit", "weight_unit", "height_unit", "glucose_unit")
+    @classmethod
+    def check_unit(cls, unit: Optional[str], info) -> Optional[str]:
+        quantity = info.field_name.replace("_unit", "")
+        if not is_known_unit(quantity, unit):
+            raise ValueError(f"Unsupported {quantity} unit: {unit}")
+        return unit
+
 
 class VitalSignsResponse(BaseModel):
     """Schema for vital signs response."""
@@ -89,12 +98,74 @@ class VitalSignsResponse(BaseModel):
     oxygen_saturation: Optional[float] = None
     respiratory_rate: Optional[int] = None
     blood_pressure_medication_taken: bool
+    temperature_c: Optional[float] = None
+    weight_kg: Optional[float] = None
+    height_cm: Optional[float] = None
+    glucose_mg_dl: Optional[float] = None
     measurement_method: Optional[str] = None
     device_name: Optional[str] = None
     notes: Optional[str] = None
     is_flagged: bool
+    flag_reason: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class VitalSignsBulkResult(BaseModel):
+    """Outcome of a bulk vital signs upload."""
+    received: int
+    inserted: int
+    duplicates: int
+
+
+VitalMetric = Literal["systolic_bp", "diastolic_bp", "heart_rate", "blood_glucose", "oxygen_saturation", "weight"]
+
+
+class VitalTrendPoint(BaseModel):
+    """Aggregates of one metric over one time bucket."""
+    bucket_start: datetime
+    count: int
+    mean: float
+    min: float
+    max: float
+
+
+class VitalTrendResponse(BaseModel):
+    """Schema for a vital signs trend."""
+    metric: VitalMetric
+    resolution: str  # "hour", "day" or "<n>d" for merged days
+    bucket_seconds: int
+    points: List[VitalTrendPoint]
+
+
+ThresholdMetric = Literal[
+    "systolic_bp", "diastolic_bp", "heart_rate", "temperature", "blood_glucose", "oxygen_saturation",
+    "respiratory_rate"
+]
+
+
+class VitalThresholdUpdate(BaseModel):
+    """Schema for overriding a metric's abnormal-value thresholds."""
+    low: Optional[float] = None
+    high: Optional[float] = None
+    unit: Optional[str] = None  # unit of low/high, defaults to the metric's canonical unit
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.low is None and self.high is None:
+            raise ValueError("Set low, high or both")
+        if self.low is not None and self.high is not None and self.low >= self.high:
+            raise ValueError("low must be below high")
+        return self
+
+
+class VitalThresholdResponse(BaseModel):
+    """Schema for a metric's effective thresholds."""
+    metric: ThresholdMetric
+    low: Optional[float] = None
+    high: Optional[float] = None
+    unit: str
+    is_override: bool
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a list endpoint; pass next_cursor back as ?cursor= for the next."""
+    items: List[T]
+    next_cursor: Optional[str] = None
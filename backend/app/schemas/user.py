@@ -71,4 +71,10 @@ class UserProfileResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class FCMTokenRegister(BaseModel):
+    """Schema for registering a device's push token."""
+    token: str
+    platform: Optional[str] = None  # android, ios, web
\ No newline at end of file
@@ -0,0 +1 @@
+# Background services for Swaasth Elder Health App
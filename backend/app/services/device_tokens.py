@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.notification import DeviceToken
+from ..utils.cache import TTLCache
+from ..utils.notifications import TokenResult
+
+logger = logging.getLogger(__name__)
+
+# Provider errors meaning the token itself will never work again
+DEAD_TOKEN_ERRORS = frozenset({"UnregisteredError", "SenderIdMismatchError"})
+
+# FCM also reports malformed tokens as INVALID_ARGUMENT, but so is a bad
+# payload; only trust it when other tokens in the same send succeeded.
+INVALID_TOKEN_ERRORS = frozenset({"InvalidArgumentError"})
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def invalid_tokens(results: Sequence[TokenResult]) -> List[str]:
+    """
+    Pick the tokens a multicast response shows to be permanently invalid.
+
+    Args:
+        results: Per-token outcomes from ``send_bulk_push_notifications``
+
+    Returns:
+        list: Tokens that should be removed from the registry
+    """
+    payload_ok = any(r.success for r in results)
+    return [
+        r.token for r in results
+        if not r.success and (
+            r.error in DEAD_TOKEN_ERRORS
+            or (payload_ok and r.error in INVALID_TOKEN_ERRORS)
+        )
+    ]
+
+
+class DeviceTokenRegistry:
+    """
+    Per-user registry of push tokens backed by the ``device_tokens`` table.
+
+    A token belongs to one user at a time; registering it again moves it to
+    the new owner. Lookups go through a TTL cache (users without devices are
+    cached too) that is invalidated whenever a user's tokens change here.
+    """
+
+    def __init__(self, cache_size: int, ttl_seconds: int, touch_seconds: int):
+        self.touch_seconds = touch_seconds
+        self._cache: TTLCache[Tuple[str, ...]] = TTLCache(maxsize=cache_size, default_ttl=ttl_seconds)
+        self.registered = 0
+        self.pruned = 0
+
+    async def register(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token: str,
+        platform: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> bool:
+        """
+        Add or refresh a device token for a user and commit.
+
+        Re-registering an unchanged token only bumps ``last_seen_at`` once
+        every ``touch_seconds`` so app launches do not turn into writes.
+
+        Args:
+            db: Async database session
+            user_id: Owner of the device
+            token: FCM registration token
+            platform: android, ios or web
+            now: Current aware UTC time
+
+        Returns:
+            bool: Whether the registry was written
+        """
+        now = now or datetime.now(timezone.utc)
+        result = await db.execute(
+            select(DeviceToken.user_id, DeviceToken.platform, DeviceToken.last_seen_at)
+            .where(DeviceToken.token == token)
+        )
+        existing = result.first()
+        if existing is not None:
+            previous_owner, previous_platform, last_seen = existing
+            fresh = _utc(last_seen) > now - timedelta(seconds=self.touch_seconds)
+            if previous_owner == user_id and (platform or previous_platform) == previous_platform and fresh:
+                return False
+
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(DeviceToken).values(
+            user_id=user_id, token=token, platform=platform, last_seen_at=now, created_at=now
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[DeviceToken.token],
+            set_={
+                "user_id": stmt.excluded.user_id,
+                "platform": stmt.excluded.platform if platform else DeviceToken.platform,
+                "last_seen_at": stmt.excluded.last_seen_at,
+            }
+        ))
+        await db.commit()
+
+        self.invalidate(user_id)
+        if existing is not None and existing[0] != user_id:
+            self.invalidate(existing[0])
+        self.registered += 1
+        return True
+
+    async def unregister(self, db: AsyncSession, user_id: int, token: str) -> bool:
+        """
+        Remove one of a user's device tokens and commit.
+
+        Returns:
+            bool: Whether the token was registered to the user
+        """
+        result = await db.execute(
+            delete(DeviceToken).where(DeviceToken.user_id == user_id, DeviceToken.token == token)
+        )
+        await db.commit()
+        self.invalidate(user_id)
+        return result.rowcount > 0
+
+    async def tokens_for_users(self, db: AsyncSession, user_ids: List[int]) -> Dict[int, List[str]]:
+        """
+        Look up the device tokens of several users.
+
+        Matches the outbox ``TokenResolver`` signature; only cache misses hit
+        the database, in a single query.
+
+        Args:
+            db: Async database session
+            user_ids: Users to resolve
+
+        Returns:
+            dict: User ID to list of tokens (users without devices are omitted)
+        """
+        found: Dict[int, Tuple[str, ...]] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            tokens = self._cache.get(user_id)
+            if tokens is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = tokens
+
+        if missing:
+            loaded: Dict[int, List[str]] = {user_id: [] for user_id in missing}
+            result = await db.execute(
+                select(DeviceToken.user_id, DeviceToken.token)
+                .where(DeviceToken.user_id.in_(missing))
+                .order_by(DeviceToken.user_id, DeviceToken.last_seen_at.desc())
+            )
+            for user_id, token in result:
+                loaded[user_id].append(token)
+            for user_id, tokens in loaded.items():
+                found[user_id] = tuple(tokens)
+                self._cache.set(user_id, found[user_id])
+
+        return {user_id: list(tokens) for user_id, tokens in found.items() if tokens}
+
+    async def prune(self, db: AsyncSession, tokens: Iterable[str]) -> int:
+        """
+        Delete tokens in the caller's transaction.
+
+        Args:
+            db: Async database session (the caller commits)
+            tokens: Tokens reported invalid by the provider
+
+        Returns:
+            int: Number of tokens removed
+        """
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            return 0
+        result = await db.execute(
+            select(DeviceToken.user_id).where(DeviceToken.token.in_(tokens)).distinct()
+        )
+        owners = list(result.scalars())
+        if not owners:
+            return 0
+        deleted = await db.execute(delete(DeviceToken).where(DeviceToken.token.in_(tokens)))
+        for user_id in owners:
+            self.invalidate(user_id)
+        self.pruned += deleted.rowcount
+        logger.info(f"Pruned {deleted.rowcount} invalid device tokens")
+        return deleted.rowcount
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached tokens."""
+        self._cache.delete(user_id)
+
+    def clear(self) -> None:
+        """Drop all cached tokens."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry metrics.
+
+        Returns:
+            dict: Cache counters plus registrations and pruned tokens
+        """
+        return {
+            **self._cache.stats(),
+            "registered": self.registered,
+            "pruned": self.pruned,
+        }
+
+
+device_token_registry = DeviceTokenRegistry(
+    cache_size=settings.device_token_cache_size,
+    ttl_seconds=settings.device_token_cache_ttl_seconds,
+    touch_seconds=settings.device_token_touch_seconds
+)
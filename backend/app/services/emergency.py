@@ -0,0 +1,380 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+import uuid
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, object_session
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.family import FamilyConnection
+from ..models.notification import NotificationOutbox
+from ..models.user import User, UserProfile
+from ..utils.cache import TTLCache
+from ..utils.metrics import LatencyHistogram
+from ..utils.notifications import create_emergency_notification, send_bulk_push_notifications
+from .device_tokens import device_token_registry, invalid_tokens
+from .outbox import enqueue_email, enqueue_push
+
+logger = logging.getLogger(__name__)
+
+
+class EmergencyRecipients(NamedTuple):
+    """Who to alert when an elder raises an emergency."""
+    elder_name: str
+    caregiver_ids: Tuple[int, ...]
+
+
+class EmergencyAlert(NamedTuple):
+    """An emergency waiting in the lane."""
+    alert_id: str
+    elder_id: int
+    recipients: EmergencyRecipients
+    payload: Dict[str, Any]  # title, body and data of the push
+    triggered_at: float  # time.monotonic() when raised
+
+
+# Labels of EmergencyLane.latency_by_outcome
+OUTCOMES = ("delivered", "fallback", "no_recipients", "failed")
+
+
+def alert_key(alert_id: str, caregiver_id: int) -> str:
+    """Dedup key of the outbox row backing one caregiver's emergency push."""
+    return f"emergency:{alert_id}:{caregiver_id}"
+
+
+class EmergencyContacts:
+    """
+    Cache of each elder's name and accepted emergency contacts.
+
+    Entries are preloaded at startup so the first alert after a deploy does
+    not pay for the lookup, and dropped when a FamilyConnection changes.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.maxsize = maxsize
+        self._cache: TTLCache[EmergencyRecipients] = TTLCache(maxsize=maxsize, default_ttl=ttl_seconds)
+
+    async def get(self, db: AsyncSession, elder_id: int) -> EmergencyRecipients:
+        """
+        Get an elder's emergency recipients, loading them on a miss.
+
+        Args:
+            db: Async database session
+            elder_id: Elder raising the alert
+
+        Returns:
+            EmergencyRecipients: Elder name and caregiver user IDs
+        """
+        recipients = self._cache.get(elder_id)
+        if recipients is None:
+            recipients = (await self.load(db, [elder_id]))[elder_id]
+        return recipients
+
+    async def load(self, db: AsyncSession, elder_ids: Iterable[int]) -> Dict[int, EmergencyRecipients]:
+        """Load and cache recipients for several elders in two queries."""
+        elder_ids = list(dict.fromkeys(elder_ids))
+        caregivers: Dict[int, List[int]] = {elder_id: [] for elder_id in elder_ids}
+        result = await db.execute(
+            select(FamilyConnection.elder_id, FamilyConnection.caregiver_id)
+            .where(
+                FamilyConnection.elder_id.in_(elder_ids),
+                FamilyConnection.emergency_contact.is_(True),
+                FamilyConnection.status == "accepted"
+            )
+        )
+        for elder_id, caregiver_id in result:
+            caregivers[elder_id].append(caregiver_id)
+        result = await db.execute(
+            select(UserProfile.user_id, UserProfile.first_name, UserProfile.last_name)
+            .where(UserProfile.user_id.in_(elder_ids))
+        )
+        names = {row.user_id: f"{row.first_name} {row.last_name}" for row in result}
+
+        loaded = {}
+        for elder_id in elder_ids:
+            loaded[elder_id] = EmergencyRecipients(
+                names.get(elder_id, "Your family member"),
+                tuple(dict.fromkeys(caregivers[elder_id]))
+            )
+            self._cache.set(elder_id, loaded[elder_id])
+        return loaded
+
+    async def preload(self, db: AsyncSession) -> int:
+        """
+        Warm the cache with every elder that has an emergency contact.
+
+        Returns:
+            int: Number of elders loaded (capped at the cache size)
+        """
+        result = await db.execute(
+            select(FamilyConnection.elder_id)
+            .where(FamilyConnection.emergency_contact.is_(True), FamilyConnection.status == "accepted")
+            .distinct()
+            .limit(self.maxsize)
+        )
+        elder_ids = list(result.scalars())
+        for start in range(0, len(elder_ids), 1000):
+            await self.load(db, elder_ids[start:start + 1000])
+        return len(elder_ids)
+
+    def invalidate(self, elder_id: int) -> None:
+        """Drop an elder's cached recipients."""
+        self._cache.delete(elder_id)
+
+    def clear(self) -> None:
+        """Drop all cached recipients."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class EmergencyLane:
+    """
+    Priority lane for emergency alerts.
+
+    Alerts go on their own queue, drained by dedicated workers that send
+    through a reserved thread pool, so they never wait behind reminder or
+    outbox traffic. Before the alert is acknowledged, each contact gets a
+    push row in the outbox that only becomes due after
+    ``outbox_grace_seconds``; the lane settles those rows as it sends, and if
+    the process dies first the outbox worker delivers them instead.
+
+    Delivery is judged per caregiver: anyone none of whose devices accepted
+    the push falls back to the outbox, as a push retry while they still have
+    a usable device and as an email otherwise (including caregivers with no
+    registered device). Trigger-to-outcome latency of every alert is recorded
+    against ``slo_seconds``, overall and per outcome.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        workers: int = 2,
+        push_threads: int = 4,
+        slo_seconds: float = 5.0,
+        outbox_grace_seconds: float = 30.0,
+        contacts: Optional[EmergencyContacts] = None
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.push_threads = push_threads
+        self.outbox_grace_seconds = outbox_grace_seconds
+        self.contacts = contacts or EmergencyContacts(maxsize=10000, ttl_seconds=600)
+        self.latency = LatencyHistogram(slo_seconds=slo_seconds)
+        self.latency_by_outcome = {outcome: LatencyHistogram(slo_seconds=slo_seconds) for outcome in OUTCOMES}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.triggered = 0
+        self.delivered = 0
+        self.no_recipients = 0
+        self.no_devices = 0
+        self.fallbacks = 0
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.push_threads, thread_name_prefix="emergency")
+        return self._executor
+
+    async def trigger(self, db: AsyncSession, elder_id: int, emergency_type: str, details: str) -> str:
+        """
+        Record an emergency alert in the outbox and queue it for the elder's emergency contacts.
+
+        The outbox rows are committed before this returns, so an alert that
+        was acknowledged is delivered even if the lane never gets to it.
+
+        Args:
+            db: Async database session
+            elder_id: Elder raising the alert
+            emergency_type: e.g. "fall", "chest_pain"
+            details: Free-text details shown in the notification
+
+        Returns:
+            str: Alert ID
+        """
+        alert_id = uuid.uuid4().hex
+        recipients = await self.contacts.get(db, elder_id)
+        payload = create_emergency_notification(recipients.elder_name, emergency_type, details)
+        payload["data"]["alert_id"] = alert_id
+        alert = EmergencyAlert(alert_id, elder_id, recipients, payload, time.monotonic())
+
+        not_before = datetime.now(timezone.utc) + timedelta(seconds=self.outbox_grace_seconds)
+        for caregiver_id in recipients.caregiver_ids:
+            enqueue_push(
+                db, caregiver_id, payload["title"], payload["body"], payload["data"], "emergency",
+                dedup_key=alert_key(alert_id, caregiver_id), not_before=not_before
+            )
+        await db.commit()
+        self._get_queue().put_nowait(alert)
+        self.triggered += 1
+        return alert_id
+
+    async def handle(self, alert: EmergencyAlert) -> None:
+        """Fan an alert out to the elder's emergency contacts and record its outcome."""
+        outcome = "failed"
+        try:
+            outcome = await self._fan_out(alert)
+        finally:
+            elapsed = time.monotonic() - alert.triggered_at
+            self.latency.observe(elapsed)
+            self.latency_by_outcome[outcome].observe(elapsed)
+
+    async def _fan_out(self, alert: EmergencyAlert) -> str:
+        """Push to the contacts whose outbox rows are still pending, settle the rows and return the outcome."""
+        if not alert.recipients.caregiver_ids:
+            self.no_recipients += 1
+            logger.warning(f"Emergency alert {alert.alert_id} for user {alert.elder_id} has no emergency contacts")
+            return "no_recipients"
+
+        async with self.session_factory() as db:
+            # rows the outbox worker already claimed (after the grace period) are left to it
+            result = await db.execute(
+                select(NotificationOutbox)
+                .where(
+                    NotificationOutbox.dedup_key.in_(
+                        [alert_key(alert.alert_id, c) for c in alert.recipients.caregiver_ids]
+                    ),
+                    NotificationOutbox.status == "pending"
+                )
+                .with_for_update(skip_locked=True)
+            )
+            entries = {entry.recipient_user_id: entry for entry in result.scalars()}
+            caregiver_ids = [c for c in alert.recipients.caregiver_ids if c in entries]
+
+            registered = await device_token_registry.tokens_for_users(db, caregiver_ids) if caregiver_ids else {}
+            tokens = list(dict.fromkeys(t for tokens in registered.values() for t in tokens))
+            payload = alert.payload
+            accepted: Set[str] = set()
+            dead_tokens: List[str] = []
+            if tokens:
+                result = await send_bulk_push_notifications(
+                    tokens, payload["title"], payload["body"], payload["data"], "emergency",
+                    max_concurrency=self.push_threads, executor=self._get_executor()
+                )
+                accepted = {r.token for r in result["responses"] if r.success}
+                dead_tokens = invalid_tokens(result["responses"])
+            if accepted:
+                self.delivered += 1
+
+            now = datetime.now(timezone.utc)
+            reached = [c for c in caregiver_ids if accepted.intersection(registered.get(c, ()))]
+            for caregiver_id in reached:
+                entry = entries[caregiver_id]
+                entry.status, entry.sent_at, entry.attempts = "sent", now, 1
+            unreached = [c for c in caregiver_ids if c not in reached]
+            retry_push = [c for c in unreached if set(registered.get(c, ())) - set(dead_tokens)]
+            email = [c for c in unreached if c not in retry_push]
+            for caregiver_id in retry_push:
+                entries[caregiver_id].next_attempt_at = now  # the outbox retries it without waiting out the grace
+            if email:
+                self.no_devices += len(email)
+                logger.warning(
+                    f"Emergency alert {alert.alert_id}: emailing {len(email)} contact(s) without a usable device"
+                )
+                result = await db.execute(select(User.id, User.email).where(User.id.in_(email)))
+                for caregiver_id, address in result:
+                    entry = entries[caregiver_id]
+                    entry.status, entry.last_error = "skipped", "No usable device; emailed instead"
+                    enqueue_email(
+                        db, address, payload["title"], payload["body"], recipient_user_id=caregiver_id,
+                        dedup_key=f"{entry.dedup_key}:email"
+                    )
+            self.fallbacks += len(unreached)
+            if dead_tokens:
+                await device_token_registry.prune(db, dead_tokens)
+            await db.commit()
+
+        if len(reached) < len(alert.recipients.caregiver_ids):
+            return "fallback"
+        return "delivered"
+
+    async def run(self) -> None:
+        """Drain the lane with ``workers`` concurrent consumers until cancelled."""
+        queue = self._get_queue()
+
+        async def worker() -> None:
+            while True:
+                alert = await queue.get()
+                try:
+                    await self.handle(alert)
+                except Exception as e:
+                    logger.error(f"Emergency alert {alert.alert_id} failed: {e}")
+                finally:
+                    queue.task_done()
+
+        async with self.session_factory() as db:
+            try:
+                preloaded = await self.contacts.preload(db)
+                logger.info(f"Preloaded emergency contacts for {preloaded} users")
+            except Exception as e:
+                logger.error(f"Preloading emergency contacts failed: {e}")
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        """Release the reserved push threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get lane metrics.
+
+        Returns:
+            dict: Queue depth, alert counters, recipient cache and latency histograms (overall and per outcome)
+        """
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "triggered": self.triggered,
+            "delivered": self.delivered,
+            "no_recipients": self.no_recipients,
+            "no_devices": self.no_devices,
+            "fallbacks": self.fallbacks,
+            "contacts_cache": self.contacts.stats(),
+            "latency_seconds": self.latency.stats(),
+            "latency_by_outcome": {outcome: h.stats() for outcome, h in self.latency_by_outcome.items()},
+        }
+
+
+emergency_lane = EmergencyLane(
+    workers=settings.emergency_workers,
+    push_threads=settings.emergency_push_threads,
+    slo_seconds=settings.emergency_latency_slo_seconds,
+    outbox_grace_seconds=settings.emergency_outbox_grace_seconds,
+    contacts=EmergencyContacts(
+        maxsize=settings.emergency_contacts_cache_size,
+        ttl_seconds=settings.emergency_contacts_cache_ttl_seconds
+    )
+)
+
+_INVALIDATIONS_KEY = "emergency_contact_invalidations"
+
+
+@event.listens_for(FamilyConnection, "after_insert")
+@event.listens_for(FamilyConnection, "after_update")
+@event.listens_for(FamilyConnection, "after_delete")
+def _connection_changed(mapper, connection, target: FamilyConnection) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATIONS_KEY, set()).add(target.elder_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Drop cached recipients once the connection change is visible."""
+    for elder_id in session.info.pop(_INVALIDATIONS_KEY, ()):
+        emergency_lane.contacts.invalidate(elder_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_INVALIDATIONS_KEY, None)
@@ -0,0 +1,152 @@
+"""
+Streaming export of a user's health history.
+
+Rows are read from a server-side cursor ``yield_per`` at a time as plain
+column mappings (no ORM objects or pydantic models) and serialized one by
+one into a small buffer that is written out every ``chunk_bytes``, optionally
+through gzip. Memory use therefore depends on the chunk and fetch sizes, not
+on how long the history is.
+"""
+from datetime import date, datetime, time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple
+import csv
+import io
+import json
+import zlib
+from sqlalchemy import Column, Table, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from ..config import settings
+from ..models.health import HealthRecord, VitalSigns
+from ..models.medicine import MedicineLog
+
+# kind -> (table, timestamp column the history is ordered by)
+EXPORT_TABLES: Dict[str, Tuple[Table, Column]] = {
+    "health_records": (HealthRecord.__table__, HealthRecord.__table__.c.date_recorded),
+    "vital_signs": (VitalSigns.__table__, VitalSigns.__table__.c.measurement_date),
+    "medicine_logs": (MedicineLog.__table__, MedicineLog.__table__.c.scheduled_time),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _isoformat(value: Any) -> str:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Only dates and times reach the default hook, the rest is encoded natively
+_encoder = json.JSONEncoder(separators=(",", ":"), default=_isoformat)
+
+
+def ndjson_line(kind: str, row: Mapping[str, Any]) -> str:
+    """One JSON object per line, tagged with the kind of record."""
+    return _encoder.encode({"type": kind, **row}) + "\n"
+
+
+async def stream_rows(
+    session: AsyncSession,
+    kind: str,
+    user_id: int,
+    yield_per: int
+) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+    """
+    A user's rows of one kind, oldest first, from a server-side cursor.
+
+    Args:
+        session: Async session dedicated to the export
+        kind: Key of EXPORT_TABLES
+        user_id: Owner of the history
+        yield_per: Rows fetched per round trip
+
+    Yields:
+        list: Up to yield_per mappings of column name to value
+    """
+    table, order_column = EXPORT_TABLES[kind]
+    stmt = (
+        select(table)
+        .where(table.c.user_id == user_id)
+        .order_by(order_column, table.c.id)
+        .execution_options(yield_per=yield_per)
+    )
+    result = await session.stream(stmt)
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+class ChunkWriter:
+    """Text buffer handed out in encoded (and optionally gzipped) chunks."""
+
+    def __init__(self, compress: bool):
+        self.buffer = io.StringIO()
+        # wbits=31 writes a gzip header and trailer
+        self.compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def size(self) -> int:
+        return self.buffer.tell()
+
+    def take(self, final: bool = False) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+            if final:
+                data += self.compressor.flush()
+        return data
+
+
+async def export_history(
+    engine: AsyncEngine,
+    user_id: int,
+    kinds: Sequence[str],
+    fmt: str = "ndjson",
+    compress: bool = False,
+    yield_per: Optional[int] = None,
+    chunk_bytes: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Serialize a user's history as NDJSON or CSV, chunk by chunk.
+
+    The export opens its own session so the stream can outlive the request's
+    session. NDJSON mixes kinds, each line tagged with its "type"; CSV takes
+    one kind (the route enforces this) with a header row.
+
+    Args:
+        engine: Async engine to read from
+        user_id: Owner of the history
+        kinds: Keys of EXPORT_TABLES, exported in this order
+        fmt: "ndjson" or "csv"
+        compress: Gzip the output
+        yield_per: Rows fetched per round trip (default export_yield_per)
+        chunk_bytes: Serialized bytes buffered per chunk (default export_chunk_bytes)
+
+    Yields:
+        bytes: Output chunks
+    """
+    yield_per = yield_per or settings.export_yield_per
+    chunk_bytes = chunk_bytes or settings.export_chunk_bytes
+    writer = ChunkWriter(compress)
+    async with AsyncSession(engine) as session:
+        for kind in kinds:
+            columns: List[str] = [column.name for column in EXPORT_TABLES[kind][0].columns]
+            csv_writer = csv.writer(writer.buffer) if fmt == "csv" else None
+            if csv_writer is not None:
+                csv_writer.writerow(columns)
+            async for partition in stream_rows(session, kind, user_id, yield_per):
+                for row in partition:
+                    if csv_writer is not None:
+                        csv_writer.writerow([_plain(row[column]) for column in columns])
+                    else:
+                        writer.buffer.write(ndjson_line(kind, row))
+                    if writer.size() >= chunk_bytes:
+                        yield writer.take()
+    final = writer.take(final=True)
+    if final:
+        yield final
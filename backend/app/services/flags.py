@@ -0,0 +1,233 @@
+"""
+Abnormal vital signs flagging.
+
+Readings are evaluated a batch at a time: each metric becomes a NumPy column,
+read from its canonical-unit column, and is compared against per-row low/high
+bounds gathered from the defaults and the owners' overrides. Only flagged
+rows are visited in Python, to write their reason. Used inline on ingest and
+by the backfill over stored readings:
+
+    python -m app.services.flags --batch-size 10000
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import logging
+from sqlalchemy import and_, bindparam, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.health import VitalSigns, VitalThreshold
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Threshold(NamedTuple):
+    low: Optional[float]  # flag values below (canonical unit)
+    high: Optional[float]  # flag values above (canonical unit)
+
+
+# Adult defaults; overridden per user in vital_thresholds
+DEFAULT_THRESHOLDS: Dict[str, Threshold] = {
+    "systolic_bp": Threshold(90, 180),  # mmHg
+    "diastolic_bp": Threshold(60, 120),  # mmHg
+    "heart_rate": Threshold(50, 120),  # bpm
+    "temperature": Threshold(35.0, 38.0),  # Celsius
+    "blood_glucose": Threshold(70, 180),  # mg/dL
+    "oxygen_saturation": Threshold(92, None),  # %
+    "respiratory_rate": Threshold(12, 25),  # breaths/min
+}
+
+# Unit of each metric's thresholds
+METRIC_UNITS = {
+    "systolic_bp": "mmHg",
+    "diastolic_bp": "mmHg",
+    "heart_rate": "bpm",
+    "temperature": "C",
+    "blood_glucose": "mg/dL",
+    "oxygen_saturation": "%",
+    "respiratory_rate": "breaths/min",
+}
+
+# Metrics measured in varying units: metric -> (canonical VitalSigns column, quantity in app.utils.units)
+UNIT_COLUMNS = {
+    "temperature": ("temperature_c", "temperature"),
+    "blood_glucose": ("glucose_mg_dl", "glucose"),
+}
+
+FLAG_REASON_LENGTH = 255
+
+Overrides = Dict[int, Dict[str, Threshold]]  # user_id -> metric -> Threshold
+
+
+class FlagEngine:
+    """Vectorized threshold checks over batches of readings."""
+
+    def __init__(self, defaults: Mapping[str, Threshold] = DEFAULT_THRESHOLDS):
+        self.defaults = dict(defaults)
+
+    def thresholds(self, user_id: int, overrides: Overrides) -> Dict[str, Threshold]:
+        """Effective thresholds of one user: the defaults with their overrides applied."""
+        own = overrides.get(user_id, {})
+        return {
+            metric: Threshold(
+                own[metric].low if metric in own and own[metric].low is not None else default.low,
+                own[metric].high if metric in own and own[metric].high is not None else default.high
+            )
+            for metric, default in self.defaults.items()
+        }
+
+    def canonical_values(self, readings: Sequence[Mapping[str, Any]], metric: str) -> "np.ndarray":
+        import numpy as np
+
+        column = UNIT_COLUMNS[metric][0] if metric in UNIT_COLUMNS else metric
+        return np.array([reading.get(column) for reading in readings], dtype=float)
+
+    def evaluate(
+        self,
+        readings: Sequence[Mapping[str, Any]],
+        overrides: Optional[Overrides] = None
+    ) -> Tuple["np.ndarray", List[Optional[str]]]:
+        """
+        Flag readings outside their owner's thresholds.
+
+        Args:
+            readings: Mappings with user_id and the metrics' canonical columns
+            overrides: Per-user thresholds (see load_overrides)
+
+        Returns:
+            tuple: (boolean array of flagged rows, reason per row or None)
+        """
+        import numpy as np  # loaded on first evaluation, not at app start
+
+        overrides = overrides or {}
+        count = len(readings)
+        flagged = np.zeros(count, dtype=bool)
+        if not count:
+            return flagged, []
+
+        users, owner = np.unique(np.array([reading["user_id"] for reading in readings]), return_inverse=True)
+        per_user = [self.thresholds(int(user_id), overrides) for user_id in users]
+        checks = []
+        for metric in self.defaults:
+            values = self.canonical_values(readings, metric)
+            low = np.array([t[metric].low if t[metric].low is not None else -np.inf for t in per_user])[owner]
+            high = np.array([t[metric].high if t[metric].high is not None else np.inf for t in per_user])[owner]
+            below, above = values < low, values > high
+            flagged |= below | above
+            checks.append((metric, values, low, high, below, above))
+
+        reasons: List[Optional[str]] = [None] * count
+        for row in np.flatnonzero(flagged):
+            parts = []
+            for metric, values, low, high, below, above in checks:
+                if below[row]:
+                    parts.append(f"{metric} {values[row]:g} < {low[row]:g}")
+                elif above[row]:
+                    parts.append(f"{metric} {values[row]:g} > {high[row]:g}")
+            reasons[row] = "; ".join(parts)[:FLAG_REASON_LENGTH]
+        return flagged, reasons
+
+    def apply(self, rows: Sequence[Dict[str, Any]], overrides: Optional[Overrides] = None) -> int:
+        """
+        Set is_flagged and flag_reason on reading rows in place.
+
+        Returns:
+            int: Number of flagged rows
+        """
+        flagged, reasons = self.evaluate(rows, overrides)
+        for row, is_flagged, reason in zip(rows, flagged.tolist(), reasons):
+            row["is_flagged"] = is_flagged
+            row["flag_reason"] = reason
+        return int(flagged.sum())
+
+
+def _overrides(rows: Iterable[VitalThreshold]) -> Overrides:
+    overrides: Overrides = {}
+    for row in rows:
+        overrides.setdefault(row.user_id, {})[row.metric] = Threshold(row.low, row.high)
+    return overrides
+
+
+async def load_overrides(db: AsyncSession, user_ids: Iterable[int]) -> Overrides:
+    """Per-user threshold overrides of the given users."""
+    result = await db.execute(select(VitalThreshold).where(VitalThreshold.user_id.in_(set(user_ids))))
+    return _overrides(result.scalars())
+
+
+# Columns the engine reads from stored readings
+FLAG_COLUMNS = ["user_id"] + sorted(
+    UNIT_COLUMNS[metric][0] if metric in UNIT_COLUMNS else metric for metric in DEFAULT_THRESHOLDS
+)
+
+
+def backfill(connection: Connection, batch_size: int = 10000, engine: Optional[FlagEngine] = None) -> Dict[str, int]:
+    """
+    Re-evaluate every stored reading, committing once per batch.
+
+    Walks vital_signs in id order, so it can be interrupted and rerun, and
+    only writes rows whose flag or reason changed.
+
+    Args:
+        connection: Connection outside a transaction (each batch commits)
+        batch_size: Readings evaluated per batch
+        engine: Rule engine (defaults to flag_engine)
+
+    Returns:
+        dict: Rows "scanned", "updated" and now "flagged"
+    """
+    engine = engine or flag_engine
+    columns = [VitalSigns.id, VitalSigns.measurement_date, VitalSigns.is_flagged, VitalSigns.flag_reason] + [
+        getattr(VitalSigns, column) for column in FLAG_COLUMNS
+    ]
+    # the timestamp lets Postgres update within one partition
+    stmt = update(VitalSigns).where(and_(
+        VitalSigns.id == bindparam("row_id"),
+        VitalSigns.measurement_date == bindparam("row_measured")
+    )).values(
+        is_flagged=bindparam("new_flagged"),
+        flag_reason=bindparam("new_reason"),
+        updated_at=VitalSigns.updated_at  # not an edit of the reading
+    )
+
+    totals = {"scanned": 0, "updated": 0, "flagged": 0}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(*columns).where(VitalSigns.id > last_id).order_by(VitalSigns.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        overrides = _overrides(connection.execute(
+            select(VitalThreshold).where(VitalThreshold.user_id.in_({row["user_id"] for row in rows}))
+        ))
+        flagged, reasons = engine.evaluate(rows, overrides)
+        changes = [
+            {"row_id": row["id"], "row_measured": row["measurement_date"], "new_flagged": is_flagged,
+             "new_reason": reason}
+            for row, is_flagged, reason in zip(rows, flagged.tolist(), reasons)
+            if bool(row["is_flagged"]) != is_flagged or row["flag_reason"] != reason
+        ]
+        if changes:
+            connection.execute(stmt, changes)
+        connection.commit()
+        totals["scanned"] += len(rows)
+        totals["updated"] += len(changes)
+        totals["flagged"] += int(flagged.sum())
+        last_id = rows[-1]["id"]
+    return totals
+
+
+flag_engine = FlagEngine()
+
+
+if __name__ == "__main__":
+    from ..database import engine as database_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with database_engine.connect() as connection:
+        logger.info(f"Flag backfill: {backfill(connection, args.batch_size)}")
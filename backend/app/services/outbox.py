@@ -0,0 +1,416 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import random
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.notification import NotificationDedupKey, NotificationOutbox
+from ..utils.notifications import send_bulk_push_notifications, send_email_batch
+from .device_tokens import device_token_registry, invalid_tokens
+
+logger = logging.getLogger(__name__)
+
+# Maps recipient user IDs to their device tokens at delivery time
+TokenResolver = Callable[[AsyncSession, List[int]], Awaitable[Dict[int, List[str]]]]
+
+# Removes tokens the provider rejected as permanently invalid
+TokenPruner = Callable[[AsyncSession, Iterable[str]], Awaitable[int]]
+
+
+# Text fields each channel's payload must carry
+REQUIRED_FIELDS = {
+    "push": ("title", "body"),
+    "email": ("to_email", "subject", "body"),
+}
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def enqueue_notification(
+    db,
+    channel: str,
+    payload: Dict[str, Any],
+    recipient_user_id: Optional[int] = None,
+    dedup_key: Optional[str] = None,
+    not_before: Optional[datetime] = None
+) -> NotificationOutbox:
+    """
+    Add a notification to the outbox in the caller's transaction.
+    
+    Nothing is sent until the caller commits; if the transaction rolls back
+    the notification disappears with it.
+    
+    Args:
+        db: Session (sync or async) holding the triggering change
+        channel: "push" or "email"
+        payload: Channel-specific message fields
+        recipient_user_id: Target user, if any
+        dedup_key: Deliveries with the same key are sent at most once
+        not_before: Earliest delivery time (defaults to now)
+        
+    Returns:
+        NotificationOutbox: The pending outbox row
+    """
+    if channel not in ("push", "email"):
+        raise ValueError(f"Unknown notification channel: {channel}")
+    entry = NotificationOutbox(
+        channel=channel,
+        recipient_user_id=recipient_user_id,
+        payload=json.dumps(payload, sort_keys=True),
+        dedup_key=dedup_key,
+        status="pending",
+        attempts=0,
+        next_attempt_at=not_before or datetime.now(timezone.utc)
+    )
+    db.add(entry)
+    return entry
+
+
+def enqueue_push(
+    db,
+    recipient_user_id: int,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None,
+    notification_type: str = "general",
+    dedup_key: Optional[str] = None,
+    not_before: Optional[datetime] = None
+) -> NotificationOutbox:
+    """Queue a push notification to every device of a user."""
+    return enqueue_notification(db, "push", {
+        "title": title,
+        "body": body,
+        "data": data or {},
+        "notification_type": notification_type
+    }, recipient_user_id=recipient_user_id, dedup_key=dedup_key, not_before=not_before)
+
+
+def enqueue_email(
+    db,
+    to_email: str,
+    subject: str,
+    body: str,
+    is_html: bool = False,
+    recipient_user_id: Optional[int] = None,
+    dedup_key: Optional[str] = None
+) -> NotificationOutbox:
+    """Queue an email notification."""
+    return enqueue_notification(db, "email", {
+        "to_email": to_email,
+        "subject": subject,
+        "body": body,
+        "is_html": is_html
+    }, recipient_user_id=recipient_user_id, dedup_key=dedup_key)
+
+
+def load_payload(row: NotificationOutbox) -> Dict[str, Any]:
+    """
+    Decode an outbox row's payload.
+    
+    Raises:
+        ValueError: If the payload is not valid JSON or lacks a field its channel needs
+    """
+    try:
+        payload = json.loads(row.payload)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("payload is not a JSON object")
+    if row.channel not in REQUIRED_FIELDS:
+        raise ValueError(f"unknown channel {row.channel!r}")
+    missing = [field for field in REQUIRED_FIELDS[row.channel] if not isinstance(payload.get(field), str)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if not isinstance(payload.get("data") or {}, dict) or not isinstance(payload.get("tokens") or [], list):
+        raise ValueError("data must be an object and tokens a list")
+    return payload
+
+
+async def no_registered_tokens(db: AsyncSession, user_ids: List[int]) -> Dict[int, List[str]]:
+    """Resolver that only uses tokens listed in the payload."""
+    return {}
+
+
+class OutboxWorker:
+    """
+    Drains the notification outbox in batches.
+    
+    Each batch is claimed with ``FOR UPDATE SKIP LOCKED`` so several workers
+    can run side by side. Rows sharing a dedup key are delivered once (the
+    key is claimed in notification_dedup_keys in the same transaction), pushes
+    with identical content are merged into one multicast, and failed rows are
+    retried with exponential backoff until ``max_attempts``. A row whose
+    payload cannot be decoded fails on its own without holding up the batch.
+    Tokens the provider reports as unregistered are pruned in the same
+    transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int = 100,
+        poll_seconds: float = 1.0,
+        max_attempts: int = 8,
+        base_backoff_seconds: float = 10.0,
+        max_backoff_seconds: float = 3600.0,
+        token_resolver: TokenResolver = device_token_registry.tokens_for_users,
+        token_pruner: TokenPruner = device_token_registry.prune
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.token_resolver = token_resolver
+        self.token_pruner = token_pruner
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.skipped = 0
+        self.pending = 0
+        self.lag_seconds = 0.0
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before retry number ``attempts`` (with +/-10% jitter)."""
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+    async def drain_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Claim and deliver one batch of due notifications.
+        
+        Args:
+            now: Current aware UTC time
+            
+        Returns:
+            int: Number of outbox rows processed
+        """
+        now = now or datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(NotificationOutbox)
+                .where(
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.next_attempt_at <= now
+                )
+                .order_by(NotificationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = list(result.scalars())
+            
+            if rows:
+                to_send = await self._deduplicate(db, rows)
+                errors = await self._deliver(db, to_send)
+                for row in to_send:
+                    self._record_outcome(row, errors.get(row.id), now)
+                await self._release_failed(db, to_send)
+                await db.commit()
+            
+            await self._update_lag(db, now)
+        return len(rows)
+
+    async def _deduplicate(self, db: AsyncSession, rows: List[NotificationOutbox]) -> List[NotificationOutbox]:
+        """
+        Claim each dedup key for one row and skip the rows whose key another row holds.
+        
+        Claims are inserted in the delivery transaction: a worker inserting a
+        key another worker has claimed but not committed waits for that commit
+        and then conflicts, so rows sharing a key are sent once however they
+        are spread over workers. Keys are inserted in sorted order so two
+        workers cannot deadlock on each other's claims.
+        """
+        candidates: Dict[str, int] = {}
+        for row in rows:
+            if row.dedup_key:
+                candidates.setdefault(row.dedup_key, row.id)
+        owners: Dict[str, int] = {}
+        if candidates:
+            dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+            await db.execute(
+                dialect.insert(NotificationDedupKey)
+                .values([{"dedup_key": key, "outbox_id": row_id} for key, row_id in sorted(candidates.items())])
+                .on_conflict_do_nothing(index_elements=["dedup_key"])
+            )
+            result = await db.execute(
+                select(NotificationDedupKey.dedup_key, NotificationDedupKey.outbox_id)
+                .where(NotificationDedupKey.dedup_key.in_(candidates))
+            )
+            owners = dict(result.all())
+
+        to_send = []
+        for row in rows:
+            if row.dedup_key and owners.get(row.dedup_key) != row.id:
+                row.status = "skipped"
+                self.skipped += 1
+                continue
+            to_send.append(row)
+        return to_send
+
+    async def _release_failed(self, db: AsyncSession, rows: List[NotificationOutbox]) -> None:
+        """Free the keys of rows given up on, so a later row with the same key can deliver."""
+        for row in rows:
+            if row.status == "failed" and row.dedup_key:
+                await db.execute(
+                    delete(NotificationDedupKey)
+                    .where(NotificationDedupKey.dedup_key == row.dedup_key, NotificationDedupKey.outbox_id == row.id)
+                )
+
+    async def _deliver(self, db: AsyncSession, rows: List[NotificationOutbox]) -> Dict[int, Optional[str]]:
+        """Send rows, returning an error message (or None) per row ID."""
+        errors: Dict[int, Optional[str]] = {}
+        push_groups: Dict[Tuple[str, str, str, str], List[Tuple[NotificationOutbox, Dict[str, Any]]]] = {}
+        emails = []
+        
+        for row in rows:
+            try:
+                payload = load_payload(row)
+            except ValueError as e:
+                logger.error(f"Outbox notification {row.id} has a malformed payload: {e}")
+                errors[row.id] = f"Malformed payload: {e}"
+                continue
+            if row.channel == "push":
+                key = (
+                    payload["title"],
+                    payload["body"],
+                    json.dumps(payload.get("data") or {}, sort_keys=True),
+                    str(payload.get("notification_type", "general"))
+                )
+                push_groups.setdefault(key, []).append((row, payload))
+            else:
+                emails.append((row, payload))
+        
+        if push_groups:
+            user_ids = sorted({row.recipient_user_id for group in push_groups.values()
+                               for row, _ in group if row.recipient_user_id is not None})
+            registered = await self.token_resolver(db, user_ids) if user_ids else {}
+            sends = [
+                self._send_push_group(key, group, registered)
+                for key, group in push_groups.items()
+            ]
+            dead_tokens: List[str] = []
+            for group_errors, group_dead in await asyncio.gather(*sends):
+                errors.update(group_errors)
+                dead_tokens.extend(group_dead)
+            if dead_tokens:
+                try:
+                    await self.token_pruner(db, dead_tokens)
+                except Exception as e:
+                    logger.error(f"Pruning invalid device tokens failed: {e}")
+        
+        if emails:
+            try:
+                results = await send_email_batch([payload for _, payload in emails])
+            except Exception as e:
+                logger.error(f"Email batch failed: {e}")
+                results = [False] * len(emails)
+            for (row, _), sent in zip(emails, results):
+                errors[row.id] = None if sent else "Email delivery failed"
+        return errors
+
+    async def _send_push_group(
+        self,
+        key: Tuple[str, str, str, str],
+        group: List[Tuple[NotificationOutbox, Dict[str, Any]]],
+        registered: Dict[int, List[str]]
+    ) -> Tuple[Dict[int, Optional[str]], List[str]]:
+        title, body, data_json, notification_type = key
+        tokens_by_row = {}
+        for row, payload in group:
+            tokens = list(payload.get("tokens") or [])
+            tokens += registered.get(row.recipient_user_id, [])
+            tokens_by_row[row.id] = list(dict.fromkeys(tokens))
+        rows = [row for row, _ in group]
+        
+        all_tokens = list(dict.fromkeys(t for tokens in tokens_by_row.values() for t in tokens))
+        if not all_tokens:
+            return {row.id: None for row in rows}, []  # no devices: nothing to deliver
+        
+        result = await send_bulk_push_notifications(
+            all_tokens, title, body, json.loads(data_json), notification_type
+        )
+        delivered = {r.token for r in result["responses"] if r.success}
+        errors = {}
+        for row in rows:
+            tokens = tokens_by_row[row.id]
+            if not tokens or delivered.intersection(tokens):
+                errors[row.id] = None
+            else:
+                errors[row.id] = "Push delivery failed for all devices"
+        return errors, invalid_tokens(result["responses"])
+
+    def _record_outcome(self, row: NotificationOutbox, error: Optional[str], now: datetime) -> None:
+        row.attempts = (row.attempts or 0) + 1
+        if error is None:
+            row.status = "sent"
+            row.sent_at = now
+            row.last_error = None
+            self.sent += 1
+        elif row.attempts >= self.max_attempts:
+            row.status = "failed"
+            row.last_error = error
+            self.failed += 1
+            logger.error(f"Giving up on outbox notification {row.id}: {error}")
+        else:
+            row.last_error = error
+            row.next_attempt_at = now + self.backoff(row.attempts)
+            self.retried += 1
+
+    async def _update_lag(self, db: AsyncSession, now: datetime) -> None:
+        result = await db.execute(
+            select(func.count(NotificationOutbox.id), func.min(NotificationOutbox.created_at))
+            .where(NotificationOutbox.status == "pending")
+        )
+        pending, oldest = result.one()
+        self.pending = pending
+        oldest = _utc(oldest)
+        self.lag_seconds = max(0.0, (now - oldest).total_seconds()) if oldest else 0.0
+
+    async def run(self) -> None:
+        """Drain the outbox until cancelled."""
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get outbox metrics.
+        
+        Returns:
+            dict: Pending count, lag of the oldest pending row and delivery counters
+        """
+        return {
+            "pending": self.pending,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.outbox_batch_size,
+    poll_seconds=settings.outbox_poll_seconds,
+    max_attempts=settings.outbox_max_attempts
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(outbox_worker.run())
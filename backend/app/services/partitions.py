@@ -0,0 +1,284 @@
+"""
+Monthly range partitions for the append-heavy tables (Postgres only).
+
+Migration 0005 turns ``vital_signs`` and ``medicine_logs`` into tables
+partitioned by month on their timestamp column. This job keeps partitions
+created ``partition_months_ahead`` months in advance and applies retention
+by dropping whole expired partitions instead of deleting rows. Rows outside
+every monthly partition land in the ``*_default`` partition; their months get
+a partition of their own once inside the window, and those older than the
+retention window are deleted. Run it in the API process
+(``partition_maintenance_enabled``) or from cron:
+
+    python -m app.services.partitions
+"""
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+import asyncio
+import logging
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from ..config import settings
+from ..database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+# Held for the transaction so concurrent workers don't race on DDL
+ADVISORY_LOCK_KEY = 0x5AA5_0005
+
+
+class PartitionedTable(NamedTuple):
+    name: str
+    column: str  # partition key
+    retention_months: int  # full months kept before the current one; 0 keeps everything
+
+
+PARTITIONED_TABLES = (
+    PartitionedTable("vital_signs", "measurement_date", settings.vital_signs_retention_months),
+    PartitionedTable("medicine_logs", "scheduled_time", settings.medicine_logs_retention_months),
+)
+
+
+def month_start(value: datetime) -> date:
+    """First day of the (UTC) month containing ``value``."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition named by partition_name (None for the default partition)."""
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def retention_cutoff(table: PartitionedTable, now: datetime) -> Optional[date]:
+    """First month kept by the table's retention (None keeps everything)."""
+    if table.retention_months <= 0:
+        return None
+    return add_months(month_start(now), -table.retention_months)
+
+
+def missing_partitions(
+    table: PartitionedTable,
+    existing: Iterable[str],
+    now: datetime,
+    months_ahead: int,
+    default_months: Iterable[date] = ()
+) -> List[date]:
+    """
+    Months that should have a partition but have none.
+
+    These are the current month and the next ``months_ahead``, plus earlier
+    months still inside the retention window that have rows in the default
+    partition (creating the partition moves those rows into it).
+
+    Args:
+        table: Partitioned table
+        existing: Names of its current partitions
+        now: Current time
+        months_ahead: Months to create beyond the current one
+        default_months: Months that have rows in the default partition
+
+    Returns:
+        list: First day of each missing month, in order
+    """
+    existing = set(existing)
+    current = month_start(now)
+    cutoff = retention_cutoff(table, now)
+    months = {add_months(current, i) for i in range(months_ahead + 1)}
+    months.update(month for month in default_months if month < current and (cutoff is None or month >= cutoff))
+    return sorted(month for month in months if partition_name(table.name, month) not in existing)
+
+
+def expired_partitions(table: PartitionedTable, existing: Iterable[str], now: datetime) -> List[str]:
+    """
+    Partitions entirely older than the table's retention window.
+
+    Args:
+        table: Partitioned table
+        existing: Names of its current partitions
+        now: Current time
+
+    Returns:
+        list: Names of partitions to drop, oldest first
+    """
+    cutoff = retention_cutoff(table, now)
+    if cutoff is None:
+        return []
+    months = {name: partition_month(table.name, name) for name in existing}
+    return sorted(name for name, month in months.items() if month is not None and month < cutoff)
+
+
+def create_partition_statements(table: PartitionedTable, month: date) -> List[str]:
+    """
+    DDL creating the partition for one month.
+
+    The partition is built detached, takes over any rows of that month that
+    landed in the default partition, then is attached; attaching a range that
+    still has rows in the default partition would fail.
+
+    Args:
+        table: Partitioned table
+        month: First day of the month
+
+    Returns:
+        list: SQL statements to run in one transaction
+    """
+    name = partition_name(table.name, month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    in_range = f"{table.column} >= '{lower} 00:00:00+00' AND {table.column} < '{upper} 00:00:00+00'"
+    return [
+        f"CREATE TABLE {name} (LIKE {table.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {table.name}_default WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table.name} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')",
+    ]
+
+
+def drop_partition_statements(table: PartitionedTable, name: str) -> List[str]:
+    return [
+        f"ALTER TABLE {table.name} DETACH PARTITION {name}",
+        f"DROP TABLE {name}",
+    ]
+
+
+def default_months_statement(table: PartitionedTable) -> str:
+    """Query for the (UTC) months that have rows in the default partition."""
+    return (
+        f"SELECT DISTINCT CAST(date_trunc('month', {table.column} AT TIME ZONE 'UTC') AS date) "
+        f"FROM {table.name}_default"
+    )
+
+
+def purge_default_statement(table: PartitionedTable, cutoff: date) -> str:
+    """DELETE of default-partition rows older than the retention cutoff."""
+    return f"DELETE FROM {table.name}_default WHERE {table.column} < '{cutoff.isoformat()} 00:00:00+00'"
+
+
+class PartitionMaintainer:
+    """Creates upcoming monthly partitions, drops expired ones and purges expired default-partition rows."""
+
+    def __init__(
+        self,
+        tables: Sequence[PartitionedTable] = PARTITIONED_TABLES,
+        months_ahead: int = settings.partition_months_ahead,
+        interval_seconds: float = settings.partition_maintenance_interval_seconds
+    ):
+        self.tables = tables
+        self.months_ahead = months_ahead
+        self.interval_seconds = interval_seconds
+        self.created = 0
+        self.dropped = 0
+        self.purged = 0
+        self.failures = 0
+        self.last_run_at: Optional[datetime] = None
+
+    def maintain(self, connection: Connection, now: datetime) -> Dict[str, Any]:
+        """
+        Run one maintenance pass in the connection's transaction.
+
+        Does nothing on databases other than Postgres, on tables that are not
+        partitioned, or while another worker holds the maintenance lock.
+
+        Args:
+            connection: Connection with an open transaction (the caller commits)
+            now: Current time
+
+        Returns:
+            dict: Names of the partitions "created" and "dropped", and rows
+            "purged" per default partition
+        """
+        changes: Dict[str, Any] = {"created": [], "dropped": [], "purged": {}}
+        if connection.dialect.name != "postgresql":
+            return changes
+        if not connection.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar():
+            return changes
+
+        for table in self.tables:
+            relkind = connection.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table.name}
+            ).scalar()
+            if relkind != "p":
+                continue
+            existing = connection.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(:name)"
+            ), {"name": table.name}).scalars().all()
+
+            default_months = connection.execute(text(default_months_statement(table))).scalars().all()
+            for month in missing_partitions(table, existing, now, self.months_ahead, default_months):
+                for statement in create_partition_statements(table, month):
+                    connection.execute(text(statement))
+                changes["created"].append(partition_name(table.name, month))
+            cutoff = retention_cutoff(table, now)
+            if cutoff is not None and any(month < cutoff for month in default_months):
+                purged = connection.execute(text(purge_default_statement(table, cutoff))).rowcount
+                changes["purged"][f"{table.name}_default"] = purged
+            for name in expired_partitions(table, existing, now):
+                for statement in drop_partition_statements(table, name):
+                    connection.execute(text(statement))
+                changes["dropped"].append(name)
+        return changes
+
+    def run_once(self, engine: Engine = default_engine, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Run one maintenance pass in its own transaction."""
+        now = now or datetime.now(timezone.utc)
+        with engine.begin() as connection:
+            changes = self.maintain(connection, now)
+        self.created += len(changes["created"])
+        self.dropped += len(changes["dropped"])
+        self.purged += sum(changes["purged"].values())
+        self.last_run_at = now
+        for name in changes["created"]:
+            logger.info(f"Created partition {name}")
+        for name in changes["dropped"]:
+            logger.info(f"Dropped expired partition {name}")
+        for name, rows in changes["purged"].items():
+            logger.info(f"Purged {rows} expired rows from {name}")
+        return changes
+
+    async def run(self) -> None:
+        """Run maintenance every ``interval_seconds`` until cancelled."""
+        while True:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.run_once)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get maintenance metrics.
+
+        Returns:
+            dict: Partitions created and dropped, default rows purged, failed passes and the last run time
+        """
+        return {
+            "created": self.created,
+            "dropped": self.dropped,
+            "purged": self.purged,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+partition_maintainer = PartitionMaintainer()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(partition_maintainer.run_once())
@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import asyncio
+import logging
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from ..database import AsyncSessionLocal
+from ..models.medicine import Medicine, MedicineReminder
+from ..models.user import UserProfile
+from ..utils.notifications import get_push_transport, get_reminder_template, send_bulk_push_notifications
+from .device_tokens import device_token_registry, invalid_tokens
+from .reminder_scheduler import DueReminder
+
+logger = logging.getLogger(__name__)
+
+# (medicine name, dosage, locale): reminders with this key get the same push
+PayloadKey = Tuple[str, str, str]
+
+
+class ReminderDispatcher:
+    """
+    Turns a batch of due reminders into as few provider calls as possible.
+
+    Reminders are grouped by medicine name, dosage and language, the
+    localized payload is rendered once per group from a cached template, and
+    every device in the group is reached with one chunked multicast.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.reminders = 0
+        self.groups = 0
+        self.provider_calls = 0
+        self.delivered = 0
+        self.failed = 0
+
+    async def dispatch(self, due: List[DueReminder]) -> None:
+        """
+        Send pushes for due reminders and record when each was sent.
+
+        Matches the scheduler's ``DueHandler`` signature.
+
+        Args:
+            due: Reminders popped from the scheduler
+        """
+        if not due:
+            return
+        async with self.session_factory() as db:
+            groups = await self.group(db, due)
+            user_ids = sorted({item.reminder.user_id for item in due})
+            registered = await device_token_registry.tokens_for_users(db, user_ids)
+
+            sends = [
+                self._send_group(key, items, registered)
+                for key, items in groups.items()
+            ]
+            dead_tokens: List[str] = []
+            for group_dead in await asyncio.gather(*sends):
+                dead_tokens.extend(group_dead)
+            if dead_tokens:
+                await device_token_registry.prune(db, dead_tokens)
+
+            await self._mark_sent(db, due)
+            await db.commit()
+        self.reminders += len(due)
+
+    async def group(self, db: AsyncSession, due: List[DueReminder]) -> Dict[PayloadKey, List[DueReminder]]:
+        """
+        Group due reminders by the push payload they will receive.
+
+        Args:
+            db: Async database session
+            due: Reminders popped from the scheduler
+
+        Returns:
+            dict: Payload key to the reminders sharing it (users with pushes
+            turned off are left out)
+        """
+        medicine_ids = {item.reminder.medicine_id for item in due}
+        user_ids = {item.reminder.user_id for item in due}
+        result = await db.execute(
+            select(Medicine.id, Medicine.name, Medicine.dosage).where(Medicine.id.in_(medicine_ids))
+        )
+        medicines = {row.id: (row.name, row.dosage) for row in result}
+        result = await db.execute(
+            select(
+                UserProfile.user_id,
+                UserProfile.preferred_language,
+                UserProfile.notifications_enabled,
+                UserProfile.push_notifications
+            ).where(UserProfile.user_id.in_(user_ids))
+        )
+        languages = {}
+        muted = set()
+        for row in result:
+            languages[row.user_id] = row.preferred_language
+            if row.notifications_enabled is False or row.push_notifications is False:
+                muted.add(row.user_id)
+
+        groups: Dict[PayloadKey, List[DueReminder]] = {}
+        for item in due:
+            medicine = medicines.get(item.reminder.medicine_id)
+            if medicine is None or item.reminder.user_id in muted:
+                continue  # medicine deleted since the reminder was loaded, or pushes turned off
+            locale = get_reminder_template(languages.get(item.reminder.user_id)).locale
+            groups.setdefault((medicine[0], medicine[1], locale), []).append(item)
+        return groups
+
+    async def _send_group(
+        self,
+        key: PayloadKey,
+        items: List[DueReminder],
+        registered: Dict[int, List[str]]
+    ) -> List[str]:
+        medicine_name, dosage, locale = key
+        tokens = list(dict.fromkeys(
+            token for item in items for token in registered.get(item.reminder.user_id, [])
+        ))
+        self.groups += 1
+        if not tokens:
+            return []
+
+        payload = get_reminder_template(locale).render(medicine_name, dosage)
+        result = await send_bulk_push_notifications(
+            tokens, payload["title"], payload["body"], payload["data"], "medicine_reminder"
+        )
+        self.provider_calls += -(-len(tokens) // get_push_transport().max_batch_size)
+        self.delivered += result["success_count"]
+        self.failed += result["failure_count"]
+        return invalid_tokens(result["responses"])
+
+    async def _mark_sent(self, db: AsyncSession, due: List[DueReminder]) -> None:
+        by_time: Dict[datetime, List[int]] = {}
+        for item in due:
+            by_time.setdefault(item.fire_at, []).append(item.reminder.reminder_id)
+        for fire_at, reminder_ids in by_time.items():
+            # updated_at is kept as is so the scheduler's change sync does not
+            # reload every reminder it has just fired
+            await db.execute(
+                update(MedicineReminder)
+                .where(MedicineReminder.id.in_(reminder_ids))
+                .values(
+                    notification_sent=True,
+                    last_notification_sent=fire_at,
+                    updated_at=MedicineReminder.updated_at
+                )
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get dispatch metrics.
+
+        Returns:
+            dict: Reminders dispatched, payload groups, provider calls and token outcomes
+        """
+        return {
+            "reminders": self.reminders,
+            "groups": self.groups,
+            "provider_calls": self.provider_calls,
+            "delivered": self.delivered,
+            "failed": self.failed,
+        }
+
+
+reminder_dispatcher = ReminderDispatcher()
@@ -0,0 +1,486 @@
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import asyncio
+import heapq
+import logging
+from sqlalchemy import func, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.medicine import MedicineReminder
+from ..models.user import UserProfile
+
+logger = logging.getLogger(__name__)
+
+ALL_DAYS = frozenset(range(1, 8))
+
+
+@dataclass(frozen=True)
+class ScheduledReminder:
+    """The parts of a MedicineReminder the scheduler needs to compute fire times."""
+    reminder_id: int
+    user_id: int
+    medicine_id: int
+    reminder_time: dt_time
+    days_of_week: FrozenSet[int]  # ISO weekdays, 1=Monday
+    timezone: str = "UTC"
+    snooze_until: Optional[datetime] = None
+
+
+class DueReminder(NamedTuple):
+    """A reminder whose fire time has been reached."""
+    reminder: ScheduledReminder
+    fire_at: datetime
+
+
+def parse_days_of_week(value: Optional[str]) -> FrozenSet[int]:
+    """
+    Parse the comma-separated ``days_of_week`` column.
+    
+    Args:
+        value: e.g. "1,3,5" (1=Monday); empty means every day
+        
+    Returns:
+        frozenset: ISO weekday numbers
+    """
+    if not value:
+        return ALL_DAYS
+    days = frozenset(int(day) for day in value.split(",") if day.strip())
+    return days & ALL_DAYS
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str) -> ZoneInfo:
+    """Return a cached ZoneInfo, falling back to UTC for unknown names."""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {name!r}, using UTC")
+        return ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=65536)
+def _local_to_utc(zone_name: str, day: date, reminder_time: dt_time) -> datetime:
+    local = datetime.combine(day, reminder_time, tzinfo=get_zone(zone_name))
+    return local.astimezone(timezone.utc)
+
+
+def next_fire_time(reminder: ScheduledReminder, after: datetime) -> Optional[datetime]:
+    """
+    Compute the next UTC fire time strictly after ``after``.
+    
+    An active snooze wins over the regular schedule.
+    
+    Args:
+        reminder: Reminder to schedule
+        after: Aware UTC datetime
+        
+    Returns:
+        datetime: Next fire time in UTC, or None if the reminder has no days
+    """
+    if reminder.snooze_until is not None:
+        snooze_until = reminder.snooze_until
+        if snooze_until.tzinfo is None:
+            snooze_until = snooze_until.replace(tzinfo=timezone.utc)
+        if snooze_until > after:
+            return snooze_until.astimezone(timezone.utc)
+    
+    if not reminder.days_of_week:
+        return None
+    
+    local_day = after.astimezone(get_zone(reminder.timezone)).date()
+    for offset in range(8):
+        day = local_day + timedelta(days=offset)
+        if day.isoweekday() not in reminder.days_of_week:
+            continue
+        candidate = _local_to_utc(reminder.timezone, day, reminder.reminder_time)
+        if candidate > after:
+            return candidate
+    return None
+
+
+# Reminder columns the scheduler reads, with the owner's timezone
+REMINDER_COLUMNS = (
+    MedicineReminder.id,
+    MedicineReminder.user_id,
+    MedicineReminder.medicine_id,
+    MedicineReminder.reminder_time,
+    MedicineReminder.days_of_week,
+    MedicineReminder.is_active,
+    MedicineReminder.snooze_until,
+    UserProfile.timezone,
+)
+
+
+class ReminderChanges(NamedTuple):
+    """Rows read for one sync, applied to the schedule afterwards."""
+    read_at: datetime  # database time the read started, the next watermark
+    timezones: List[Tuple[int, Optional[str]]]  # (user_id, timezone) of changed profiles
+    reminders: List[Row]  # REMINDER_COLUMNS of new or changed reminders (every active one on a full read)
+    live_ids: Optional[Set[int]] = None  # every active reminder, on a full read
+
+
+def database_now(db: Session) -> datetime:
+    """
+    Current time on the database clock, as aware UTC.
+
+    Watermarks are compared with created_at/updated_at, which the database
+    stamps, so they come from the same clock rather than the app's.
+    """
+    value = db.execute(select(func.now())).scalar()
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def read_changes(
+    db: Session,
+    since: Optional[datetime],
+    reconcile: bool = False,
+    batch_size: int = 10000
+) -> ReminderChanges:
+    """
+    Read what changed since ``since`` without touching any schedule.
+    
+    Safe to run in a worker thread; the result is applied with
+    ReminderScheduler.apply_changes on the thread that owns the schedule.
+    With ``since=None`` or ``reconcile`` every active reminder is read (a
+    full read), which also catches changes an incremental read missed.
+    
+    Args:
+        db: Database session
+        since: Read rows created or updated at or after this database time
+        reconcile: Read every active reminder, so missed updates are applied
+            and reminders deleted from the database are dropped
+        batch_size: Rows fetched per round trip
+        
+    Returns:
+        ReminderChanges: Rows to apply
+    """
+    read_at = database_now(db)  # before the reads, so later writes are stamped at or after it
+    query = (
+        select(*REMINDER_COLUMNS)
+        .outerjoin(UserProfile, UserProfile.user_id == MedicineReminder.user_id)
+        .execution_options(yield_per=batch_size)
+    )
+    if since is None or reconcile:
+        reminders = list(db.execute(query.where(MedicineReminder.is_active.is_(True))))
+        return ReminderChanges(read_at, [], reminders, {row.id for row in reminders})
+    
+    timezones = list(db.execute(
+        select(UserProfile.user_id, UserProfile.timezone)
+        .where(UserProfile.updated_at >= since)
+    ))
+    reminders = list(db.execute(
+        query.where(or_(MedicineReminder.created_at >= since, MedicineReminder.updated_at >= since))
+    ))
+    return ReminderChanges(read_at, timezones, reminders)
+
+
+class ReminderScheduler:
+    """
+    In-memory scheduler for active medicine reminders.
+    
+    Reminders sit in a min-heap keyed by their next UTC fire time, so firing
+    costs O(due * log n) instead of a scan of every reminder. Updates and
+    removals are applied lazily: each reminder has a version, and heap entries
+    with an outdated version are skipped when they surface.
+    
+    Not thread-safe: every method must run on the thread that owns the
+    scheduler (the event loop in run_scheduler). Only read_changes, which
+    does not touch the schedule, may run elsewhere.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int]] = []  # (fire timestamp, reminder_id, version)
+        self._entries: Dict[int, Tuple[ScheduledReminder, int]] = {}
+        self._by_user: Dict[int, Set[int]] = {}
+        self._user_timezones: Dict[int, str] = {}
+        self._version = 0
+        self.fired = 0
+        self.reconciled = 0
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def upsert(self, reminder: ScheduledReminder, now: datetime) -> Optional[datetime]:
+        """
+        Add or replace a reminder.
+        
+        Args:
+            reminder: Reminder state
+            now: Current aware UTC time
+            
+        Returns:
+            datetime: The reminder's next fire time, if any
+        """
+        self._version += 1
+        self._entries[reminder.reminder_id] = (reminder, self._version)
+        self._by_user.setdefault(reminder.user_id, set()).add(reminder.reminder_id)
+        fire_at = next_fire_time(reminder, now)
+        if fire_at is not None:
+            heapq.heappush(self._heap, (fire_at.timestamp(), reminder.reminder_id, self._version))
+        self._maybe_compact()
+        return fire_at
+
+    def remove(self, reminder_id: int) -> None:
+        """Stop scheduling a reminder (deactivated or deleted)."""
+        entry = self._entries.pop(reminder_id, None)
+        if entry is not None:
+            user_reminders = self._by_user.get(entry[0].user_id)
+            if user_reminders is not None:
+                user_reminders.discard(reminder_id)
+        self._maybe_compact()
+
+    def set_user_timezone(self, user_id: int, timezone_name: str, now: datetime) -> None:
+        """Reschedule a user's reminders after their timezone changed."""
+        self._user_timezones[user_id] = timezone_name
+        for reminder_id in list(self._by_user.get(user_id, ())):
+            reminder = self._entries[reminder_id][0]
+            if reminder.timezone != timezone_name:
+                self.upsert(replace(reminder, timezone=timezone_name), now)
+
+    def pop_due(self, now: datetime) -> List[DueReminder]:
+        """
+        Remove and return every reminder due at or before ``now``.
+        
+        Each fired reminder is rescheduled for its next occurrence after
+        ``now`` (missed occurrences during downtime fire once, not repeatedly).
+        
+        Args:
+            now: Current aware UTC time
+            
+        Returns:
+            list: Due reminders in fire-time order
+        """
+        due = []
+        cutoff = now.timestamp()
+        while self._heap and self._heap[0][0] <= cutoff:
+            fire_ts, reminder_id, version = heapq.heappop(self._heap)
+            entry = self._entries.get(reminder_id)
+            if entry is None or entry[1] != version:
+                continue
+            reminder = entry[0]
+            due.append(DueReminder(reminder, datetime.fromtimestamp(fire_ts, tz=timezone.utc)))
+            if reminder.snooze_until is not None:
+                reminder = replace(reminder, snooze_until=None)
+            self.upsert(reminder, now)
+        self.fired += len(due)
+        return due
+
+    def next_fire_at(self) -> Optional[datetime]:
+        """Earliest pending fire time, if any."""
+        while self._heap:
+            fire_ts, reminder_id, version = self._heap[0]
+            entry = self._entries.get(reminder_id)
+            if entry is not None and entry[1] == version:
+                return datetime.fromtimestamp(fire_ts, tz=timezone.utc)
+            heapq.heappop(self._heap)
+        return None
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            live = {rid: version for rid, (_, version) in self._entries.items()}
+            self._heap = [item for item in self._heap if live.get(item[1]) == item[2]]
+            heapq.heapify(self._heap)
+
+    def apply_rows(self, rows: Iterable[Row], now: datetime) -> int:
+        """
+        Apply reminder rows (with their user's timezone) to the schedule.
+        
+        Rows matching what is already scheduled are skipped, so re-reading
+        unchanged rows does not grow the heap.
+        
+        Args:
+            rows: REMINDER_COLUMNS rows
+            now: Current aware UTC time
+            
+        Returns:
+            int: Number of rows that changed the schedule
+        """
+        count = 0
+        for row in rows:
+            current = self._entries.get(row.id)
+            if not row.is_active:
+                if current is not None:
+                    self.remove(row.id)
+                    count += 1
+                continue
+            tz_name = row.timezone or self._user_timezones.get(row.user_id, "UTC")
+            reminder = ScheduledReminder(
+                reminder_id=row.id,
+                user_id=row.user_id,
+                medicine_id=row.medicine_id,
+                reminder_time=row.reminder_time,
+                days_of_week=parse_days_of_week(row.days_of_week),
+                timezone=tz_name,
+                snooze_until=row.snooze_until
+            )
+            if current is None or current[0] != reminder:
+                self.upsert(reminder, now)
+                count += 1
+        return count
+
+    def apply_changes(self, changes: ReminderChanges, now: datetime) -> int:
+        """
+        Apply rows read by read_changes and advance the watermark.
+        
+        Args:
+            changes: Result of read_changes
+            now: Current aware UTC time
+            
+        Returns:
+            int: Number of reminders added, changed or removed
+        """
+        for user_id, timezone_name in changes.timezones:
+            self.set_user_timezone(user_id, timezone_name or "UTC", now)
+        count = self.apply_rows(changes.reminders, now)
+        if changes.live_ids is not None:
+            gone = set(self._entries) - changes.live_ids
+            for reminder_id in gone:
+                self.remove(reminder_id)
+            count += len(gone)
+            if self.watermark is not None:  # a reconcile, not the initial load
+                self.reconciled += count
+        self.watermark = changes.read_at
+        return count
+
+    def load(self, db: Session, now: datetime, batch_size: int = 10000) -> int:
+        """
+        Load every active reminder from the database.
+        
+        Args:
+            db: Database session
+            now: Current aware UTC time
+            batch_size: Rows fetched per round trip
+            
+        Returns:
+            int: Number of reminders loaded
+        """
+        return self.apply_changes(read_changes(db, None, batch_size=batch_size), now)
+
+    def sync_changes(
+        self,
+        db: Session,
+        now: datetime,
+        overlap: timedelta = timedelta(seconds=30),
+        reconcile: bool = False
+    ) -> int:
+        """
+        Apply reminders and timezones changed since the last sync.
+        
+        Only rows created or updated after the watermark are read, so each
+        sync costs O(changes). The watermark is the database time the
+        previous read started, and created_at/updated_at are stamped by the
+        database when the writing transaction starts, so app clock skew does
+        not matter; the overlap re-reads rows from transactions that were
+        still open at the previous read (applying a row twice is harmless). A
+        write from a transaction open longer than ``overlap``, like a deleted
+        row, leaves nothing the next read would see, so both are only caught
+        by ``reconcile``: a full read that applies every reminder that differs
+        from the schedule and drops those no longer in the database.
+        
+        Args:
+            db: Database session
+            now: Current aware UTC time
+            overlap: How far before the watermark to look
+            reconcile: Do a full read instead
+            
+        Returns:
+            int: Number of reminders added, changed or removed
+        """
+        return self.apply_changes(read_changes(db, self.sync_since(overlap), reconcile), now)
+
+    def sync_since(self, overlap: timedelta = timedelta(seconds=30)) -> Optional[datetime]:
+        """Start of the next change read, in database time (None before the first load)."""
+        return self.watermark - overlap if self.watermark is not None else None
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get scheduler metrics.
+        
+        Returns:
+            dict: Scheduled count, heap size, fired count, reminders repaired by reconciles and next fire time
+        """
+        next_fire = self.next_fire_at()
+        return {
+            "scheduled": len(self._entries),
+            "heap_size": len(self._heap),
+            "fired": self.fired,
+            "reconciled": self.reconciled,
+            "next_fire_at": next_fire.isoformat() if next_fire else None,
+        }
+
+
+DueHandler = Callable[[List[DueReminder]], Awaitable[None]]
+
+
+async def log_due_reminders(due: List[DueReminder]) -> None:
+    """Default handler: log due reminders."""
+    for item in due:
+        logger.info(f"Reminder {item.reminder.reminder_id} due at {item.fire_at.isoformat()}")
+
+
+reminder_scheduler = ReminderScheduler()
+
+
+async def run_scheduler(
+    scheduler: ReminderScheduler = reminder_scheduler,
+    handler: DueHandler = log_due_reminders,
+    tick_seconds: Optional[float] = None,
+    sync_seconds: Optional[float] = None,
+    reconcile_seconds: Optional[float] = None
+) -> None:
+    """
+    Fire due reminders and apply database changes until cancelled.
+    
+    Database reads run in the default executor; the rows are applied back on
+    the event loop, which is the only thread that touches the schedule.
+    
+    Args:
+        scheduler: Scheduler to drive
+        handler: Coroutine called with each batch of due reminders
+        tick_seconds: Delay between due checks
+        sync_seconds: Delay between change syncs
+        reconcile_seconds: Delay between full reads (missed updates and deleted reminders)
+    """
+    tick_seconds = tick_seconds or settings.reminder_scheduler_tick_seconds
+    sync_seconds = sync_seconds or settings.reminder_scheduler_sync_seconds
+    reconcile_seconds = reconcile_seconds or settings.reminder_scheduler_reconcile_seconds
+    last_sync = None
+    last_reconcile = None
+    
+    def read(since: Optional[datetime], reconcile: bool) -> ReminderChanges:
+        with SessionLocal() as db:
+            return read_changes(db, since, reconcile)
+    
+    while True:
+        now = datetime.now(timezone.utc)
+        try:
+            due = scheduler.pop_due(now)
+            if due:
+                await handler(due)
+            if last_sync is None or (now - last_sync).total_seconds() >= sync_seconds:
+                reconcile = last_reconcile is None or (now - last_reconcile).total_seconds() >= reconcile_seconds
+                changes = await asyncio.get_running_loop().run_in_executor(
+                    None, read, scheduler.sync_since(), reconcile
+                )
+                scheduler.apply_changes(changes, now)
+                last_sync = now
+                if reconcile:
+                    last_reconcile = now
+        except Exception as e:
+            logger.error(f"Reminder scheduler tick failed: {e}")
+        await asyncio.sleep(tick_seconds)
+
+
+if __name__ == "__main__":
+    from app.services.reminder_dispatch import reminder_dispatcher
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_scheduler(handler=reminder_dispatcher.dispatch))
@@ -0,0 +1,353 @@
+"""
+Hourly and daily rollups of vital signs for trend queries.
+
+Rollups are kept current as readings are written: inserts add to the
+count/sum and widen min/max of their buckets with one upsert per resolution,
+while corrections and deletions recompute the affected buckets from the raw
+readings (min and max cannot be un-applied). Bulk inserts that bypass the ORM
+call add_readings; ORM writes are covered by the mapper events below. To
+rebuild every rollup from the raw readings:
+
+    python -m app.services.rollups
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+import logging
+import math
+from sqlalchemy import and_, case, delete, event, insert, inspect, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.health import VitalRollupDaily, VitalRollupHourly, VitalSigns
+
+logger = logging.getLogger(__name__)
+
+# Metrics rolled up: metric name -> VitalSigns column holding its value in canonical units
+METRICS = {
+    "systolic_bp": "systolic_bp",
+    "diastolic_bp": "diastolic_bp",
+    "heart_rate": "heart_rate",
+    "blood_glucose": "glucose_mg_dl",
+    "oxygen_saturation": "oxygen_saturation",
+    "weight": "weight_kg",
+}
+
+
+class Resolution(NamedTuple):
+    name: str
+    model: type
+    seconds: int
+
+
+HOURLY = Resolution("hour", VitalRollupHourly, 3600)
+DAILY = Resolution("day", VitalRollupDaily, 86400)
+RESOLUTIONS = (HOURLY, DAILY)  # finest first
+
+BucketKey = Tuple[int, str, datetime]  # (user_id, metric, bucket_start)
+
+# Buckets per upsert, keeping bind parameters under SQLite's limit
+UPSERT_CHUNK_ROWS = 500
+
+
+class Aggregate:
+    """Count, sum, min and max of the values in one bucket."""
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def bucket_start(value: datetime, resolution: Resolution) -> datetime:
+    """Start of the UTC bucket containing ``value``."""
+    value = _utc(value).replace(minute=0, second=0, microsecond=0)
+    if resolution.seconds >= DAILY.seconds:
+        value = value.replace(hour=0)
+    return value
+
+
+def aggregate(readings: Iterable[Mapping[str, Any]], resolution: Resolution) -> Dict[BucketKey, Aggregate]:
+    """
+    Group reading values into buckets.
+
+    Args:
+        readings: Mappings with user_id, measurement_date and the metric columns
+        resolution: Bucket size
+
+    Returns:
+        dict: (user_id, metric, bucket_start) to its Aggregate
+    """
+    buckets: Dict[BucketKey, Aggregate] = {}
+    for reading in readings:
+        start = bucket_start(reading["measurement_date"], resolution)
+        for metric, column in METRICS.items():
+            value = reading[column]
+            if value is None:
+                continue
+            key = (reading["user_id"], metric, start)
+            if key not in buckets:
+                buckets[key] = Aggregate()
+            buckets[key].add(float(value))
+    return buckets
+
+
+def rollup_rows(buckets: Dict[BucketKey, Aggregate]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "user_id": user_id, "metric": metric, "bucket_start": start,
+            "sample_count": agg.count, "value_sum": agg.total,
+            "value_min": agg.minimum, "value_max": agg.maximum,
+        }
+        for (user_id, metric, start), agg in buckets.items()
+    ]
+
+
+def increment_statements(dialect_name: str, readings: Sequence[Mapping[str, Any]]):
+    """
+    Upserts adding new readings to their hourly and daily buckets.
+
+    Args:
+        dialect_name: Database dialect ("postgresql" or "sqlite")
+        readings: Newly inserted readings
+
+    Returns:
+        list: Upsert statements, in chunks of UPSERT_CHUNK_ROWS buckets
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statements = []
+    for resolution in RESOLUTIONS:
+        table = resolution.model.__table__
+        rows = rollup_rows(aggregate(readings, resolution))
+        for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            statements.append(upsert(dialect, table, rows[start:start + UPSERT_CHUNK_ROWS]))
+    return statements
+
+
+def upsert(dialect, table, rows: List[Dict[str, Any]]):
+    """Insert bucket rows, merging into existing buckets."""
+    stmt = dialect.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.metric, table.c.bucket_start],
+        set_={
+            "sample_count": table.c.sample_count + stmt.excluded.sample_count,
+            "value_sum": table.c.value_sum + stmt.excluded.value_sum,
+            "value_min": case(
+                (stmt.excluded.value_min < table.c.value_min, stmt.excluded.value_min),
+                else_=table.c.value_min
+            ),
+            "value_max": case(
+                (stmt.excluded.value_max > table.c.value_max, stmt.excluded.value_max),
+                else_=table.c.value_max
+            ),
+        }
+    )
+
+
+# Columns read back from inserted readings to maintain the rollups
+READING_COLUMNS = [VitalSigns.user_id, VitalSigns.measurement_date] + [
+    getattr(VitalSigns, column) for column in sorted(set(METRICS.values()))
+]
+
+
+async def add_readings(db: AsyncSession, readings: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Add newly inserted readings to the rollups in the caller's transaction.
+
+    Args:
+        db: Async database session (the caller commits)
+        readings: Inserted rows with the READING_COLUMNS
+    """
+    for stmt in increment_statements(db.bind.dialect.name, readings):
+        await db.execute(stmt)
+
+
+def recompute(connection: Connection, user_id: int, timestamps: Iterable[datetime]) -> None:
+    """
+    Rebuild the hourly and daily buckets containing ``timestamps`` from the raw readings.
+
+    Args:
+        connection: Connection in the transaction that changed the readings
+        user_id: Owner of the readings
+        timestamps: Measurement dates before and after the change
+    """
+    timestamps = list(timestamps)
+    days = {bucket_start(value, DAILY) for value in timestamps}
+    if not days:
+        return
+    readings = connection.execute(
+        select(*READING_COLUMNS).where(
+            VitalSigns.user_id == user_id,
+            or_(*(
+                and_(VitalSigns.measurement_date >= day, VitalSigns.measurement_date < day + timedelta(days=1))
+                for day in days
+            ))
+        )
+    ).mappings().all()
+
+    for resolution in RESOLUTIONS:
+        model = resolution.model
+        starts = {bucket_start(value, resolution) for value in timestamps}
+        buckets = {key: agg for key, agg in aggregate(readings, resolution).items() if key[2] in starts}
+        connection.execute(delete(model).where(model.user_id == user_id, model.bucket_start.in_(starts)))
+        rows = rollup_rows(buckets)
+        if rows:
+            connection.execute(insert(model), rows)
+
+
+def rebuild(connection: Connection, batch_users: int = 100) -> int:
+    """
+    Recompute every rollup from the raw readings, one batch of users at a time.
+
+    Args:
+        connection: Connection with an open transaction (the caller commits)
+        batch_users: Users whose readings are aggregated per batch
+
+    Returns:
+        int: Number of users rebuilt
+    """
+    user_ids = connection.execute(select(VitalSigns.user_id).distinct().order_by(VitalSigns.user_id)).scalars().all()
+    for start in range(0, len(user_ids), batch_users):
+        batch = user_ids[start:start + batch_users]
+        readings = connection.execute(
+            select(*READING_COLUMNS).where(VitalSigns.user_id.in_(batch))
+        ).mappings().all()
+        for resolution in RESOLUTIONS:
+            model = resolution.model
+            connection.execute(delete(model).where(model.user_id.in_(batch)))
+            rows = rollup_rows(aggregate(readings, resolution))
+            if rows:
+                connection.execute(insert(model), rows)
+    return len(user_ids)
+
+
+def choose_resolution(start: datetime, end: datetime, max_points: int) -> Tuple[Resolution, int]:
+    """
+    Pick the finest resolution whose buckets over the window fit the point budget.
+
+    Args:
+        start: Window start
+        end: Window end
+        max_points: Most points the client wants
+
+    Returns:
+        tuple: (resolution to read, buckets of it merged per point)
+    """
+    window = (end - start).total_seconds()
+    for resolution in RESOLUTIONS:
+        if math.ceil(window / resolution.seconds) <= max_points:
+            return resolution, 1
+    return DAILY, math.ceil(window / DAILY.seconds / max_points)
+
+
+async def trend(
+    db: AsyncSession,
+    user_id: int,
+    metric: str,
+    start: datetime,
+    end: datetime,
+    max_points: int
+) -> Tuple[str, int, List[Dict[str, Any]]]:
+    """
+    Read a metric's trend from the rollups, at most ``max_points`` points.
+
+    Windows too long for daily points merge consecutive days, which is exact
+    for count, sum, min and max.
+
+    Args:
+        db: Async database session
+        user_id: Owner of the readings
+        metric: One of METRICS
+        start: Window start (inclusive)
+        end: Window end (exclusive)
+        max_points: Point budget
+
+    Returns:
+        tuple: (resolution name, bucket seconds, points oldest first)
+    """
+    resolution, merge = choose_resolution(start, end, max_points)
+    model = resolution.model
+    origin = bucket_start(start, resolution)
+    rows = (await db.execute(
+        select(model).where(
+            model.user_id == user_id,
+            model.metric == metric,
+            model.bucket_start >= origin,
+            model.bucket_start < _utc(end)
+        ).order_by(model.bucket_start)
+    )).scalars().all()
+
+    step = resolution.seconds * merge
+    merged: Dict[datetime, Aggregate] = {}
+    for row in rows:
+        offset = (_utc(row.bucket_start) - origin).total_seconds() // step
+        key = origin + timedelta(seconds=offset * step)
+        agg = merged.setdefault(key, Aggregate())
+        agg.count += row.sample_count
+        agg.total += row.value_sum
+        agg.minimum = min(agg.minimum, row.value_min)
+        agg.maximum = max(agg.maximum, row.value_max)
+
+    points = [
+        {"bucket_start": key, "count": agg.count, "mean": agg.total / agg.count,
+         "min": agg.minimum, "max": agg.maximum}
+        for key, agg in merged.items()
+    ]
+    name = resolution.name if merge == 1 else f"{merge}d"
+    return name, step, points
+
+
+def _reading(target: VitalSigns) -> Dict[str, Any]:
+    return {column.key: getattr(target, column.key) for column in READING_COLUMNS}
+
+
+@event.listens_for(VitalSigns, "after_insert")
+def _reading_inserted(mapper, connection: Connection, target: VitalSigns) -> None:
+    for stmt in increment_statements(connection.dialect.name, [_reading(target)]):
+        connection.execute(stmt)
+
+
+@event.listens_for(VitalSigns.measurement_date, "set", active_history=True)
+@event.listens_for(VitalSigns.user_id, "set", active_history=True)
+def _keep_previous_bucket(target: VitalSigns, value, previous, initiator) -> None:
+    """Load the old value on change (even if expired) so its bucket is recomputed too."""
+
+
+@event.listens_for(VitalSigns, "after_update")
+def _reading_corrected(mapper, connection: Connection, target: VitalSigns) -> None:
+    state = inspect(target)
+    tracked = ["measurement_date", "user_id"] + list(METRICS.values())
+    histories = {key: state.attrs[key].history for key in tracked}
+    if not any(history.has_changes() for history in histories.values()):
+        return
+    timestamps = [target.measurement_date] + list(histories["measurement_date"].deleted or ())
+    previous_owner = (histories["user_id"].deleted or [None])[0]
+    recompute(connection, target.user_id, timestamps)
+    if previous_owner is not None and previous_owner != target.user_id:
+        recompute(connection, previous_owner, timestamps)
+
+
+@event.listens_for(VitalSigns, "after_delete")
+def _reading_deleted(mapper, connection: Connection, target: VitalSigns) -> None:
+    recompute(connection, target.user_id, [target.measurement_date])
+
+
+if __name__ == "__main__":
+    from ..database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as connection:
+        logger.info(f"Rebuilt vital rollups for {rebuild(connection)} users")
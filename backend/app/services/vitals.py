@@ -0,0 +1,297 @@
+"""
+Writing vital signs readings.
+
+Every write also stores the measured values in canonical units (Celsius,
+kg, cm, mg/dL) and computes BMI, so analytics can aggregate the canonical
+columns directly. Readings stored before those columns existed are filled by
+a batched backfill, which then re-flags readings and rebuilds the rollups:
+
+    python -m app.services.vitals --batch-size 10000
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+import argparse
+import logging
+import math
+from sqlalchemy import and_, bindparam, event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.health import VitalSigns
+from ..schemas.health import VitalSignsCreate
+from ..utils.units import to_canonical, to_canonical_array
+from .flags import flag_engine, load_overrides
+from .rollups import READING_COLUMNS, add_readings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Units stored when a reading leaves them out
+DEFAULT_UNITS = {
+    "temperature_unit": "C",
+    "weight_unit": "kg",
+    "height_unit": "cm",
+    "glucose_unit": "mg/dL",
+}
+
+# Columns per row are ~20, so this stays well under SQLite's bind-parameter limit
+INSERT_CHUNK_ROWS = 500
+
+DEDUP_COLUMNS = ("user_id", "device_name", "measurement_date")
+
+# Canonical column -> (measured column, unit column, quantity in app.utils.units)
+CANONICAL_COLUMNS = {
+    "temperature_c": ("temperature", "temperature_unit", "temperature"),
+    "weight_kg": ("weight", "weight_unit", "weight"),
+    "height_cm": ("height", "height_unit", "height"),
+    "glucose_mg_dl": ("blood_glucose", "glucose_unit", "glucose"),
+}
+MEASURED_COLUMNS = [column for measured, unit, _ in CANONICAL_COLUMNS.values() for column in (measured, unit)]
+NORMALIZED_COLUMNS = list(CANONICAL_COLUMNS) + ["bmi"]
+
+
+def body_mass_index(weight_kg: Optional[float], height_cm: Optional[float]) -> Optional[float]:
+    """BMI to one decimal, or None unless both weight and height are known."""
+    if not weight_kg or not height_cm:
+        return None
+    return round(weight_kg / (height_cm / 100) ** 2, 1)
+
+
+def normalize(row: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """
+    Fill the canonical-unit columns and BMI of a reading in place.
+
+    A BMI sent by the client is kept only when the reading has no weight and
+    height to compute it from.
+
+    Args:
+        row: VitalSigns column values
+
+    Returns:
+        The same mapping
+    """
+    for canonical, (measured, unit, quantity) in CANONICAL_COLUMNS.items():
+        row[canonical] = to_canonical(row.get(measured), row.get(unit), quantity)
+    bmi = body_mass_index(row["weight_kg"], row["height_cm"])
+    if bmi is not None:
+        row["bmi"] = bmi
+    return row
+
+
+def vital_row(user_id: int, reading: VitalSignsCreate) -> Dict[str, Any]:
+    """
+    Build the column values stored for one reading.
+
+    Args:
+        user_id: Owner of the reading
+        reading: Validated reading
+
+    Returns:
+        dict: Column name to value for VitalSigns, canonical units included
+    """
+    row = reading.model_dump()
+    for column, unit in DEFAULT_UNITS.items():
+        row[column] = row[column] or unit
+    row["blood_pressure_medication_taken"] = bool(row["blood_pressure_medication_taken"])
+    row["user_id"] = user_id
+    row["is_flagged"] = False
+    return normalize(row)
+
+
+def deduplicate(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeated (device_name, measurement_date) readings within one upload, keeping the first."""
+    seen = set()
+    unique = []
+    for row in rows:
+        key = (row["device_name"], row["measurement_date"])
+        if row["device_name"] is not None and key in seen:
+            continue
+        seen.add(key)
+        unique.append(row)
+    return unique
+
+
+async def insert_vitals(db: AsyncSession, user_id: int, readings: Sequence[VitalSignsCreate]) -> int:
+    """
+    Insert a batch of readings with multi-row INSERTs in the caller's transaction.
+
+    Readings that repeat an existing (user_id, device_name, measurement_date)
+    are skipped with ``ON CONFLICT DO NOTHING``, so a device can resend a
+    window it already synced. Manual readings (no device_name) are never
+    treated as duplicates. Readings are flagged against the user's
+    thresholds, and the inserted ones are added to the rollups.
+
+    Args:
+        db: Async database session (the caller commits)
+        user_id: Owner of the readings
+        readings: Validated readings
+
+    Returns:
+        int: Number of rows inserted
+    """
+    rows = deduplicate(vital_row(user_id, reading) for reading in readings)
+    flag_engine.apply(rows, await load_overrides(db, [user_id]))
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        stmt = dialect.insert(VitalSigns).values(rows[start:start + INSERT_CHUNK_ROWS])
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(DEDUP_COLUMNS)).returning(*READING_COLUMNS)
+        inserted += (await db.execute(stmt)).mappings().all()
+    await add_readings(db, inserted)
+    return len(inserted)
+
+
+async def _device_reading(db: AsyncSession, vital: VitalSigns) -> Optional[VitalSigns]:
+    """The stored reading a device reading duplicates, if any."""
+    result = await db.execute(
+        select(VitalSigns).where(
+            VitalSigns.user_id == vital.user_id,
+            VitalSigns.device_name == vital.device_name,
+            VitalSigns.measurement_date == vital.measurement_date
+        )
+    )
+    return result.scalars().first()
+
+
+async def create_vital(db: AsyncSession, user_id: int, reading: VitalSignsCreate) -> Tuple[VitalSigns, bool]:
+    """
+    Insert one flagged reading and commit, unless it duplicates a synced device reading.
+
+    A concurrent upload of the same device reading can commit between the
+    duplicate check and the insert; the unique index then rejects this one,
+    which is rolled back in favour of the row that won.
+
+    Args:
+        db: Async database session
+        user_id: Owner of the reading
+        reading: Validated reading
+
+    Returns:
+        tuple: (stored row, whether it was newly created)
+    """
+    row = vital_row(user_id, reading)
+    flag_engine.apply([row], await load_overrides(db, [user_id]))
+    vital = VitalSigns(**row)
+    if vital.device_name is not None:
+        existing = await _device_reading(db, vital)
+        if existing is not None:
+            return existing, False
+    db.add(vital)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        existing = await _device_reading(db, vital) if vital.device_name is not None else None
+        if existing is None:
+            raise
+        return existing, False
+    await db.refresh(vital)
+    return vital, True
+
+
+@event.listens_for(VitalSigns, "before_insert")
+@event.listens_for(VitalSigns, "before_update")
+def _normalize_reading(mapper, connection: Connection, target: VitalSigns) -> None:
+    """Keep canonical columns in step with ORM writes and corrections."""
+    row = normalize({column: getattr(target, column) for column in MEASURED_COLUMNS + NORMALIZED_COLUMNS})
+    for column in NORMALIZED_COLUMNS:
+        if getattr(target, column) != row[column]:
+            setattr(target, column, row[column])
+
+
+def _nullable(values: "np.ndarray") -> List[Optional[float]]:
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+def canonical_batch(rows: Sequence[Mapping[str, Any]]) -> Dict[str, List[Optional[float]]]:
+    """
+    Canonical columns and BMI for a batch of stored readings, vectorized per column.
+
+    Args:
+        rows: Mappings with the measured value, unit and bmi columns
+
+    Returns:
+        dict: Column name to one value per row
+    """
+    import numpy as np  # loaded by the backfill, not at app start
+
+    columns = {}
+    for canonical, (measured, unit, quantity) in CANONICAL_COLUMNS.items():
+        values = np.array([row[measured] for row in rows], dtype=float)
+        columns[canonical] = to_canonical_array(values, [row[unit] for row in rows], quantity)
+    weight, height = columns["weight_kg"], columns["height_cm"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        computed = np.round(weight / (height / 100) ** 2, 1)
+    stored = np.array([row["bmi"] for row in rows], dtype=float)
+    columns["bmi"] = np.where((weight > 0) & (height > 0), computed, stored)
+    return {name: _nullable(values) for name, values in columns.items()}
+
+
+def backfill_canonical(connection: Connection, batch_size: int = 10000) -> Dict[str, int]:
+    """
+    Fill the canonical-unit columns and BMI of stored readings, committing once per batch.
+
+    Walks vital_signs in id order, so it can be interrupted and rerun, and
+    only writes rows whose values changed.
+
+    Args:
+        connection: Connection outside a transaction (each batch commits)
+        batch_size: Readings converted per batch
+
+    Returns:
+        dict: Rows "scanned" and "updated"
+    """
+    columns = [VitalSigns.id, VitalSigns.measurement_date] + [
+        getattr(VitalSigns, column) for column in NORMALIZED_COLUMNS + MEASURED_COLUMNS
+    ]
+    # the timestamp lets Postgres update within one partition
+    stmt = update(VitalSigns).where(and_(
+        VitalSigns.id == bindparam("row_id"),
+        VitalSigns.measurement_date == bindparam("row_measured")
+    )).values(
+        updated_at=VitalSigns.updated_at,  # not an edit of the reading
+        **{column: bindparam(f"new_{column}") for column in NORMALIZED_COLUMNS}
+    )
+
+    totals = {"scanned": 0, "updated": 0}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(*columns).where(VitalSigns.id > last_id).order_by(VitalSigns.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        values = canonical_batch(rows)
+        changes = []
+        for i, row in enumerate(rows):
+            new = {column: values[column][i] for column in NORMALIZED_COLUMNS}
+            if any(row[column] != value for column, value in new.items()):
+                changes.append({
+                    "row_id": row["id"], "row_measured": row["measurement_date"],
+                    **{f"new_{column}": value for column, value in new.items()}
+                })
+        if changes:
+            connection.execute(stmt, changes)
+        connection.commit()
+        totals["scanned"] += len(rows)
+        totals["updated"] += len(changes)
+        last_id = rows[-1]["id"]
+    return totals
+
+
+if __name__ == "__main__":
+    from ..database import engine
+    from .flags import backfill as backfill_flags
+    from .rollups import rebuild as rebuild_rollups
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    with engine.connect() as connection:
+        logger.info(f"Canonical units: {backfill_canonical(connection, args.batch_size)}")
+        logger.info(f"Flags: {backfill_flags(connection, args.batch_size)}")
+        logger.info(f"Rollups rebuilt for {rebuild_rollups(connection)} users")
+        connection.commit()
@@ -1,14 +1,27 @@
-from .auth import verify_password, get_password_hash, create_access_token, verify_token
-from .security import encrypt_message, decrypt_message
-from .notifications import send_push_notification, send_email_notification
-
-__all__ = [
-    "verify_password",
-    "get_password_hash", 
-    "create_access_token",
-    "verify_token",
-    "encrypt_message",
-    "decrypt_message",
-    "send_push_notification",
-    "send_email_notification"
-]
\ No newline at end of file
+from importlib import import_module
+
+# Re-exports are resolved on first access, so importing one utility module
+# does not load the others (and their crypto and provider SDK dependencies).
+_EXPORTS = {
+    "verify_password": ".auth",
+    "get_password_hash": ".auth",
+    "create_access_token": ".auth",
+    "verify_token": ".auth",
+    "encrypt_message": ".security",
+    "decrypt_message": ".security",
+    "decrypt_messages": ".security",
+    "conversation_key_id": ".security",
+    "send_push_notification": ".notifications",
+    "send_email_notification": ".notifications"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,306 @@
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+import os
+import struct
+from .security import get_master_key
+
+# Chunked authenticated encryption for attachments (STREAM construction).
+#
+# File layout:
+#   header  = MAGIC | version (1) | chunk_size (4) | nonce_prefix (7) | key_len (2) | wrapped_key
+#   records = AES-GCM(chunk_i) for i in 0..n-1, each chunk_size + 16 bytes except the last
+#
+# Each chunk's nonce is nonce_prefix | i (4 bytes) | last flag (1), and the
+# header is the associated data, so chunks can't be reordered, dropped,
+# truncated away or moved between files. The plaintext is split into full
+# chunks plus a shorter (possibly empty) final chunk, which makes every
+# record's offset computable for random access.
+
+MAGIC = b"SWAE"
+VERSION = 1
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_FIXED_HEADER = struct.Struct(">4sBI7sH")
+
+
+class AttachmentDecryptionError(Exception):
+    """Raised when an encrypted attachment is corrupt, truncated or tampered with."""
+
+
+def _nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if last else 0)
+
+
+class StreamEncryptor:
+    """
+    Incremental encryptor: feed plaintext with update(), then call finalize().
+
+    Memory use is bounded by one chunk regardless of the total size.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, password: str = None):
+        if not 0 < chunk_size < 2 ** 31:
+            raise ValueError("chunk_size out of range")
+        key = AESGCM.generate_key(bit_length=256)
+        wrapped_key = get_master_key(password).encrypt(key)
+        self.chunk_size = chunk_size
+        self._aead = AESGCM(key)
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self.header = _FIXED_HEADER.pack(
+            MAGIC, VERSION, chunk_size, self._prefix, len(wrapped_key)
+        ) + wrapped_key
+        self._buffer = bytearray()
+        self._index = 0
+        self._header_sent = False
+        self._finalized = False
+
+    def _seal(self, chunk: bytes, last: bool) -> bytes:
+        if self._index >= 2 ** 32:
+            raise ValueError("Attachment too large for this chunk size")
+        record = self._aead.encrypt(_nonce(self._prefix, self._index, last), chunk, self.header)
+        self._index += 1
+        return record
+
+    def _take_header(self) -> bytes:
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self.header
+
+    def update(self, data: bytes) -> bytes:
+        """
+        Encrypt more plaintext.
+
+        Args:
+            data: Next piece of plaintext (any size)
+
+        Returns:
+            bytes: Ciphertext ready to be written (may be empty)
+        """
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._buffer += data
+        out = [self._take_header()]
+        offset = 0
+        while len(self._buffer) - offset >= self.chunk_size:
+            out.append(self._seal(bytes(self._buffer[offset:offset + self.chunk_size]), last=False))
+            offset += self.chunk_size
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """
+        Encrypt the final chunk.
+
+        Returns:
+            bytes: The remaining ciphertext
+        """
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._finalized = True
+        out = self._take_header() + self._seal(bytes(self._buffer), last=True)
+        self._buffer = bytearray()
+        return out
+
+
+def _parse_header(data: bytes, password: str = None) -> Optional[Tuple[int, int, bytes, AESGCM, bytes]]:
+    """Return (header_len, chunk_size, nonce_prefix, aead, header) or None if incomplete."""
+    if len(data) < _FIXED_HEADER.size:
+        return None
+    magic, version, chunk_size, prefix, key_len = _FIXED_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise AttachmentDecryptionError("Not an encrypted attachment")
+    header_len = _FIXED_HEADER.size + key_len
+    if len(data) < header_len:
+        return None
+    header = bytes(data[:header_len])
+    try:
+        key = get_master_key(password).decrypt(header[_FIXED_HEADER.size:])
+    except Exception as e:
+        raise AttachmentDecryptionError(f"Cannot unwrap attachment key: {e!r}")
+    return header_len, chunk_size, prefix, AESGCM(key), header
+
+
+def _open(aead: AESGCM, prefix: bytes, header: bytes, index: int, record: bytes, last: bool) -> bytes:
+    try:
+        return aead.decrypt(_nonce(prefix, index, last), record, header)
+    except InvalidTag:
+        raise AttachmentDecryptionError(f"Chunk {index} failed authentication")
+
+
+class StreamDecryptor:
+    """
+    Incremental decryptor: feed ciphertext with update(), then call finalize().
+
+    Plaintext is only released once its chunk has been authenticated, and
+    finalize() fails if the stream was truncated.
+    """
+
+    def __init__(self, password: str = None):
+        self._password = password
+        self._buffer = bytearray()
+        self._state = None
+        self._index = 0
+
+    def update(self, data: bytes) -> bytes:
+        """
+        Decrypt more ciphertext.
+
+        Args:
+            data: Next piece of ciphertext (any size)
+
+        Returns:
+            bytes: Authenticated plaintext (may be empty)
+        """
+        self._buffer += data
+        if self._state is None:
+            parsed = _parse_header(self._buffer, self._password)
+            if parsed is None:
+                return b""
+            header_len = parsed[0]
+            self._state = parsed[1:]
+            del self._buffer[:header_len]
+
+        chunk_size, prefix, aead, header = self._state
+        record_size = chunk_size + TAG_SIZE
+        out = []
+        # A full-size record is never the last one, but only release it once
+        # more data proves the stream continues past it.
+        offset = 0
+        while len(self._buffer) - offset > record_size:
+            record = bytes(self._buffer[offset:offset + record_size])
+            out.append(_open(aead, prefix, header, self._index, record, last=False))
+            offset += record_size
+            self._index += 1
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """
+        Decrypt the final chunk.
+
+        Returns:
+            bytes: The remaining plaintext
+
+        Raises:
+            AttachmentDecryptionError: If the stream is truncated or tampered with
+        """
+        if self._state is None:
+            raise AttachmentDecryptionError("Truncated attachment header")
+        chunk_size, prefix, aead, header = self._state
+        if len(self._buffer) >= chunk_size + TAG_SIZE or len(self._buffer) < TAG_SIZE:
+            raise AttachmentDecryptionError("Truncated attachment")
+        out = _open(aead, prefix, header, self._index, bytes(self._buffer), last=True)
+        self._buffer = bytearray()
+        return out
+
+
+def encrypt_stream(
+    chunks: Iterable[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    password: str = None
+) -> Iterator[bytes]:
+    """
+    Encrypt an iterable of plaintext pieces, yielding ciphertext as it's produced.
+
+    Args:
+        chunks: Plaintext pieces of any size
+        chunk_size: Plaintext bytes per authenticated record
+        password: Optional master password used to wrap the file key
+
+    Yields:
+        bytes: Ciphertext pieces
+    """
+    encryptor = StreamEncryptor(chunk_size, password)
+    for chunk in chunks:
+        out = encryptor.update(chunk)
+        if out:
+            yield out
+    yield encryptor.finalize()
+
+
+def decrypt_stream(chunks: Iterable[bytes], password: str = None) -> Iterator[bytes]:
+    """
+    Decrypt an iterable of ciphertext pieces, yielding authenticated plaintext.
+
+    Args:
+        chunks: Ciphertext pieces of any size
+        password: Optional master password used to unwrap the file key
+
+    Yields:
+        bytes: Plaintext pieces
+
+    Raises:
+        AttachmentDecryptionError: If the stream is corrupt, truncated or tampered with
+    """
+    decryptor = StreamDecryptor(password)
+    for chunk in chunks:
+        out = decryptor.update(chunk)
+        if out:
+            yield out
+    out = decryptor.finalize()
+    if out:
+        yield out
+
+
+class EncryptedAttachmentReader:
+    """Random-access reader over an encrypted attachment file."""
+
+    def __init__(self, fileobj: BinaryIO, password: str = None):
+        self._file = fileobj
+        fileobj.seek(0)
+        head = fileobj.read(_FIXED_HEADER.size)
+        fileobj.seek(0)
+        if len(head) < _FIXED_HEADER.size:
+            raise AttachmentDecryptionError("Truncated attachment header")
+        key_len = _FIXED_HEADER.unpack(head)[4]
+        parsed = _parse_header(fileobj.read(_FIXED_HEADER.size + key_len), password)
+        if parsed is None:
+            raise AttachmentDecryptionError("Truncated attachment header")
+        self._header_len, self.chunk_size, self._prefix, self._aead, self._header = parsed
+        self._record_size = self.chunk_size + TAG_SIZE
+
+        fileobj.seek(0, os.SEEK_END)
+        body = fileobj.tell() - self._header_len
+        self.chunk_count = body // self._record_size + 1
+        last_record = body - (self.chunk_count - 1) * self._record_size
+        if last_record < TAG_SIZE or last_record >= self._record_size:
+            raise AttachmentDecryptionError("Truncated attachment")
+        self.size = (self.chunk_count - 1) * self.chunk_size + last_record - TAG_SIZE
+
+    def read_chunk(self, index: int) -> bytes:
+        """
+        Decrypt one chunk by index.
+
+        Args:
+            index: Zero-based chunk index
+
+        Returns:
+            bytes: The chunk's plaintext
+        """
+        if not 0 <= index < self.chunk_count:
+            raise IndexError("Chunk index out of range")
+        self._file.seek(self._header_len + index * self._record_size)
+        record = self._file.read(self._record_size)
+        return _open(self._aead, self._prefix, self._header, index, record, last=index == self.chunk_count - 1)
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield the plaintext bytes in [start, end), decrypting only the chunks involved.
+
+        Args:
+            start: First plaintext byte offset
+            end: Offset one past the last byte (defaults to the end of the file)
+
+        Yields:
+            bytes: Plaintext pieces
+        """
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return
+        for index in range(start // self.chunk_size, (end - 1) // self.chunk_size + 1):
+            chunk = self.read_chunk(index)
+            chunk_start = index * self.chunk_size
+            yield chunk[max(0, start - chunk_start):end - chunk_start]
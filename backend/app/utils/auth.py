@@ -1,13 +1,24 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Callable, Deque, Dict, Optional, Union, Any
+import asyncio
+import hashlib
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..config import settings
+from .cache import TTLCache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class HashingPoolSaturated(Exception):
+    """Raised when the password hashing pool has no free worker or queue slot."""
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against its hash.
@@ -35,6 +46,139 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """
+    Bounded executor that runs bcrypt hashing off the event loop.
+
+    At most ``max_workers`` hashes run at once and at most ``max_queue`` more
+    wait for a worker; anything beyond that is rejected immediately with
+    HashingPoolSaturated so callers can shed load instead of queueing forever.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, executor: str = "thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor_type = executor
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies: Deque[float] = deque(maxlen=1024)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a hashing function in the pool.
+
+        Args:
+            func: Module-level (picklable) function to call
+            *args: Arguments for func
+
+        Returns:
+            Any: The function's return value
+
+        Raises:
+            HashingPoolSaturated: If all workers and queue slots are taken
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HashingPoolSaturated("Password hashing pool is saturated")
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+            self._latencies.append(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool metrics.
+
+        Returns:
+            dict: Queue depth, in-flight count, counters and latency percentiles (ms)
+        """
+        latencies = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.max_workers),
+            "queue_depth": max(0, self._pending - self.max_workers),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "latency_p50_ms": pct(0.50),
+            "latency_p99_ms": pct(0.99),
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the underlying executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    executor=settings.password_hash_executor
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the hashing pool without blocking the event loop.
+    
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password from database
+        
+    Returns:
+        bool: True if password matches, False otherwise
+        
+    Raises:
+        HashingPoolSaturated: If the hashing pool is full
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password in the hashing pool without blocking the event loop.
+    
+    Args:
+        password: The plain text password to hash
+        
+    Returns:
+        str: The hashed password
+        
+    Raises:
+        HashingPoolSaturated: If the hashing pool is full
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(
     data: dict, 
     expires_delta: Optional[timedelta] = None
@@ -56,7 +200,7 @@ def create_access_token(
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.jwt_secret_key, 
@@ -65,25 +209,42 @@ def create_access_token(
     return encoded_jwt
 
 
+# Verified token payloads keyed by token digest, each expiring at the token's exp
+token_cache: TTLCache[dict] = TTLCache(maxsize=settings.token_cache_size)
+
+
 def verify_token(token: str) -> Optional[dict]:
     """
     Verify and decode a JWT token.
     
+    Successfully verified payloads are cached until the token's ``exp`` so
+    repeated requests with the same token skip the signature check.
+    
     Args:
         token: The JWT token to verify
         
     Returns:
         dict: The decoded token payload if valid, None otherwise
     """
+    cache_key = None
+    if settings.token_cache_enabled:
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+    
     try:
         payload = jwt.decode(
             token, 
             settings.jwt_secret_key, 
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError:
         return None
+    
+    if cache_key is not None and isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(cache_key, dict(payload), expires_at=payload["exp"])
+    return payload
 
 
 def create_refresh_token(data: dict) -> str:
@@ -98,7 +259,7 @@ def create_refresh_token(data: dict) -> str:
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=7)  # 7 days for refresh token
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     
     encoded_jwt = jwt.encode(
         to_encode,
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+import threading
+import time
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded, thread-safe LRU cache whose entries expire at an absolute time.
+
+    Each entry carries its own expiry (a ``time.time()`` timestamp), so callers
+    can tie the lifetime of a cached value to the thing it describes, e.g. a
+    token's ``exp`` claim. Expired entries are never returned.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, expires_at: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            expires_at: Absolute expiry timestamp (defaults to now + default_ttl)
+        """
+        if expires_at is None:
+            if self.default_ttl is None:
+                raise ValueError("expires_at is required when the cache has no default_ttl")
+            expires_at = time.time() + self.default_ttl
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Size, hits, misses, evictions and hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,85 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+import threading
+
+# Upper bounds in seconds; observations above the last bound land in +Inf
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with an SLO threshold.
+
+    Buckets are reported cumulatively (Prometheus style) so they can be
+    scraped from ``/metrics`` and alerted on; percentiles are estimated as
+    the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, slo_seconds: Optional[float] = None):
+        self.buckets = tuple(sorted(buckets))
+        self.slo_seconds = slo_seconds
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slo_breaches = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency."""
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            if self.slo_seconds is not None and seconds > self.slo_seconds:
+                self.slo_breaches += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            float: Upper bound of the bucket holding the quantile (the observed
+            maximum for the +Inf bucket), or None without observations
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return self.max
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get histogram state.
+
+        Returns:
+            dict: Count, sum, cumulative buckets, estimated p50/p95/p99 and SLO breaches
+        """
+        with self._lock:
+            cumulative: List[int] = []
+            seen = 0
+            for count in self._counts:
+                seen += count
+                cumulative.append(seen)
+            count, total, slo_breaches = self.count, self.total, self.slo_breaches
+        buckets = {str(bound): n for bound, n in zip(self.buckets, cumulative)}
+        buckets["+Inf"] = cumulative[-1]
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "buckets": buckets,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "slo_seconds": self.slo_seconds,
+            "slo_breaches": slo_breaches,
+        }
@@ -1,87 +1,135 @@
-import firebase_admin
-from firebase_admin import credentials, messaging
-import smtplib
+from abc import ABC, abstractmethod
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, List, Dict, Any
-import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple
+import asyncio
 import logging
+import threading
 import time
 from ..config import settings
+from .smtp import get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin SDK (if credentials are provided)
-firebase_app = None
-if all([
-    settings.firebase_project_id,
-    settings.firebase_private_key,
-    settings.firebase_client_email
-]):
-    try:
-        cred_dict = {
-            "type": "service_account",
-            "project_id": settings.firebase_project_id,
-            "private_key_id": settings.firebase_private_key_id,
-            "private_key": settings.firebase_private_key.replace('\\n', '\n'),
-            "client_email": settings.firebase_client_email,
-            "client_id": settings.firebase_client_id,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_x509_cert_url": settings.firebase_client_x509_cert_url
-        }
-        
-        cred = credentials.Certificate(cred_dict)
-        firebase_app = firebase_admin.initialize_app(cred)
-        logger.info("Firebase Admin SDK initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
+# Firebase Admin SDK, initialized on first push (importing firebase_admin
+# pulls in the Google API client, which dominates cold start)
+_firebase_app = None
+_firebase_init_attempted = False
+_firebase_lock = threading.Lock()
 
 
-async def send_push_notification(
-    token: str,
-    title: str,
-    body: str,
-    data: Optional[Dict[str, str]] = None,
-    notification_type: str = "general"
-) -> bool:
+def firebase_configured() -> bool:
+    """Whether Firebase service account credentials are set."""
+    return all([
+        settings.firebase_project_id,
+        settings.firebase_private_key,
+        settings.firebase_client_email
+    ])
+
+
+def get_firebase_app():
     """
-    Send a push notification using Firebase Cloud Messaging.
+    Get the Firebase Admin app, initializing it on first use.
+    
+    Initialization is attempted once per process; failures are logged and
+    leave push delivery unavailable.
     
-    Args:
-        token: FCM registration token
-        title: Notification title
-        body: Notification body
-        data: Additional data payload
-        notification_type: Type of notification
-        
     Returns:
-        bool: True if successful, False otherwise
+        firebase_admin.App or None when not configured or initialization failed
     """
-    if not firebase_app:
-        logger.warning("Firebase not initialized. Cannot send push notification.")
-        return False
+    global _firebase_app, _firebase_init_attempted
+    if _firebase_init_attempted:
+        return _firebase_app
+    with _firebase_lock:
+        if _firebase_init_attempted:
+            return _firebase_app
+        if firebase_configured():
+            try:
+                import firebase_admin
+                from firebase_admin import credentials
+                
+                cred_dict = {
+                    "type": "service_account",
+                    "project_id": settings.firebase_project_id,
+                    "private_key_id": settings.firebase_private_key_id,
+                    "private_key": settings.firebase_private_key.replace('\\n', '\n'),
+                    "client_email": settings.firebase_client_email,
+                    "client_id": settings.firebase_client_id,
+                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                    "token_uri": "https://oauth2.googleapis.com/token",
+                    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+                    "client_x509_cert_url": settings.firebase_client_x509_cert_url
+                }
+                
+                cred = credentials.Certificate(cred_dict)
+                _firebase_app = firebase_admin.initialize_app(cred)
+                logger.info("Firebase Admin SDK initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
+        _firebase_init_attempted = True
+    return _firebase_app
+
+
+FCM_MULTICAST_LIMIT = 500  # tokens per multicast call allowed by FCM
+
+
+class TokenResult(NamedTuple):
+    """Delivery outcome for one device token."""
+    token: str
+    success: bool
+    message_id: Optional[str] = None
+    error: Optional[str] = None  # provider error type, e.g. "UnregisteredError"
+
+
+class PushTransport(ABC):
+    """
+    Provider-facing push transport.
     
-    try:
-        # Create the notification
-        notification = messaging.Notification(
-            title=title,
-            body=body
-        )
-        
-        # Add custom data
-        notification_data = data or {}
-        notification_data.update({
-            "type": notification_type,
-            "timestamp": str(int(time.time()))
-        })
+    Implementations send one multicast (at most ``max_batch_size`` tokens) and
+    are called from worker threads, so they may block.
+    """
+    max_batch_size = FCM_MULTICAST_LIMIT
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def send_multicast(
+        self,
+        tokens: List[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[TokenResult]:
+        """Send one multicast and return a result per token, in order."""
+
+
+class FirebaseTransport(PushTransport):
+    """Firebase Cloud Messaging transport."""
+
+    def is_available(self) -> bool:
+        return get_firebase_app() is not None
+
+    def send_multicast(
+        self,
+        tokens: List[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[TokenResult]:
+        from firebase_admin import messaging
         
-        # Create the message
-        message = messaging.Message(
-            notification=notification,
-            data=notification_data,
-            token=token,
+        # Create multicast message
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(
+                title=title,
+                body=body
+            ),
+            data=data,
+            tokens=tokens,
             android=messaging.AndroidConfig(
                 notification=messaging.AndroidNotification(
                     icon="ic_notification",
@@ -104,14 +152,120 @@ async def send_push_notification(
             )
         )
         
-        # Send the message
-        response = messaging.send(message)
-        logger.info(f"Push notification sent successfully. Message ID: {response}")
-        return True
+        response = messaging.send_each_for_multicast(message)
+        return [
+            TokenResult(
+                token=token,
+                success=result.success,
+                message_id=result.message_id,
+                error=type(result.exception).__name__ if result.exception else None
+            )
+            for token, result in zip(tokens, response.responses)
+        ]
+
+
+class LocalTransport(PushTransport):
+    """
+    In-process stand-in for FCM, for tests and load tests.
+    
+    Each call sleeps for ``latency`` seconds; tokens starting with
+    ``invalid_prefix`` fail with UnregisteredError like an uninstalled app.
+    """
+
+    def __init__(self, latency: float = 0.0, invalid_prefix: str = "invalid-"):
+        self.latency = latency
+        self.invalid_prefix = invalid_prefix
+        self.calls = 0
+        self.sent: List[Tuple[str, str, str]] = []
+        self._lock = threading.Lock()
+
+    def send_multicast(
+        self,
+        tokens: List[str],
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> List[TokenResult]:
+        if len(tokens) > self.max_batch_size:
+            raise ValueError(f"Multicast limited to {self.max_batch_size} tokens")
+        if self.latency:
+            time.sleep(self.latency)
+        results = []
+        with self._lock:
+            self.calls += 1
+            for token in tokens:
+                if token.startswith(self.invalid_prefix):
+                    results.append(TokenResult(token, False, error="UnregisteredError"))
+                else:
+                    self.sent.append((token, title, body))
+                    results.append(TokenResult(token, True, message_id=f"local-{len(self.sent)}"))
+        return results
+
+
+_push_transport: Optional[PushTransport] = None
+_push_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_push_transport() -> PushTransport:
+    """Return the configured push transport (``PUSH_TRANSPORT``: firebase or local)."""
+    global _push_transport
+    if _push_transport is None:
+        if settings.push_transport == "local":
+            _push_transport = LocalTransport()
+        elif settings.push_transport == "firebase":
+            _push_transport = FirebaseTransport()
+        else:
+            raise ValueError(f"Unknown push transport: {settings.push_transport}")
+    return _push_transport
+
+
+def set_push_transport(transport: Optional[PushTransport]) -> None:
+    """Replace the push transport (None restores the configured one)."""
+    global _push_transport
+    _push_transport = transport
+
+
+def _get_push_executor() -> ThreadPoolExecutor:
+    global _push_executor
+    if _push_executor is None:
+        _push_executor = ThreadPoolExecutor(
+            max_workers=settings.push_max_concurrency,
+            thread_name_prefix="push"
+        )
+    return _push_executor
+
+
+def _notification_data(data: Optional[Dict[str, str]], notification_type: str) -> Dict[str, str]:
+    notification_data = dict(data or {})
+    notification_data.update({
+        "type": notification_type,
+        "timestamp": str(int(time.time()))
+    })
+    return notification_data
+
+
+async def send_push_notification(
+    token: str,
+    title: str,
+    body: str,
+    data: Optional[Dict[str, str]] = None,
+    notification_type: str = "general"
+) -> bool:
+    """
+    Send a push notification using Firebase Cloud Messaging.
+    
+    Args:
+        token: FCM registration token
+        title: Notification title
+        body: Notification body
+        data: Additional data payload
+        notification_type: Type of notification
         
-    except Exception as e:
-        logger.error(f"Failed to send push notification: {e}")
-        return False
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    result = await send_bulk_push_notifications([token], title, body, data, notification_type)
+    return result["success_count"] == 1
 
 
 async def send_bulk_push_notifications(
@@ -119,80 +273,100 @@ async def send_bulk_push_notifications(
     title: str,
     body: str,
     data: Optional[Dict[str, str]] = None,
-    notification_type: str = "general"
+    notification_type: str = "general",
+    max_concurrency: Optional[int] = None,
+    executor: Optional[Executor] = None
 ) -> Dict[str, Any]:
     """
     Send push notifications to multiple devices.
     
+    Tokens are split into chunks at the provider's multicast limit and the
+    chunks are sent concurrently on a worker pool, so the event loop never
+    blocks on the provider.
+    
     Args:
         tokens: List of FCM registration tokens
         title: Notification title
         body: Notification body
         data: Additional data payload
         notification_type: Type of notification
+        max_concurrency: Chunks in flight at once (defaults to PUSH_MAX_CONCURRENCY)
+        executor: Worker pool for provider calls (defaults to the shared push pool)
         
     Returns:
-        dict: Results with success/failure counts
+        dict: success/failure counts and per-token TokenResults in input order
     """
-    if not firebase_app:
-        logger.warning("Firebase not initialized. Cannot send bulk push notifications.")
-        return {"success_count": 0, "failure_count": len(tokens)}
-    
-    try:
-        # Create the notification
-        notification = messaging.Notification(
-            title=title,
-            body=body
-        )
-        
-        # Add custom data
-        notification_data = data or {}
-        notification_data.update({
-            "type": notification_type,
-            "timestamp": str(int(time.time()))
-        })
-        
-        # Create multicast message
-        message = messaging.MulticastMessage(
-            notification=notification,
-            data=notification_data,
-            tokens=tokens,
-            android=messaging.AndroidConfig(
-                notification=messaging.AndroidNotification(
-                    icon="ic_notification",
-                    color="#2196F3",
-                    sound="default"
-                ),
-                priority="high"
-            ),
-            apns=messaging.APNSConfig(
-                payload=messaging.APNSPayload(
-                    aps=messaging.Aps(
-                        alert=messaging.ApsAlert(
-                            title=title,
-                            body=body
-                        ),
-                        sound="default",
-                        badge=1
-                    )
-                )
-            )
-        )
-        
-        # Send the message
-        response = messaging.send_multicast(message)
-        
-        logger.info(f"Bulk push notifications sent. Success: {response.success_count}, Failure: {response.failure_count}")
-        
+    transport = get_push_transport()
+    if not transport.is_available():
+        logger.warning("Push transport not initialized. Cannot send push notifications.")
         return {
-            "success_count": response.success_count,
-            "failure_count": response.failure_count,
-            "responses": response.responses
+            "success_count": 0,
+            "failure_count": len(tokens),
+            "responses": [TokenResult(token, False, error="TransportUnavailable") for token in tokens]
         }
+    
+    notification_data = _notification_data(data, notification_type)
+    size = transport.max_batch_size
+    chunks = [tokens[i:i + size] for i in range(0, len(tokens), size)]
+    semaphore = asyncio.Semaphore(max_concurrency or settings.push_max_concurrency)
+    loop = asyncio.get_running_loop()
+    executor = executor or _get_push_executor()
+    
+    async def send_chunk(chunk: List[str]) -> List[TokenResult]:
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(
+                    executor,
+                    transport.send_multicast,
+                    chunk,
+                    title,
+                    body,
+                    notification_data
+                )
+            except Exception as e:
+                logger.error(f"Failed to send push notification chunk: {e}")
+                return [TokenResult(token, False, error=type(e).__name__) for token in chunk]
+    
+    chunk_results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+    responses = [result for results in chunk_results for result in results]
+    success_count = sum(1 for result in responses if result.success)
+    
+    logger.info(
+        f"Bulk push notifications sent in {len(chunks)} chunk(s). "
+        f"Success: {success_count}, Failure: {len(responses) - success_count}"
+    )
+    
+    return {
+        "success_count": success_count,
+        "failure_count": len(responses) - success_count,
+        "responses": responses
+    }
+
+
+def build_email_message(
+    to_email: str,
+    subject: str,
+    body: str,
+    is_html: bool = False
+) -> MIMEMultipart:
+    """
+    Build an email message from the configured sender.
+    
+    Args:
+        to_email: Recipient email address
+        subject: Email subject
+        body: Email body
+        is_html: Whether body is HTML
         
-    except Exception as e:
-        logger.error(f"Failed to send bulk push notifications: {e}")
-        return {"success_count": 0, "failure_count": len(tokens)}
+    Returns:
+        MIMEMultipart: The message
+    """
+    message = MIMEMultipart("alternative")
+    message["From"] = settings.smtp_from
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.attach(MIMEText(body, "html" if is_html else "plain", "utf-8"))
+    return message
 
 
 async def send_email_notification(
@@ -214,8 +388,13 @@ async def send_email_notification(
         bool: True if successful, False otherwise
     """
     try:
-        # For demo purposes, we'll just log the email
-        # In production, you would configure SMTP settings
+        pool = get_smtp_pool()
+        if pool is None:
+            # SMTP isn't configured (development): just log the email
+            logger.info(f"Email notification sent to {to_email}: {subject}")
+            return True
+        
+        await pool.send(build_email_message(to_email, subject, body, is_html))
         logger.info(f"Email notification sent to {to_email}: {subject}")
         return True
         
@@ -224,6 +403,33 @@ async def send_email_notification(
         return False
 
 
+async def send_email_batch(emails: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Send many emails (e.g. daily digests) over the pooled SMTP connections.
+    
+    Args:
+        emails: Dicts with to_email, subject, body and optional is_html
+        
+    Returns:
+        list: True/False per email, in input order
+    """
+    pool = get_smtp_pool()
+    if pool is None:
+        for email in emails:
+            logger.info(f"Email notification sent to {email['to_email']}: {email['subject']}")
+        return [True] * len(emails)
+    
+    messages = [
+        build_email_message(e["to_email"], e["subject"], e["body"], e.get("is_html", False))
+        for e in emails
+    ]
+    errors = await pool.send_many(messages)
+    failures = sum(1 for error in errors if error)
+    if failures:
+        logger.error(f"Failed to send {failures} of {len(emails)} batched emails")
+    return [error is None for error in errors]
+
+
 def create_medicine_reminder_notification(
     medicine_name: str,
     dosage: str,
@@ -251,6 +457,54 @@ def create_medicine_reminder_notification(
     }
 
 
+class ReminderTemplate(NamedTuple):
+    """Compiled medicine reminder text for one locale."""
+    locale: str
+    title: str
+    body: Template
+
+    def render(self, medicine_name: str, dosage: str) -> Dict[str, Any]:
+        """Build the push payload shared by every recipient of this medicine and dosage."""
+        return {
+            "title": self.title,
+            "body": self.body.substitute(medicine_name=medicine_name, dosage=dosage),
+            "data": {
+                "medicine_name": medicine_name,
+                "dosage": dosage,
+                "action": "take_medicine"
+            }
+        }
+
+
+# Reminder text per language; no per-user fields so recipients can share a multicast
+REMINDER_TEXT = {
+    "en": ("Medicine Reminder", "It's time to take your ${medicine_name} (${dosage})"),
+    "hi": ("दवा का समय", "आपकी ${medicine_name} (${dosage}) लेने का समय हो गया है"),
+}
+DEFAULT_LOCALE = "en"
+
+
+@lru_cache(maxsize=64)
+def get_reminder_template(locale: Optional[str]) -> ReminderTemplate:
+    """
+    Get the compiled reminder template for a locale.
+    
+    Regional variants ("hi-IN") use their base language and unknown
+    languages fall back to English.
+    
+    Args:
+        locale: A user's preferred_language
+        
+    Returns:
+        ReminderTemplate: Cached template
+    """
+    language = (locale or DEFAULT_LOCALE).replace("_", "-").split("-")[0].lower()
+    if language not in REMINDER_TEXT:
+        language = DEFAULT_LOCALE
+    title, body = REMINDER_TEXT[language]
+    return ReminderTemplate(language, title, Template(body))
+
+
 def create_emergency_notification(
     user_name: str,
     emergency_type: str,
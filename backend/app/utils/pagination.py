@@ -0,0 +1,105 @@
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Tuple
+import base64
+import json
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, and_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+
+
+class PageParams(NamedTuple):
+    """Cursor and page size requested by the client."""
+    cursor: Optional[str]
+    limit: int
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max)
+) -> PageParams:
+    """Dependency reading the pagination query parameters."""
+    return PageParams(cursor, limit)
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+
+    Args:
+        sort_value: The row's timestamp (datetime or date)
+        row_id: The row's primary key
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, python_type: type = datetime) -> Tuple[Any, int]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: Cursor from a previous page
+        python_type: datetime or date, matching the sort column
+
+    Returns:
+        tuple: (timestamp, id)
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return python_type.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        ) from e
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    params: PageParams
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query, newest first, by keyset on (timestamp, id).
+
+    The cursor becomes ``sort <= ts AND (sort, id) < (ts, id)``: the first
+    term bounds the index range scan, the row comparison breaks ties, so a
+    page costs the same however deep the client is. ``stmt`` should filter
+    on the leading columns of an index ending in ``sort_column``.
+
+    Args:
+        db: Async database session
+        stmt: Select of ORM entities, already filtered (e.g. by user)
+        sort_column: Timestamp column to order by
+        id_column: Primary key column breaking ties
+        params: Cursor and page size
+
+    Returns:
+        tuple: (rows, cursor for the next page or None on the last page)
+    """
+    if params.cursor:
+        python_type = date if sort_column.type.python_type is date else datetime
+        sort_value, row_id = decode_cursor(params.cursor, python_type)
+        stmt = stmt.where(and_(
+            sort_column <= sort_value,
+            tuple_(sort_column, id_column) < tuple_(sort_value, row_id)
+        ))
+    stmt = stmt.order_by(sort_column.desc(), id_column.desc()).limit(params.limit + 1)
+    rows = list((await db.execute(stmt)).scalars())
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
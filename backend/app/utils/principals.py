@@ -0,0 +1,227 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Set
+import asyncio
+import json
+import logging
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session, object_session
+from ..config import settings
+from ..models.user import User
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Minimal user state needed to authorize a request."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+
+
+class PrincipalCache:
+    """
+    Cache of authenticated principals keyed by user id.
+
+    The ``redis`` backend is shared by every worker so an invalidation is seen
+    everywhere at once; use it whenever more than one worker serves the API.
+    The ``memory`` backend is a per-process TTLCache: invalidations only reach
+    the committing process, so its entries live for at most
+    ``memory_ttl_seconds``, which bounds how long another worker can accept a
+    deactivated user or an old role. Redis failures are logged and treated as
+    cache misses.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        ttl_seconds: int,
+        maxsize: int,
+        redis_url: str = "",
+        memory_ttl_seconds: Optional[int] = None
+    ):
+        if backend not in ("memory", "redis"):
+            raise ValueError(f"Unknown principal cache backend: {backend}")
+        self.backend = backend
+        if backend == "memory" and memory_ttl_seconds is not None:
+            ttl_seconds = min(ttl_seconds, memory_ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._local: TTLCache[Principal] = TTLCache(maxsize=maxsize, default_ttl=ttl_seconds)
+        self._redis = None
+        self._pending: Set[asyncio.Task] = set()
+        self.redis_errors = 0
+
+    def _key(self, user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        """
+        Get a cached principal.
+
+        Args:
+            user_id: User ID from the token
+
+        Returns:
+            Principal if cached, None otherwise
+        """
+        if self.backend == "memory":
+            return self._local.get(user_id)
+        try:
+            raw = await self._get_redis().get(self._key(user_id))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache lookup failed: {e}")
+            return None
+        if raw is None:
+            self._local.misses += 1
+            return None
+        self._local.hits += 1
+        return Principal(**json.loads(raw))
+
+    async def set(self, principal: Principal) -> None:
+        """Cache a principal for the configured TTL."""
+        if self.backend == "memory":
+            self._local.set(principal.id, principal)
+            return
+        try:
+            await self._get_redis().set(
+                self._key(principal.id),
+                json.dumps(asdict(principal)),
+                ex=self.ttl_seconds
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache store failed: {e}")
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop a cached principal.
+
+        Safe to call from sync code such as ORM events; the Redis delete is
+        scheduled on the running event loop when there is one.
+        """
+        self._local.delete(user_id)
+        if self.backend == "redis":
+            self._redis_delete(self._key(user_id))
+
+    def invalidate_all(self) -> None:
+        """Drop every cached principal, e.g. after a bulk User statement whose rows are unknown."""
+        self._local.clear()
+        if self.backend == "redis":
+            self._redis_delete(self._key("*"), pattern=True)
+
+    def _redis_delete(self, key: str, pattern: bool = False) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            import redis
+            try:
+                client = redis.Redis.from_url(self.redis_url)
+                keys = list(client.scan_iter(match=key)) if pattern else [key]
+                if keys:
+                    client.delete(*keys)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Principal cache invalidation failed: {e}")
+            return
+        task = loop.create_task(self._delete(key, pattern))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _delete(self, key: str, pattern: bool = False) -> None:
+        try:
+            redis = self._get_redis()
+            keys = [found async for found in redis.scan_iter(match=key)] if pattern else [key]
+            if keys:
+                await redis.delete(*keys)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every principal held in process."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Backend name and TTL plus hit/miss counters
+        """
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_errors": self.redis_errors,
+            **self._local.stats()
+        }
+
+
+principal_cache = PrincipalCache(
+    backend=settings.principal_cache_backend,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    maxsize=settings.principal_cache_size,
+    redis_url=settings.redis_url,
+    memory_ttl_seconds=settings.principal_cache_memory_ttl_seconds
+)
+
+_INVALIDATIONS_KEY = "principal_invalidations"
+_INVALIDATE_ALL_KEY = "principal_invalidate_all"
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    """Queue an invalidation when authorization-relevant fields change."""
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ("is_active", "role", "email")):
+        return
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATIONS_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATIONS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_user_statement(orm_execute_state: ORMExecuteState) -> None:
+    """Bulk update(User)/delete(User) skip the mapper events; drop every principal on commit."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, User):
+        orm_execute_state.session.info[_INVALIDATE_ALL_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Invalidate principals only once the change is visible to other sessions."""
+    user_ids = session.info.pop(_INVALIDATIONS_KEY, ())
+    if session.info.pop(_INVALIDATE_ALL_KEY, False):
+        principal_cache.invalidate_all()
+        return
+    for user_id in user_ids:
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_INVALIDATIONS_KEY, None)
+    session.info.pop(_INVALIDATE_ALL_KEY, None)
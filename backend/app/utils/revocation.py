@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Membership tests never give false negatives, so a miss proves a token
+    was not revoked (as of the last sync) without touching the backend.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class MemoryRevocationBackend:
+    """Per-process revocation backend (single worker / tests)."""
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self._entries[jti] = expires_at
+
+    async def is_revoked(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    async def live_entries(self) -> Dict[str, float]:
+        now = time.time()
+        self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+        return dict(self._entries)
+
+
+class RedisRevocationBackend:
+    """Shared revocation backend: a sorted set of jti scored by token expiry."""
+
+    key = "revoked_jtis"
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._redis = None
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await self._get_redis().zadd(self.key, {jti: expires_at})
+
+    async def is_revoked(self, jti: str) -> bool:
+        expires_at = await self._get_redis().zscore(self.key, jti)
+        return expires_at is not None and expires_at > time.time()
+
+    async def live_entries(self) -> Dict[str, float]:
+        redis = self._get_redis()
+        now = time.time()
+        await redis.zremrangebyscore(self.key, "-inf", now)
+        entries = await redis.zrangebyscore(self.key, now, "+inf", withscores=True)
+        return dict(entries)
+
+
+class RevocationStore:
+    """
+    Token revocation denylist keyed by the ``jti`` claim.
+
+    An in-memory Bloom filter answers the common "not revoked" case without
+    I/O; possible hits are confirmed against the backend. The filter is rebuilt
+    from the backend every ``sync_seconds``, which both picks up revocations
+    made by other workers and drops entries whose tokens have expired. Local
+    revocations made while a rebuild is in flight are carried over into the
+    new filter, so they are never missed by the fast path.
+    """
+
+    def __init__(self, backend, capacity: int, error_rate: float, sync_seconds: float):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self.revoked_entries = 0
+        self.fast_path_checks = 0
+        self.backend_checks = 0
+        self.last_sync: Optional[float] = None
+        self._rebuilds: List[Set[str]] = []  # jtis revoked since each running sync began
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti: The token's unique ID
+            expires_at: The token's exp timestamp
+        """
+        if expires_at <= time.time():
+            return
+        await self.backend.revoke(jti, expires_at)
+        self._bloom.add(jti)
+        for revoked in self._rebuilds:
+            revoked.add(jti)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Check whether a token has been revoked.
+
+        Args:
+            jti: The token's unique ID (tokens without one cannot be revoked)
+
+        Returns:
+            bool: True if revoked and not yet expired
+        """
+        if not jti:
+            return False
+        if jti not in self._bloom:
+            self.fast_path_checks += 1
+            return False
+        self.backend_checks += 1
+        return await self.backend.is_revoked(jti)
+
+    async def sync(self) -> None:
+        """Rebuild the Bloom filter from the backend's live entries."""
+        revoked: Set[str] = set()
+        self._rebuilds.append(revoked)
+        try:
+            entries = await self.backend.live_entries()
+            bloom = BloomFilter(max(self.capacity, 2 * len(entries)), self.error_rate)
+            # no await from here to the swap, so nothing is revoked in between
+            for jti in entries.keys() | revoked:
+                bloom.add(jti)
+            self._bloom = bloom
+        finally:
+            self._rebuilds.remove(revoked)
+        self.revoked_entries = len(entries)
+        self.last_sync = time.time()
+
+    async def run_sync_loop(self) -> None:
+        """Periodically sync the filter until cancelled."""
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Failed to sync token revocation list: {e}")
+            await asyncio.sleep(self.sync_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get revocation metrics.
+
+        Returns:
+            dict: Live entry count, check counters and last sync time
+        """
+        return {
+            "revoked_entries": self.revoked_entries,
+            "fast_path_checks": self.fast_path_checks,
+            "backend_checks": self.backend_checks,
+            "last_sync": self.last_sync,
+        }
+
+
+def _create_backend():
+    if settings.revocation_backend == "redis":
+        return RedisRevocationBackend(settings.redis_url)
+    if settings.revocation_backend == "memory":
+        return MemoryRevocationBackend()
+    raise ValueError(f"Unknown revocation backend: {settings.revocation_backend}")
+
+
+revocation_store = RevocationStore(
+    backend=_create_backend(),
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    sync_seconds=settings.revocation_sync_seconds
+)
@@ -1,9 +1,28 @@
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
 import base64
+import hashlib
 import os
+import threading
 from ..config import settings
+from .cache import TTLCache
+
+ENVELOPE_VERSION = 2
+
+# Master keys (by password digest), plus data keys for encryption (by key_id)
+# and for decryption (by wrapped key), both scoped to the master key. Bounded and expiring so data keys rotate.
+_master_keys: TTLCache[Fernet] = TTLCache(maxsize=8, default_ttl=settings.message_key_ttl_seconds)
+_encryption_keys: TTLCache[Tuple[Fernet, str]] = TTLCache(
+    maxsize=settings.message_key_cache_size,
+    default_ttl=settings.message_key_ttl_seconds
+)
+_decryption_keys: TTLCache[Fernet] = TTLCache(
+    maxsize=settings.message_key_cache_size,
+    default_ttl=settings.message_key_ttl_seconds
+)
 
 
 def generate_key_from_password(password: str, salt: bytes) -> bytes:
@@ -27,17 +46,117 @@ def generate_key_from_password(password: str, salt: bytes) -> bytes:
     return key
 
 
-def encrypt_message(message: str, password: str = None) -> dict:
+def _master_key_id(password: str = None) -> bytes:
+    if password is None:
+        password = settings.message_master_key or settings.jwt_secret_key
+    return hashlib.sha256(password.encode()).digest()
+
+
+def get_master_key(password: str = None) -> Fernet:
+    """
+    Get the key-wrapping master key, deriving it with PBKDF2 once per process.
+    
+    Args:
+        password: Optional master password (uses the configured master key if not provided)
+        
+    Returns:
+        Fernet: Master key used to wrap and unwrap data keys
+    """
+    cache_key = _master_key_id(password)
+    master = _master_keys.get(cache_key)
+    if master is None:
+        if password is None:
+            password = settings.message_master_key or settings.jwt_secret_key
+        master = Fernet(generate_key_from_password(password, settings.message_key_salt.encode()))
+        _master_keys.set(cache_key, master)
+    return master
+
+
+def get_data_key(key_id: str, password: str = None) -> Tuple[Fernet, str]:
+    """
+    Get the current data key for a user or conversation.
+    
+    A fresh random data key is generated when none is cached (so keys rotate
+    every ``message_key_ttl_seconds``) and stored alongside its wrapped form.
+    
+    Args:
+        key_id: Key scope, e.g. from conversation_key_id()
+        password: Optional master password
+        
+    Returns:
+        tuple: (data key, data key wrapped by the master key)
+    """
+    master_id = _master_key_id(password)
+    entry = _encryption_keys.get((key_id, master_id))
+    if entry is None:
+        master = get_master_key(password)
+        raw_key = Fernet.generate_key()
+        wrapped_key = master.encrypt(raw_key).decode()
+        entry = (Fernet(raw_key), wrapped_key)
+        _encryption_keys.set((key_id, master_id), entry)
+        _decryption_keys.set((wrapped_key, master_id), entry[0])
+    return entry
+
+
+def unwrap_data_key(wrapped_key: str, password: str = None) -> Fernet:
+    """
+    Unwrap a data key with the master key, using the key cache when possible.
+    
+    Args:
+        wrapped_key: Data key wrapped by the master key
+        password: Optional master password
+        
+    Returns:
+        Fernet: The data key
+    """
+    cache_key = (wrapped_key, _master_key_id(password))
+    data_key = _decryption_keys.get(cache_key)
+    if data_key is None:
+        data_key = Fernet(get_master_key(password).decrypt(wrapped_key.encode()))
+        _decryption_keys.set(cache_key, data_key)
+    return data_key
+
+
+def conversation_key_id(user_id: int, other_user_id: int) -> str:
+    """
+    Build the data key scope shared by both participants of a conversation.
+    
+    Args:
+        user_id: One participant's user ID
+        other_user_id: The other participant's user ID
+        
+    Returns:
+        str: Key ID that is the same regardless of argument order
+    """
+    low, high = sorted((user_id, other_user_id))
+    return f"conversation:{low}:{high}"
+
+
+def encrypt_message(message: str, password: str = None, key_id: Optional[str] = None) -> dict:
     """
     Encrypt a message using Fernet symmetric encryption.
     
+    With ``key_id`` the message is encrypted directly with that scope's cached
+    data key (envelope mode); otherwise a key is derived from the password
+    with a fresh salt, which costs a full PBKDF2 run per message.
+    
     Args:
         message: The message to encrypt
         password: Optional password for encryption (uses JWT secret if not provided)
+        key_id: Optional data key scope (per user or per conversation)
         
     Returns:
-        dict: Contains encrypted message and salt
+        dict: Contains encrypted message and either the salt or the wrapped data key
     """
+    if key_id is not None:
+        data_key, wrapped_key = get_data_key(key_id, password)
+        return {
+            "version": ENVELOPE_VERSION,
+            "key_id": key_id,
+            "wrapped_key": wrapped_key,
+            "encrypted_message": data_key.encrypt(message.encode()).decode()
+        }
+    
     if password is None:
         password = settings.jwt_secret_key
     
@@ -61,8 +180,11 @@ def decrypt_message(encrypted_data: dict, password: str = None) -> str:
     """
     Decrypt a message using Fernet symmetric encryption.
     
+    Handles both envelope messages (wrapped data key) and the original
+    salt-based format.
+    
     Args:
-        encrypted_data: Dictionary containing encrypted message and salt
+        encrypted_data: Dictionary from encrypt_message()
         password: Optional password for decryption (uses JWT secret if not provided)
         
     Returns:
@@ -71,6 +193,13 @@ def decrypt_message(encrypted_data: dict, password: str = None) -> str:
     Raises:
         Exception: If decryption fails
     """
+    if "wrapped_key" in encrypted_data:
+        try:
+            data_key = unwrap_data_key(encrypted_data["wrapped_key"], password)
+            return data_key.decrypt(encrypted_data["encrypted_message"].encode()).decode()
+        except Exception as e:
+            raise Exception(f"Decryption failed: {str(e)}")
+    
     if password is None:
         password = settings.jwt_secret_key
     
@@ -91,6 +220,137 @@ def decrypt_message(encrypted_data: dict, password: str = None) -> str:
         raise Exception(f"Decryption failed: {str(e)}")
 
 
+class DecryptResult(NamedTuple):
+    """Outcome of decrypting one message in a batch."""
+    plaintext: Optional[str]
+    error: Optional[str] = None
+
+
+_decrypt_executor: Optional[ThreadPoolExecutor] = None
+_derive_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_decrypt_executor() -> ThreadPoolExecutor:
+    global _decrypt_executor
+    with _executor_lock:
+        if _decrypt_executor is None:
+            _decrypt_executor = ThreadPoolExecutor(
+                max_workers=settings.message_decrypt_workers,
+                thread_name_prefix="message-decrypt"
+            )
+        return _decrypt_executor
+
+
+def _get_derive_executor() -> Executor:
+    """Pool for PBKDF2 derivations of legacy keys (processes sidestep the GIL)."""
+    global _derive_executor
+    if settings.message_decrypt_executor != "process":
+        return _get_decrypt_executor()
+    with _executor_lock:
+        if _derive_executor is None:
+            _derive_executor = ProcessPoolExecutor(max_workers=settings.message_decrypt_workers)
+        return _derive_executor
+
+
+def _batch_key_id(encrypted_data: dict) -> Hashable:
+    if "wrapped_key" in encrypted_data:
+        return ("envelope", encrypted_data["wrapped_key"])
+    return ("salt", encrypted_data["salt"])
+
+
+def _derive_legacy_key(password: str, salt: str) -> bytes:
+    return generate_key_from_password(password, base64.urlsafe_b64decode(salt))
+
+
+def _load_batch_keys(key_ids: Sequence[Hashable], password: Optional[str]) -> Dict[Hashable, Any]:
+    """Unwrap envelope keys and derive legacy keys, mapping failures to exceptions."""
+    keys: Dict[Hashable, Any] = {}
+    legacy_salts = []
+    for kind, value in key_ids:
+        if kind == "salt":
+            legacy_salts.append(value)
+            continue
+        try:
+            keys[(kind, value)] = unwrap_data_key(value, password)
+        except Exception as e:
+            keys[(kind, value)] = e
+    
+    if legacy_salts:
+        legacy_password = settings.jwt_secret_key if password is None else password
+        executor = _get_derive_executor()
+        futures = [executor.submit(_derive_legacy_key, legacy_password, salt) for salt in legacy_salts]
+        for salt, future in zip(legacy_salts, futures):
+            try:
+                keys[("salt", salt)] = Fernet(future.result())
+            except Exception as e:
+                keys[("salt", salt)] = e
+    return keys
+
+
+def _decrypt_with_keys(
+    items: Sequence[Tuple[int, dict]],
+    keys: Dict[Hashable, Any]
+) -> List[Tuple[int, DecryptResult]]:
+    results = []
+    for index, encrypted_data in items:
+        key = keys[_batch_key_id(encrypted_data)]
+        if isinstance(key, Exception):
+            results.append((index, DecryptResult(None, f"Decryption failed: {key}")))
+            continue
+        try:
+            token = encrypted_data["encrypted_message"].encode()
+            if "wrapped_key" not in encrypted_data:
+                token = base64.urlsafe_b64decode(token)
+            results.append((index, DecryptResult(key.decrypt(token).decode())))
+        except Exception as e:
+            results.append((index, DecryptResult(None, f"Decryption failed: {e!r}")))
+    return results
+
+
+def decrypt_messages(
+    batch: Sequence[dict],
+    password: str = None,
+    chunk_size: int = 64
+) -> List[DecryptResult]:
+    """
+    Decrypt many messages at once, e.g. a whole family thread.
+    
+    Messages are grouped by key so each key is derived or unwrapped once per
+    batch; legacy PBKDF2 derivations and the decryption itself are spread
+    across a worker pool (``MESSAGE_DECRYPT_EXECUTOR=process`` for derivations
+    on multi-core hosts).
+    A message that fails to decrypt doesn't affect the rest of the batch.
+    
+    Args:
+        batch: Dictionaries from encrypt_message(), in either format
+        password: Optional password for decryption (uses the defaults if not provided)
+        chunk_size: Messages handed to a worker at a time
+        
+    Returns:
+        list: One DecryptResult per input, in input order
+    """
+    results: List[Optional[DecryptResult]] = [None] * len(batch)
+    items: List[Tuple[int, dict]] = []
+    key_ids = set()
+    for index, encrypted_data in enumerate(batch):
+        try:
+            key_ids.add(_batch_key_id(encrypted_data))
+        except (KeyError, TypeError) as e:
+            results[index] = DecryptResult(None, f"Malformed message: {e!r}")
+            continue
+        items.append((index, encrypted_data))
+    
+    keys = _load_batch_keys(list(key_ids), password)
+    executor = _get_decrypt_executor()
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    for chunk_results in executor.map(lambda chunk: _decrypt_with_keys(chunk, keys), chunks):
+        for index, result in chunk_results:
+            results[index] = result
+    
+    return results
+
+
 def generate_secure_token() -> str:
     """
     Generate a secure random token for various purposes.
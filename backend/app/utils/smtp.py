@@ -0,0 +1,238 @@
+from email.message import Message
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import logging
+import aiosmtplib
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """
+    Pool of persistent asyncio SMTP connections.
+    
+    Connections are opened lazily (up to ``pool_size``), authenticated once
+    and reused for many messages, so a batch pays the TCP/TLS/AUTH handshake
+    once per connection instead of once per email. Broken connections are
+    dropped and replaced on next use. A pool belongs to one event loop.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: Optional[bool] = None,
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        max_messages_per_connection: int = 1000
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._sent_on: Dict[int, int] = {}
+        self._slots = asyncio.Semaphore(pool_size)
+        self.connections_opened = 0
+        self.messages_sent = 0
+        self.send_errors = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        self.connections_opened += 1
+        self._sent_on[id(client)] = 0
+        return client
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                client = self._idle.pop()
+                if client.is_connected:
+                    return client
+                self._sent_on.pop(id(client), None)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, client: aiosmtplib.SMTP, healthy: bool) -> None:
+        try:
+            recycle = self._sent_on.get(id(client), 0) >= self.max_messages_per_connection
+            if healthy and not recycle and client.is_connected:
+                self._idle.append(client)
+                return
+            self._sent_on.pop(id(client), None)
+            await self._close_client(client)
+        finally:
+            self._slots.release()
+
+    async def _close_client(self, client: aiosmtplib.SMTP) -> None:
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    async def _send_on(self, client: aiosmtplib.SMTP, message: Message) -> None:
+        await client.send_message(message)
+        self._sent_on[id(client)] = self._sent_on.get(id(client), 0) + 1
+        self.messages_sent += 1
+
+    async def send(self, message: Message) -> None:
+        """
+        Send one message on a pooled connection.
+        
+        Raises:
+            aiosmtplib.SMTPException: If the server rejects the message
+        """
+        client = await self._acquire()
+        healthy = False
+        try:
+            await self._send_on(client, message)
+            healthy = True
+        except aiosmtplib.SMTPResponseException:
+            healthy = True  # the message was refused, the connection is fine
+            self.send_errors += 1
+            raise
+        except Exception:
+            self.send_errors += 1
+            raise
+        finally:
+            await self._release(client, healthy)
+
+    async def send_many(self, messages: Sequence[Message]) -> List[Optional[str]]:
+        """
+        Send many messages, streaming them over up to ``pool_size`` connections.
+        
+        Each connection sends its messages back to back without reconnecting;
+        a failed message is retried once on a fresh connection if the
+        connection itself broke.
+        
+        Args:
+            messages: Messages to send
+            
+        Returns:
+            list: None for each delivered message, or an error description, in input order
+        """
+        results: List[Optional[str]] = [None] * len(messages)
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for index in range(len(messages)):
+            queue.put_nowait(index)
+        
+        async def lane() -> None:
+            while not queue.empty():
+                client = await self._acquire()
+                healthy = True
+                try:
+                    while healthy and not queue.empty():
+                        if self._sent_on.get(id(client), 0) >= self.max_messages_per_connection:
+                            break
+                        index = queue.get_nowait()
+                        try:
+                            await self._send_on(client, messages[index])
+                        except aiosmtplib.SMTPResponseException as e:
+                            self.send_errors += 1
+                            results[index] = f"{e.code} {e.message}"
+                        except Exception as e:
+                            self.send_errors += 1
+                            healthy = False
+                            if results[index] is None:
+                                results[index] = repr(e)
+                                queue.put_nowait(index)  # one retry on a new connection
+                            else:
+                                results[index] = repr(e)
+                        else:
+                            results[index] = None
+                finally:
+                    await self._release(client, healthy)
+        
+        lanes = min(self.pool_size, len(messages))
+        outcomes = await asyncio.gather(*(lane() for _ in range(lanes)), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                logger.error(f"SMTP batch lane failed: {outcome}")
+        # Anything still queued never got a connection
+        while not queue.empty():
+            index = queue.get_nowait()
+            results[index] = results[index] or "No SMTP connection available"
+        return results
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        idle, self._idle = self._idle, []
+        for client in idle:
+            self._sent_on.pop(id(client), None)
+            await self._close_client(client)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool metrics.
+        
+        Returns:
+            dict: Pool size, idle connections and counters
+        """
+        return {
+            "pool_size": self.pool_size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+            "send_errors": self.send_errors,
+        }
+
+
+_smtp_pool: Optional[SMTPPool] = None
+_smtp_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_smtp_pool() -> Optional[SMTPPool]:
+    """
+    Return the configured pool for the running event loop.
+    
+    Returns:
+        SMTPPool, or None when SMTP_HOST isn't configured
+    """
+    global _smtp_pool, _smtp_pool_loop
+    if not settings.smtp_host:
+        return None
+    loop = asyncio.get_running_loop()
+    if _smtp_pool is None or _smtp_pool_loop is not loop:
+        _smtp_pool = SMTPPool(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            start_tls=settings.smtp_start_tls,
+            pool_size=settings.smtp_pool_size,
+            timeout=settings.smtp_timeout_seconds
+        )
+        _smtp_pool_loop = loop
+    return _smtp_pool
+
+
+async def close_smtp_pool() -> None:
+    """Close the configured pool's connections, if any."""
+    global _smtp_pool, _smtp_pool_loop
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+    _smtp_pool = None
+    _smtp_pool_loop = None
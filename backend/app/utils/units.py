@@ -0,0 +1,82 @@
+"""
+Unit conversion for vital signs.
+
+Every quantity has a canonical unit; other units convert to it with an
+affine map ``canonical = value * scale + offset``. Unit codes are matched
+case-insensitively and a missing unit means the canonical one. Values in an
+unknown unit convert to NaN (None for scalars) rather than being guessed.
+Results are rounded to DECIMALS places, so a boundary value converted from
+another unit (100.4 F) compares equal to its canonical form (38 C).
+"""
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DECIMALS = 3
+
+CANONICAL_UNITS = {
+    "temperature": "C",
+    "weight": "kg",
+    "height": "cm",
+    "glucose": "mg/dL",
+}
+
+# unit code (lower case) -> (scale, offset) to the canonical unit
+CONVERSIONS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "temperature": {"c": (1.0, 0.0), "f": (5 / 9, -160 / 9), "k": (1.0, -273.15)},
+    "weight": {"kg": (1.0, 0.0), "g": (0.001, 0.0), "lb": (0.45359237, 0.0), "st": (6.35029318, 0.0)},
+    "height": {"cm": (1.0, 0.0), "mm": (0.1, 0.0), "m": (100.0, 0.0), "in": (2.54, 0.0), "ft": (30.48, 0.0)},
+    "glucose": {"mg/dl": (1.0, 0.0), "mmol/l": (18.0156, 0.0), "mmol": (18.0156, 0.0)},
+}
+
+
+def _conversion(quantity: str, unit: Optional[str]) -> Optional[Tuple[float, float]]:
+    return CONVERSIONS[quantity].get((unit or CANONICAL_UNITS[quantity]).strip().lower())
+
+
+def is_known_unit(quantity: str, unit: Optional[str]) -> bool:
+    return _conversion(quantity, unit) is not None
+
+
+def to_canonical(value: Optional[float], unit: Optional[str], quantity: str) -> Optional[float]:
+    """
+    Convert one value to the canonical unit of its quantity.
+
+    Args:
+        value: Measured value (None passes through)
+        unit: Unit the value is in
+        quantity: Key of CANONICAL_UNITS
+
+    Returns:
+        float or None if the value is missing or the unit unknown
+    """
+    conversion = _conversion(quantity, unit)
+    if value is None or conversion is None:
+        return None
+    scale, offset = conversion
+    return round(value * scale + offset, DECIMALS)
+
+
+def to_canonical_array(values: "np.ndarray", units: Sequence[Optional[str]], quantity: str) -> "np.ndarray":
+    """
+    Convert a column of values to the canonical unit, one multiply-add per row.
+
+    Args:
+        values: Float array (NaN for missing values)
+        units: Unit of each value
+        quantity: Key of CANONICAL_UNITS
+
+    Returns:
+        numpy.ndarray: Canonical values, NaN where missing or in an unknown unit
+    """
+    import numpy as np
+
+    codes, inverse = np.unique(np.array(units, dtype=object).astype(str), return_inverse=True)
+    scales = np.full(len(codes), np.nan)
+    offsets = np.zeros(len(codes))
+    for i, code in enumerate(codes):
+        conversion = _conversion(quantity, None if code == "None" else code)
+        if conversion is not None:
+            scales[i], offsets[i] = conversion
+    return np.round(values * scales[inverse] + offsets[inverse], DECIMALS)
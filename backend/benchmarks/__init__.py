@@ -0,0 +1 @@
+# Benchmarks for Swaasth Elder Health Backend
@@ -0,0 +1,108 @@
+"""
+Concurrency benchmark for the authenticated request path.
+
+Registers a user, logs in once, then drives ``--clients`` concurrent clients
+against a protected endpoint (which runs ``get_current_user``) and a share of
+logins, and reports latency percentiles.
+
+Run it against a server started from the baseline (sync ``Session``) and one
+started from this tree (``AsyncSession``) with the same database, e.g.:
+
+    uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.auth_concurrency --url http://localhost:8000 --clients 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the pct-th percentile of samples (nearest-rank).
+
+    Args:
+        samples: Latency samples in seconds
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def prepare_user(client: httpx.AsyncClient) -> Dict[str, str]:
+    """Register a throwaway user and return its credentials and access token."""
+    credentials = {"email": f"bench-{uuid.uuid4().hex[:12]}@example.com", "password": "bench-password"}
+    await client.post("/api/v1/auth/register", json={
+        **credentials,
+        "first_name": "Bench",
+        "last_name": "User"
+    })
+    response = await client.post("/api/v1/auth/login", json=credentials)
+    response.raise_for_status()
+    return {**credentials, "token": response.json()["access_token"]}
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    user: Dict[str, str],
+    requests: int,
+    login_every: int,
+    latencies: List[float],
+    errors: List[int]
+) -> None:
+    """Issue requests sequentially, recording each latency."""
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    for i in range(requests):
+        start = time.perf_counter()
+        if login_every and i % login_every == 0:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": user["email"], "password": user["password"]}
+            )
+        else:
+            response = await client.get("/api/v1/users/profile", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            errors.append(response.status_code)
+
+
+async def main(url: str, clients: int, requests: int, login_every: int) -> None:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        user = await prepare_user(client)
+        latencies: List[float] = []
+        errors: List[int] = []
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(client, user, requests, login_every, latencies, errors)
+            for _ in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+
+    print(f"clients={clients} requests={len(latencies)} errors={len(errors)} elapsed={elapsed:.2f}s")
+    print(f"throughput={len(latencies) / elapsed:.1f} req/s")
+    print(
+        f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 95) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.1f}ms "
+        f"mean={statistics.mean(latencies) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--login-every", type=int, default=10, help="every Nth request is a login (0 = never)")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.clients, args.requests, args.login_every))
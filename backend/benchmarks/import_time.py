@@ -0,0 +1,81 @@
+"""
+Cold-start import check based on ``python -X importtime``.
+
+Imports each module in a fresh interpreter, prints its cumulative import
+time and the slowest imports, and exits non-zero if a module that must stay
+lazy (provider SDKs, NumPy) was loaded. Wall-clock time varies too much on
+shared CI runners to gate on, so it is only reported unless ``--budget-ms``
+is given:
+
+    python -m benchmarks.import_time app.main app.services.outbox
+    python -m benchmarks.import_time app.main --budget-ms 1500
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+# Provider SDKs, and NumPy for batch flagging and backfills, are only imported on first use
+LAZY_MODULES = ("firebase_admin", "googleapiclient", "sentry_sdk", "numpy")
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def measure(module: str) -> List[ImportTime]:
+    """
+    Import a module in a fresh interpreter and collect ``-X importtime`` rows.
+
+    Args:
+        module: Dotted module name
+
+    Returns:
+        list: One ImportTime per imported module, in import order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(ImportTime(name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def check(module: str, budget_ms: Optional[float], top: int) -> List[str]:
+    """Print an import profile for a module and return eager imports (and budget overruns, if given)."""
+    rows = measure(module)
+    by_name: Dict[str, ImportTime] = {row.module: row for row in rows}
+    total_ms = by_name[module].cumulative_us / 1000
+
+    budget = f" (budget {budget_ms:.0f} ms)" if budget_ms is not None else ""
+    print(f"{module}: {total_ms:.0f} ms cumulative{budget}")
+    for row in sorted(rows, key=lambda r: r.self_us, reverse=True)[:top]:
+        print(f"  {row.self_us / 1000:8.1f} ms  {row.module}")
+
+    problems = []
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"{module} imports in {total_ms:.0f} ms, over the {budget_ms:.0f} ms budget")
+    for name in LAZY_MODULES:
+        if name in by_name:
+            problems.append(f"{module} eagerly imports {name}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["app.main"])
+    parser.add_argument("--budget-ms", type=float, default=None, help="also fail above this cumulative time")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    problems = [p for module in args.modules for p in check(module, args.budget_ms, args.top)]
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,48 @@
+"""
+Throughput benchmark for decrypting a family message thread.
+
+Compares one-by-one decrypt_message() with batched decrypt_messages() for
+both the legacy salt-per-message format and envelope (data key) messages:
+
+    python -m benchmarks.message_decrypt --messages 50
+"""
+import argparse
+import time
+from typing import Callable
+
+from app.utils import security
+from app.utils.security import decrypt_message, decrypt_messages, encrypt_message
+
+
+def timed(label: str, count: int, func: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {count / elapsed:10,.0f} msg/s")
+
+
+def cold_caches() -> None:
+    security._encryption_keys.clear()
+    security._decryption_keys.clear()
+
+
+def main(messages: int) -> None:
+    legacy = [encrypt_message(f"legacy message {i}") for i in range(messages)]
+    envelope = [encrypt_message(f"envelope message {i}", key_id="conversation:1:2") for i in range(messages)]
+
+    print(f"{messages} messages, {security.settings.message_decrypt_workers} workers")
+    timed("legacy one-by-one", messages, lambda: [decrypt_message(m) for m in legacy])
+    timed("legacy batch", messages, lambda: decrypt_messages(legacy))
+
+    cold_caches()
+    timed("envelope one-by-one (cold)", messages, lambda: [decrypt_message(m) for m in envelope])
+    cold_caches()
+    timed("envelope batch (cold)", messages, lambda: decrypt_messages(envelope))
+    timed("envelope batch (warm)", messages, lambda: decrypt_messages(envelope))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+    main(args.messages)
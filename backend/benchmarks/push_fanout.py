@@ -0,0 +1,41 @@
+"""
+Load test for push fan-out against the in-process FCM stand-in.
+
+Each multicast call sleeps for ``--latency`` seconds to mimic the provider
+round trip, so the run shows how chunking and concurrency bound wall time:
+
+    python -m benchmarks.push_fanout --tokens 50000 --latency 0.15 --concurrency 8
+"""
+import argparse
+import asyncio
+import time
+
+from app.utils import notifications
+from app.utils.notifications import LocalTransport, send_bulk_push_notifications
+
+
+async def main(tokens: int, latency: float, concurrency: int) -> None:
+    transport = LocalTransport(latency=latency)
+    notifications.set_push_transport(transport)
+    token_list = [f"token-{i}" for i in range(tokens)]
+
+    start = time.perf_counter()
+    result = await send_bulk_push_notifications(
+        token_list, "Medicine Reminder", "Time for your medicine", max_concurrency=concurrency
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{tokens:,} tokens, {transport.calls} multicast calls, concurrency={concurrency}: "
+        f"{elapsed:.2f}s ({tokens / elapsed:,.0f} tokens/s), "
+        f"success={result['success_count']:,} failure={result['failure_count']:,}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=50000)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.latency, args.concurrency))
@@ -0,0 +1,63 @@
+"""
+Compare per-reminder pushes with grouped multicast for a peak-minute batch.
+
+Each due reminder belongs to one elder with one device; reminders are spread
+over ``--medicines`` medicine/dosage pairs and two languages. The in-process
+FCM stand-in sleeps ``--latency`` seconds per provider call:
+
+    python -m benchmarks.reminder_fanout --reminders 5000 --medicines 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.utils import notifications
+from app.utils.notifications import (
+    LocalTransport,
+    create_medicine_reminder_notification,
+    get_reminder_template,
+    send_bulk_push_notifications,
+)
+
+
+async def per_reminder(due) -> None:
+    for token, medicine, dosage, _ in due:
+        payload = create_medicine_reminder_notification(medicine, dosage, "Asha")
+        await send_bulk_push_notifications([token], payload["title"], payload["body"], payload["data"])
+
+
+async def grouped(due) -> None:
+    groups = {}
+    for token, medicine, dosage, language in due:
+        locale = get_reminder_template(language).locale
+        groups.setdefault((medicine, dosage, locale), []).append(token)
+    sends = []
+    for (medicine, dosage, locale), tokens in groups.items():
+        payload = get_reminder_template(locale).render(medicine, dosage)
+        sends.append(send_bulk_push_notifications(tokens, payload["title"], payload["body"], payload["data"]))
+    await asyncio.gather(*sends)
+
+
+async def main(reminders: int, medicines: int, latency: float) -> None:
+    rng = random.Random(7)
+    due = [
+        (f"token-{i}", f"Medicine {rng.randrange(medicines)}", "500mg", rng.choice(["en", "hi"]))
+        for i in range(reminders)
+    ]
+    for name, run in (("per-reminder", per_reminder), ("grouped", grouped)):
+        transport = LocalTransport(latency=latency)
+        notifications.set_push_transport(transport)
+        start = time.perf_counter()
+        await run(due)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {reminders:,} reminders, {transport.calls:,} provider calls, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reminders", type=int, default=5000)
+    parser.add_argument("--medicines", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.reminders, args.medicines, args.latency))
@@ -0,0 +1,84 @@
+"""
+Simulation benchmark for the reminder scheduler.
+
+Schedules ``--reminders`` synthetic reminders spread over several timezones,
+then replays ``--hours`` of wall-clock time minute by minute, comparing
+ReminderScheduler.pop_due() with a naive per-minute scan of every reminder:
+
+    python -m benchmarks.reminder_scheduler --reminders 1000000 --hours 24
+"""
+import argparse
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+from app.services.reminder_scheduler import ReminderScheduler, ScheduledReminder, next_fire_time
+
+TIMEZONES = ["Asia/Kolkata", "UTC", "Europe/London", "America/New_York", "Asia/Dubai", "Australia/Sydney"]
+DAY_PATTERNS = [frozenset(range(1, 8)), frozenset({1, 3, 5}), frozenset({2, 4, 6}), frozenset({7})]
+
+
+def make_reminders(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    # Most doses cluster around breakfast, lunch and dinner
+    peak_minutes = [8 * 60, 13 * 60, 20 * 60]
+    for reminder_id in range(1, count + 1):
+        if rng.random() < 0.8:
+            minute = rng.choice(peak_minutes) + rng.choice((0, 0, 0, 15, 30))
+        else:
+            minute = rng.randrange(24 * 60)
+        yield ScheduledReminder(
+            reminder_id=reminder_id,
+            user_id=reminder_id,
+            medicine_id=reminder_id,
+            reminder_time=dt_time(minute // 60, minute % 60),
+            days_of_week=rng.choice(DAY_PATTERNS),
+            timezone=rng.choice(TIMEZONES),
+        )
+
+
+def main(count: int, hours: int, scan_minutes: int) -> None:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    reminders = list(make_reminders(count))
+
+    scheduler = ReminderScheduler()
+    t0 = time.perf_counter()
+    for reminder in reminders:
+        scheduler.upsert(reminder, start)
+    load_seconds = time.perf_counter() - t0
+    print(f"loaded {len(scheduler):,} reminders in {load_seconds:.1f}s")
+
+    fired = 0
+    worst_minute = 0.0
+    t0 = time.perf_counter()
+    for minute in range(1, hours * 60 + 1):
+        tick_start = time.perf_counter()
+        fired += len(scheduler.pop_due(start + timedelta(minutes=minute)))
+        worst_minute = max(worst_minute, time.perf_counter() - tick_start)
+    heap_seconds = time.perf_counter() - t0
+    print(
+        f"heap: {hours * 60} ticks, {fired:,} fired, total {heap_seconds:.2f}s, "
+        f"worst tick {worst_minute * 1000:.1f}ms, "
+        f"{heap_seconds / max(fired, 1) * 1e6:.1f}us per fired reminder"
+    )
+
+    # Naive approach: every minute, check every reminder's next fire time
+    t0 = time.perf_counter()
+    for minute in range(1, scan_minutes + 1):
+        window_start = start + timedelta(minutes=minute - 1)
+        window_end = window_start + timedelta(minutes=1)
+        sum(1 for r in reminders if next_fire_time(r, window_start) <= window_end)
+    scan_per_tick = (time.perf_counter() - t0) / max(scan_minutes, 1)
+    print(
+        f"scan: {scan_per_tick:.2f}s per tick (measured over {scan_minutes} ticks), "
+        f"~{scan_per_tick * hours * 60:.0f}s for {hours}h"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reminders", type=int, default=1_000_000)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--scan-minutes", type=int, default=3, help="ticks to time for the naive scan")
+    args = parser.parse_args()
+    main(args.reminders, args.hours, args.scan_minutes)
@@ -0,0 +1,80 @@
+"""
+Emails-per-second benchmark for the pooled SMTP transport.
+
+Starts a local aiosmtpd sink (or targets --host/--port) and compares one
+connection per email with SMTPPool.send_many():
+
+    python -m benchmarks.smtp_pool --emails 2000 --pool-size 4
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+import aiosmtplib
+
+from app.utils.notifications import build_email_message
+from app.utils.smtp import SMTPPool
+
+
+class Sink:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+
+def start_sink():
+    from aiosmtpd.controller import Controller
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller, port
+
+
+async def connection_per_email(host: str, port: int, messages) -> None:
+    for message in messages:
+        await aiosmtplib.send(message, hostname=host, port=port, start_tls=False)
+
+
+async def pooled(host: str, port: int, messages, pool_size: int) -> None:
+    pool = SMTPPool(host, port, start_tls=False, pool_size=pool_size)
+    errors = await pool.send_many(messages)
+    await pool.close()
+    assert not any(errors), errors
+
+
+async def main(host: str, port: int, emails: int, pool_size: int) -> None:
+    messages = [
+        build_email_message(f"family{i}@example.com", "Daily health digest", f"Digest body {i}")
+        for i in range(emails)
+    ]
+    for label, run in (
+        ("connection per email", lambda: connection_per_email(host, port, messages)),
+        (f"pool of {pool_size}", lambda: pooled(host, port, messages, pool_size)),
+    ):
+        start = time.perf_counter()
+        await run()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {emails} emails in {elapsed:.2f}s = {emails / elapsed:,.0f} emails/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=None, help="SMTP server (default: start a local sink)")
+    parser.add_argument("--port", type=int, default=25)
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    controller = None
+    host, port = args.host, args.port
+    if host is None:
+        controller, port = start_sink()
+        host = "127.0.0.1"
+    try:
+        asyncio.run(main(host, port, args.emails, args.pool_size))
+    finally:
+        if controller is not None:
+            controller.stop()
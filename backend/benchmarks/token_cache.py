@@ -0,0 +1,65 @@
+"""
+Microbenchmark of get_current_user throughput with the token cache on and off.
+
+Uses a throwaway SQLite database so it runs without Postgres:
+
+    python -m benchmarks.token_cache --iterations 20000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import timedelta
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models  # noqa: F401
+from app.config import settings
+from app.database import Base
+from app.main import get_current_user
+from app.models.user import User
+from app.utils.auth import create_access_token, token_cache
+
+
+async def measure(session_factory, credentials, iterations: int) -> float:
+    """Return get_current_user calls per second."""
+    async with session_factory() as db:
+        await get_current_user(credentials, db)  # warm up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await get_current_user(credentials, db)
+        return iterations / (time.perf_counter() - start)
+
+
+async def main(iterations: int) -> None:
+    path = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        user = User(email="bench@example.com", hashed_password="x", role="elder")
+        db.add(user)
+        await db.commit()
+        claims = {"sub": user.email, "user_id": user.id, "role": user.role}
+
+    token = create_access_token(claims, expires_delta=timedelta(minutes=30))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    for enabled in (False, True):
+        settings.token_cache_enabled = enabled
+        token_cache.clear()
+        rate = await measure(session_factory, credentials, iterations)
+        print(f"token_cache={'on ' if enabled else 'off'} {rate:,.0f} get_current_user/s")
+    print(f"cache stats: {token_cache.stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
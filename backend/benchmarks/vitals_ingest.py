@@ -0,0 +1,97 @@
+"""
+Compare per-reading POSTs with one bulk upload of the same device readings.
+
+Runs the API in-process against a throwaway SQLite database (authentication
+is overridden, so only validation and inserts are measured). The bulk upload
+is sent both as a JSON array and as NDJSON, then resent to time the
+all-duplicates path:
+
+    python -m benchmarks.vitals_ingest --readings 2000
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import models  # noqa: F401  (registers all tables on Base.metadata)
+from app.database import Base, get_async_db
+from app.dependencies import get_current_user
+from app.main import app
+from app.models.user import User
+from app.utils.principals import Principal
+
+
+def make_readings(count: int, device: str):
+    start = datetime(2024, 1, 1)
+    return [
+        {"measurement_date": (start + timedelta(minutes=i)).isoformat(), "device_name": device,
+         "systolic_bp": 110 + i % 30, "diastolic_bp": 70 + i % 15, "heart_rate": 60 + i % 40,
+         "oxygen_saturation": 97.0}
+        for i in range(count)
+    ]
+
+
+def client_for(path: Path) -> TestClient:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert().values(id=1, email="bench@example.com", hashed_password="x"))
+    engine.dispose()
+
+    factory = async_sessionmaker(
+        bind=create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool),
+        expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_user] = lambda: Principal(
+        id=1, email="bench@example.com", role="elder", is_active=True
+    )
+    return TestClient(app)
+
+
+def timed(label: str, count: int, run) -> None:
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>18}: {count:,} readings in {elapsed:.2f}s ({count / elapsed:,.0f}/s) {result}")
+
+
+def main(readings: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        client = client_for(Path(tmp) / "bench.db")
+
+        per_row = make_readings(readings, "per-row")
+        timed("per-row POST", readings, lambda: sum(
+            client.post("/api/v1/health/vitals", json=reading).status_code == 201 for reading in per_row
+        ))
+
+        array = make_readings(readings, "json-array")
+        timed("bulk JSON array", readings,
+              lambda: client.post("/api/v1/health/vitals/bulk", json=array).json())
+
+        ndjson = "\n".join(json.dumps(reading) for reading in make_readings(readings, "ndjson"))
+        headers = {"Content-Type": "application/x-ndjson"}
+        timed("bulk NDJSON", readings,
+              lambda: client.post("/api/v1/health/vitals/bulk", content=ndjson, headers=headers).json())
+        timed("bulk resend", readings,
+              lambda: client.post("/api/v1/health/vitals/bulk", content=ndjson, headers=headers).json())
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.readings)
@@ -0,0 +1,293 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 11:30:48
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table('device_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=512), nullable=False),
+    sa.Column('platform', sa.String(length=20), nullable=True),
+    sa.Column('last_seen_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token')
+    )
+    op.create_index(op.f('ix_device_tokens_id'), 'device_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_device_tokens_user_id'), 'device_tokens', ['user_id'], unique=False)
+
+    op.create_table('family_connections',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('elder_id', sa.Integer(), nullable=False),
+    sa.Column('caregiver_id', sa.Integer(), nullable=False),
+    sa.Column('relationship_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('permissions', sa.Text(), nullable=True),
+    sa.Column('is_primary_caregiver', sa.Boolean(), nullable=True),
+    sa.Column('emergency_contact', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['caregiver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['elder_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_family_connections_id'), 'family_connections', ['id'], unique=False)
+
+    op.create_table('family_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('message_type', sa.String(length=50), nullable=True),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('is_encrypted', sa.Boolean(), nullable=True),
+    sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('reply_to_message_id', sa.Integer(), nullable=True),
+    sa.Column('attachment_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['receiver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reply_to_message_id'], ['family_messages.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_family_messages_id'), 'family_messages', ['id'], unique=False)
+
+    op.create_table('health_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('record_type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('diagnosis_code', sa.String(length=20), nullable=True),
+    sa.Column('provider_name', sa.String(length=200), nullable=True),
+    sa.Column('provider_contact', sa.String(length=200), nullable=True),
+    sa.Column('date_recorded', sa.Date(), nullable=False),
+    sa.Column('follow_up_date', sa.Date(), nullable=True),
+    sa.Column('severity', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attachments', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_shared_with_family', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_health_records_id'), 'health_records', ['id'], unique=False)
+
+    op.create_table('medicines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('dosage', sa.String(length=100), nullable=False),
+    sa.Column('form', sa.String(length=50), nullable=True),
+    sa.Column('frequency', sa.String(length=100), nullable=False),
+    sa.Column('duration_days', sa.Integer(), nullable=True),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('instructions', sa.Text(), nullable=True),
+    sa.Column('prescribing_doctor', sa.String(length=200), nullable=True),
+    sa.Column('pharmacy', sa.String(length=200), nullable=True),
+    sa.Column('refill_count', sa.Integer(), nullable=True),
+    sa.Column('side_effects', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medicines_id'), 'medicines', ['id'], unique=False)
+
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('recipient_user_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('dedup_key', sa.String(length=200), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notification_outbox_dedup_key'), 'notification_outbox', ['dedup_key'], unique=False)
+    op.create_index(op.f('ix_notification_outbox_id'), 'notification_outbox', ['id'], unique=False)
+    op.create_index('ix_notification_outbox_status_next_attempt', 'notification_outbox', ['status', 'next_attempt_at'], unique=False)
+
+    op.create_table('user_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=False),
+    sa.Column('last_name', sa.String(length=100), nullable=False),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.Column('emergency_contact_name', sa.String(length=200), nullable=True),
+    sa.Column('emergency_contact_phone', sa.String(length=20), nullable=True),
+    sa.Column('medical_conditions', sa.Text(), nullable=True),
+    sa.Column('allergies', sa.Text(), nullable=True),
+    sa.Column('profile_picture_url', sa.String(length=500), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('city', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('zip_code', sa.String(length=20), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('preferred_language', sa.String(length=10), nullable=True),
+    sa.Column('notifications_enabled', sa.Boolean(), nullable=True),
+    sa.Column('email_notifications', sa.Boolean(), nullable=True),
+    sa.Column('push_notifications', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_profiles_id'), 'user_profiles', ['id'], unique=False)
+
+    op.create_table('vital_signs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('measurement_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('systolic_bp', sa.Integer(), nullable=True),
+    sa.Column('diastolic_bp', sa.Integer(), nullable=True),
+    sa.Column('heart_rate', sa.Integer(), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('temperature_unit', sa.String(length=1), nullable=True),
+    sa.Column('weight', sa.Float(), nullable=True),
+    sa.Column('weight_unit', sa.String(length=2), nullable=True),
+    sa.Column('height', sa.Float(), nullable=True),
+    sa.Column('height_unit', sa.String(length=2), nullable=True),
+    sa.Column('bmi', sa.Float(), nullable=True),
+    sa.Column('blood_glucose', sa.Float(), nullable=True),
+    sa.Column('glucose_unit', sa.String(length=5), nullable=True),
+    sa.Column('glucose_time_relation', sa.String(length=20), nullable=True),
+    sa.Column('oxygen_saturation', sa.Float(), nullable=True),
+    sa.Column('respiratory_rate', sa.Integer(), nullable=True),
+    sa.Column('blood_pressure_medication_taken', sa.Boolean(), nullable=True),
+    sa.Column('measurement_method', sa.String(length=50), nullable=True),
+    sa.Column('device_name', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_flagged', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_vital_signs_id'), 'vital_signs', ['id'], unique=False)
+
+    op.create_table('medicine_reminders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('medicine_id', sa.Integer(), nullable=False),
+    sa.Column('reminder_time', sa.Time(), nullable=False),
+    sa.Column('days_of_week', sa.String(length=20), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('notification_sent', sa.Boolean(), nullable=True),
+    sa.Column('last_notification_sent', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('snooze_count', sa.Integer(), nullable=True),
+    sa.Column('snooze_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['medicine_id'], ['medicines.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medicine_reminders_id'), 'medicine_reminders', ['id'], unique=False)
+
+    op.create_table('medicine_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('medicine_id', sa.Integer(), nullable=False),
+    sa.Column('reminder_id', sa.Integer(), nullable=True),
+    sa.Column('scheduled_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('taken_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('dosage_taken', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('side_effects_experienced', sa.Text(), nullable=True),
+    sa.Column('adherence_score', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['medicine_id'], ['medicines.id'], ),
+    sa.ForeignKeyConstraint(['reminder_id'], ['medicine_reminders.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medicine_logs_id'), 'medicine_logs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_medicine_logs_id'), table_name='medicine_logs')
+
+    op.drop_table('medicine_logs')
+    op.drop_index(op.f('ix_medicine_reminders_id'), table_name='medicine_reminders')
+
+    op.drop_table('medicine_reminders')
+    op.drop_index(op.f('ix_vital_signs_id'), table_name='vital_signs')
+
+    op.drop_table('vital_signs')
+    op.drop_index(op.f('ix_user_profiles_id'), table_name='user_profiles')
+
+    op.drop_table('user_profiles')
+    op.drop_index('ix_notification_outbox_status_next_attempt', table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_id'), table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_dedup_key'), table_name='notification_outbox')
+
+    op.drop_table('notification_outbox')
+    op.drop_index(op.f('ix_medicines_id'), table_name='medicines')
+
+    op.drop_table('medicines')
+    op.drop_index(op.f('ix_health_records_id'), table_name='health_records')
+
+    op.drop_table('health_records')
+    op.drop_index(op.f('ix_family_messages_id'), table_name='family_messages')
+
+    op.drop_table('family_messages')
+    op.drop_index(op.f('ix_family_connections_id'), table_name='family_connections')
+
+    op.drop_table('family_connections')
+    op.drop_index(op.f('ix_device_tokens_user_id'), table_name='device_tokens')
+    op.drop_index(op.f('ix_device_tokens_id'), table_name='device_tokens')
+
+    op.drop_table('device_tokens')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
@@ -0,0 +1,37 @@
+"""Composite indexes for hot access paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:05:10
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_medicine_logs_user_scheduled', 'medicine_logs', ['user_id', 'scheduled_time']),
+    ('ix_vital_signs_user_measurement', 'vital_signs', ['user_id', 'measurement_date']),
+    ('ix_family_messages_receiver_unread', 'family_messages', ['receiver_id', 'is_read', 'created_at']),
+    ('ix_family_connections_caregiver_status', 'family_connections', ['caregiver_id', 'status']),
+    ('ix_family_connections_elder_status', 'family_connections', ['elder_id', 'status']),
+]
+
+
+def upgrade() -> None:
+    # On PostgreSQL build the indexes without blocking writes; CONCURRENTLY
+    # cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,34 @@
+"""Indexes backing keyset pagination of list endpoints
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:20:42
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_medicines_user_created', 'medicines', ['user_id', 'created_at']),
+    ('ix_medicine_reminders_user_created', 'medicine_reminders', ['user_id', 'created_at']),
+    ('ix_health_records_user_recorded', 'health_records', ['user_id', 'date_recorded']),
+    ('ix_family_messages_receiver_created', 'family_messages', ['receiver_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
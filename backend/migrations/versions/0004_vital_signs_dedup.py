@@ -0,0 +1,36 @@
+"""Unique device reading per user and measurement time
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:05:11
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the first copy of readings a device already uploaded twice
+    op.execute(
+        "DELETE FROM vital_signs WHERE device_name IS NOT NULL AND id NOT IN ("
+        "SELECT MIN(id) FROM vital_signs WHERE device_name IS NOT NULL "
+        "GROUP BY user_id, device_name, measurement_date)"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_vital_signs_user_device_measurement', 'vital_signs',
+            ['user_id', 'device_name', 'measurement_date'],
+            unique=True, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_vital_signs_user_device_measurement', table_name='vital_signs',
+                      postgresql_concurrently=True)
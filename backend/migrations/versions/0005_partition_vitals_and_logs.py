@@ -0,0 +1,106 @@
+"""Partition vital_signs and medicine_logs by month (Postgres)
+
+Rebuilds each table as a range-partitioned parent with one partition per
+month of existing data, the next three months and a default partition, then
+copies the rows across. Postgres requires the partition key in the primary
+key, so the table's primary key becomes (id, <timestamp>); ids still come
+from the same sequence. Upcoming partitions and retention are handled by
+app.services.partitions. Takes exclusive locks while copying: run it in a
+maintenance window. Other databases are left unpartitioned.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:02:37
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+TABLES = [
+    {
+        'name': 'vital_signs',
+        'column': 'measurement_date',
+        'foreign_keys': [('user_id', 'users')],
+        'indexes': [
+            ('ix_vital_signs_id', ['id'], False),
+            ('ix_vital_signs_user_measurement', ['user_id', 'measurement_date'], False),
+            ('uq_vital_signs_user_device_measurement', ['user_id', 'device_name', 'measurement_date'], True),
+        ],
+    },
+    {
+        'name': 'medicine_logs',
+        'column': 'scheduled_time',
+        'foreign_keys': [('medicine_id', 'medicines'), ('reminder_id', 'medicine_reminders'), ('user_id', 'users')],
+        'indexes': [
+            ('ix_medicine_logs_id', ['id'], False),
+            ('ix_medicine_logs_user_scheduled', ['user_id', 'scheduled_time'], False),
+        ],
+    },
+]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def rebuild(table: dict, partitioned: bool) -> None:
+    """Recreate ``table`` (partitioned or plain) with the same columns, rows, keys and indexes."""
+    name, column = table['name'], table['column']
+    old = f'{name}_old'
+    bind = op.get_bind()
+
+    op.execute(f'ALTER TABLE {name} RENAME TO {old}')
+    op.execute(f'ALTER SEQUENCE {name}_id_seq OWNED BY NONE')
+    if partitioned:
+        op.execute(f'CREATE TABLE {name} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})')
+        op.execute(f'CREATE TABLE {name}_default PARTITION OF {name} DEFAULT')
+        now = datetime.now(timezone.utc)
+        oldest = bind.execute(sa.text(f'SELECT min({column}) FROM {old}')).scalar() or now
+        oldest = oldest.astimezone(timezone.utc)
+        month = date(oldest.year, oldest.month, 1)
+        last = add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            upper = add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {name}_y{month.year:04d}m{month.month:02d} PARTITION OF {name} "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+            )
+            month = upper
+        primary_key = f'id, {column}'
+    else:
+        op.execute(f'CREATE TABLE {name} (LIKE {old} INCLUDING DEFAULTS)')
+        primary_key = 'id'
+
+    op.execute(f'INSERT INTO {name} SELECT * FROM {old}')
+    op.execute(f'DROP TABLE {old} CASCADE')
+    op.execute(f'ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY ({primary_key})')
+    op.execute(f'ALTER SEQUENCE {name}_id_seq OWNED BY {name}.id')
+    for local, remote in table['foreign_keys']:
+        op.create_foreign_key(f'{name}_{local}_fkey', name, remote, [local], ['id'])
+    for index, columns, unique in table['indexes']:
+        op.create_index(index, name, columns, unique=unique)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in reversed(TABLES):
+        rebuild(table, partitioned=False)
@@ -0,0 +1,41 @@
+"""Hourly and daily vital signs rollups
+
+The tables start empty; fill them from existing readings with
+``python -m app.services.rollups`` after upgrading.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:11:48
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['vital_rollups_hourly', 'vital_rollups_daily']
+
+
+def upgrade() -> None:
+    for name in TABLES:
+        op.create_table(name,
+        sa.Column('metric', sa.String(length=30), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('value_min', sa.Float(), nullable=False),
+        sa.Column('value_max', sa.Float(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'metric', 'bucket_start')
+        )
+
+
+def downgrade() -> None:
+    for name in reversed(TABLES):
+        op.drop_table(name)
@@ -0,0 +1,51 @@
+"""Abnormal vital signs flags: reason column and per-user thresholds
+
+Existing readings are flagged by ``python -m app.services.flags`` after
+upgrading. glucose_unit is widened to fit "mmol/L".
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:24:05
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('vital_signs') as batch_op:
+        batch_op.add_column(sa.Column('flag_reason', sa.String(length=255), nullable=True))
+        batch_op.alter_column('glucose_unit', existing_type=sa.String(length=5), type_=sa.String(length=10),
+                              existing_nullable=True)
+
+    op.create_table('vital_thresholds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('low', sa.Float(), nullable=True),
+    sa.Column('high', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_vital_thresholds_id'), 'vital_thresholds', ['id'], unique=False)
+    op.create_index('uq_vital_thresholds_user_metric', 'vital_thresholds', ['user_id', 'metric'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_vital_thresholds_user_metric', table_name='vital_thresholds')
+    op.drop_index(op.f('ix_vital_thresholds_id'), table_name='vital_thresholds')
+    op.drop_table('vital_thresholds')
+
+    with op.batch_alter_table('vital_signs') as batch_op:
+        batch_op.alter_column('glucose_unit', existing_type=sa.String(length=10), type_=sa.String(length=5),
+                              existing_nullable=True)
+        batch_op.drop_column('flag_reason')
@@ -0,0 +1,33 @@
+"""Canonical-unit columns on vital_signs
+
+Fill them for existing readings (then re-flag and rebuild the rollups, which
+read them) with ``python -m app.services.vitals`` after upgrading.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:40:52
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ['temperature_c', 'weight_kg', 'height_cm', 'glucose_mg_dl']
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('vital_signs') as batch_op:
+        for name in COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('vital_signs') as batch_op:
+        for name in reversed(COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,39 @@
+"""Outbox dedup key claims
+
+Workers claim a dedup key in the delivery transaction, so rows sharing a key
+are sent once even when different workers pick them up. Keys already sent are
+claimed by their earliest sent row.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 20:12:37
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_dedup_keys',
+    sa.Column('dedup_key', sa.String(length=200), nullable=False),
+    sa.Column('outbox_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['outbox_id'], ['notification_outbox.id'], ),
+    sa.PrimaryKeyConstraint('dedup_key')
+    )
+    op.execute(
+        "INSERT INTO notification_dedup_keys (dedup_key, outbox_id) "
+        "SELECT dedup_key, MIN(id) FROM notification_outbox "
+        "WHERE dedup_key IS NOT NULL AND status = 'sent' GROUP BY dedup_key"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_dedup_keys')
@@ -0,0 +1,120 @@
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import models  # noqa: F401  (registers all tables on Base.metadata)
+from app.database import Base, get_async_db, get_db
+from app.main import app
+from app.services.device_tokens import device_token_registry
+from app.services.emergency import emergency_lane
+from app.utils.auth import token_cache
+from app.utils.principals import principal_cache
+
+# Tests marked ``postgres`` run only when DATABASE_URL names a PostgreSQL server (as in CI)
+POSTGRES_URL = os.environ.get("DATABASE_URL", "") if os.environ.get("DATABASE_URL", "").startswith("postgresql") else ""
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs DATABASE_URL pointing at a PostgreSQL server")
+
+
+def pytest_collection_modifyitems(config, items):
+    if POSTGRES_URL:
+        return
+    skip = pytest.mark.skip(reason="DATABASE_URL is not a PostgreSQL database")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached tokens, principals, devices and contacts from leaking between tests."""
+    token_cache.clear()
+    principal_cache.clear()
+    device_token_registry.clear()
+    emergency_lane.contacts.clear()
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """Path of a throwaway SQLite database with every table created."""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def async_session_factory(db_url):
+    """AsyncSession factory bound to the test database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_url}", poolclass=NullPool)
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def sync_session_factory(db_url):
+    """Session factory bound to the test database."""
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{db_url}", poolclass=NullPool)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db_client(async_session_factory, sync_session_factory):
+    """TestClient whose database dependencies point at the test database."""
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    def override_get_db():
+        db = sync_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+
+@pytest.fixture
+def auth_headers(db_client):
+    """Log a user in through the API (registering them first if needed) and return their bearer header."""
+    def login(email="asha@example.com", password="s3cret-pass"):
+        db_client.post("/api/v1/auth/register", json={
+            "email": email, "password": password, "first_name": "A", "last_name": "B"
+        })
+        token = db_client.post("/api/v1/auth/login", json={
+            "email": email, "password": password
+        }).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return login
+
+@pytest.fixture
+def postgres_url():
+    """URL of a throwaway schema on the DATABASE_URL PostgreSQL server, dropped afterwards."""
+    url = make_url(POSTGRES_URL)
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        yield url.update_query_dict({"options": f"-csearch_path={schema}"}).render_as_string(hide_password=False)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        engine.dispose()
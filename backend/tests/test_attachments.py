@@ -0,0 +1,74 @@
+import io
+import os
+
+import pytest
+
+from app.utils.attachment_crypto import (
+    AttachmentDecryptionError,
+    EncryptedAttachmentReader,
+    decrypt_stream,
+    encrypt_stream,
+)
+
+
+def pieces(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("length", [0, 1, 1023, 1024, 1025, 5000])
+def test_stream_round_trip(length):
+    """Test chunked encryption round trips across chunk boundaries."""
+    data = os.urandom(length)
+    ciphertext = b"".join(encrypt_stream(pieces(data, 300), chunk_size=1024))
+    assert b"".join(decrypt_stream(pieces(ciphertext, 777))) == data
+
+
+def test_stream_detects_truncation_and_tampering():
+    """Test that dropped or modified chunks fail authentication."""
+    data = os.urandom(4096)
+    ciphertext = b"".join(encrypt_stream([data], chunk_size=1024))
+
+    with pytest.raises(AttachmentDecryptionError):
+        b"".join(decrypt_stream([ciphertext[:-(1024 + 16)]]))
+
+    tampered = bytearray(ciphertext)
+    tampered[-5] ^= 1
+    with pytest.raises(AttachmentDecryptionError):
+        b"".join(decrypt_stream([bytes(tampered)]))
+
+
+def test_random_access_reads():
+    """Test that byte ranges decrypt only the chunks they cover."""
+    data = os.urandom(10000)
+    reader = EncryptedAttachmentReader(io.BytesIO(b"".join(encrypt_stream([data], chunk_size=1024))))
+    assert reader.size == len(data)
+    assert reader.read_chunk(3) == data[3072:4096]
+    assert b"".join(reader.iter_range(1000, 5000)) == data[1000:5000]
+
+
+def test_attachment_upload_and_download(db_client, auth_headers, sync_session_factory, tmp_path, monkeypatch):
+    """Test streaming an attachment in and out through the API."""
+    from app.config import settings
+    from app.models.family import FamilyMessage
+
+    monkeypatch.setattr(settings, "attachment_storage_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "attachment_chunk_size", 1024)
+
+    headers = auth_headers()
+
+    with sync_session_factory() as db:
+        message = FamilyMessage(sender_id=1, receiver_id=1, content="scan attached")
+        db.add(message)
+        db.commit()
+        message_id = message.id
+
+    data = os.urandom(5000)
+    url = f"/api/v1/family/messages/{message_id}/attachment"
+    response = db_client.put(url, content=data, headers=headers)
+    assert response.status_code == 201
+    assert data not in (tmp_path / f"message-{message_id}.enc").read_bytes()
+
+    assert db_client.get(url, headers=headers).content == data
+    response = db_client.get(url, headers={**headers, "Range": "bytes=1500-2999"})
+    assert response.status_code == 206
+    assert response.content == data[1500:3000]
@@ -0,0 +1,187 @@
+def register(client, email="asha@example.com", password="s3cret-pass"):
+    return client.post("/api/v1/auth/register", json={
+        "email": email,
+        "password": password,
+        "first_name": "Asha",
+        "last_name": "Rao"
+    })
+
+
+def test_register_and_login(db_client):
+    """Test that a registered user can log in through the async session."""
+    response = register(db_client)
+    assert response.status_code == 201
+    assert response.json()["email"] == "asha@example.com"
+
+    response = db_client.post("/api/v1/auth/login", json={
+        "email": "asha@example.com",
+        "password": "s3cret-pass"
+    })
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+def test_register_duplicate_email(db_client):
+    """Test that registering the same email twice is rejected."""
+    assert register(db_client).status_code == 201
+    assert register(db_client).status_code == 400
+
+
+def test_login_wrong_password(db_client):
+    """Test that a wrong password is rejected."""
+    register(db_client)
+    response = db_client.post("/api/v1/auth/login", json={
+        "email": "asha@example.com",
+        "password": "wrong"
+    })
+    assert response.status_code == 401
+
+
+def test_hash_pool_rejects_when_saturated():
+    """Test that the hashing pool sheds load once workers and queue are full."""
+    import asyncio
+    import threading
+
+    import pytest
+
+    from app.utils.auth import HashingPoolSaturated, PasswordHashPool
+
+    pool = PasswordHashPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queue_depth"] == 1
+        with pytest.raises(HashingPoolSaturated):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    pool.shutdown()
+
+
+def test_metrics_exposes_hash_pool(db_client):
+    """Test that the metrics endpoint reports hashing pool state."""
+    register(db_client)
+    data = db_client.get("/metrics").json()
+    assert data["password_hashing"]["completed"] >= 1
+    assert "queue_depth" in data["password_hashing"]
+
+
+def test_principal_cache_invalidated_on_deactivation(db_client, auth_headers, sync_session_factory):
+    """Test that deactivating a user takes effect despite the cached principal."""
+    from app.models.user import User
+    from app.utils.principals import principal_cache
+
+    headers = auth_headers()
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 200
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 200
+    assert principal_cache.stats()["hits"] >= 1
+
+    with sync_session_factory() as db:
+        db.query(User).one().is_active = False
+        db.commit()
+
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 400
+
+
+def test_bulk_user_statements_invalidate_principals(db_client, auth_headers, sync_session_factory):
+    """Test that a committed bulk update(User) drops cached principals and a rolled-back one does not."""
+    from sqlalchemy import update
+
+    from app.models.user import User
+    from app.utils.principals import principal_cache
+
+    headers = auth_headers()
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 200
+
+    with sync_session_factory() as db:
+        db.execute(update(User).values(role="caregiver"))
+        db.rollback()
+    assert principal_cache.stats()["size"] == 1
+
+    with sync_session_factory() as db:
+        db.execute(update(User).where(User.email == "asha@example.com").values(is_active=False))
+        db.commit()
+    assert principal_cache.stats()["size"] == 0
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 400
+
+
+def test_memory_principal_cache_ttl_is_capped():
+    """Test that the per-process backend bounds staleness by memory_ttl_seconds."""
+    from app.utils.principals import PrincipalCache
+
+    assert PrincipalCache("memory", ttl_seconds=300, maxsize=10, memory_ttl_seconds=5).ttl_seconds == 5
+    assert PrincipalCache("redis", ttl_seconds=300, maxsize=10, memory_ttl_seconds=5).ttl_seconds == 300
+
+
+def test_logout_revokes_tokens(db_client):
+    """Test that logged-out access and refresh tokens are rejected."""
+    register(db_client)
+    tokens = db_client.post("/api/v1/auth/login", json={
+        "email": "asha@example.com",
+        "password": "s3cret-pass"
+    }).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 200
+
+    response = db_client.post(
+        "/api/v1/auth/logout",
+        params={"refresh_token": tokens["refresh_token"]},
+        headers=headers
+    )
+    assert response.status_code == 200
+
+    assert db_client.get("/api/v1/users/profile", headers=headers).status_code == 401
+    response = db_client.post("/api/v1/auth/refresh", params={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added jti is reported as possibly present."""
+    from app.utils.revocation import BloomFilter
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    jtis = [f"jti-{i}" for i in range(1000)]
+    for jti in jtis:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in jtis)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 500
+
+
+def test_revoke_during_sync_is_not_lost():
+    """Test that a revocation landing between the backend read and the filter swap stays revoked."""
+    import asyncio
+    import time
+
+    from app.utils.revocation import MemoryRevocationBackend, RevocationStore
+
+    class SlowBackend(MemoryRevocationBackend):
+        async def live_entries(self):
+            entries = await super().live_entries()
+            self.read.set()
+            await self.release.wait()
+            return entries
+
+    async def go():
+        backend = SlowBackend()
+        backend.read, backend.release = asyncio.Event(), asyncio.Event()
+        store = RevocationStore(backend, capacity=100, error_rate=0.01, sync_seconds=60)
+        await store.revoke("before", time.time() + 60)
+        sync = asyncio.create_task(store.sync())
+        await backend.read.wait()
+        await store.revoke("during", time.time() + 60)
+        backend.release.set()
+        await sync
+        return store
+
+    store = asyncio.run(go())
+    assert asyncio.run(store.is_revoked("before"))
+    assert asyncio.run(store.is_revoked("during"))
+    assert store.stats()["backend_checks"] == 2
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from app.utils import auth
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the cache stays bounded and evicts the LRU entry."""
+    cache = TTLCache(maxsize=2, default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_never_serves_expired_entries(monkeypatch):
+    """Test that entries disappear at their expiry time."""
+    now = time.time()
+    cache = TTLCache(maxsize=10)
+    cache.set("token", {"sub": "a"}, expires_at=now + 5)
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_verify_token_uses_cache():
+    """Test that a verified token is served from the cache on reuse."""
+    auth.token_cache.clear()
+    token = auth.create_access_token({"sub": "asha@example.com"}, expires_delta=timedelta(minutes=5))
+    hits = auth.token_cache.hits
+
+    assert auth.verify_token(token)["sub"] == "asha@example.com"
+    assert auth.verify_token(token)["sub"] == "asha@example.com"
+    assert auth.token_cache.hits == hits + 1
+    assert auth.verify_token(token + "x") is None
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.models.notification import DeviceToken, NotificationOutbox
+from app.services.device_tokens import device_token_registry, invalid_tokens
+from app.services.outbox import OutboxWorker, enqueue_push
+from app.utils import notifications
+from app.utils.notifications import LocalTransport, TokenResult
+
+
+@pytest.fixture
+def local_transport():
+    transport = LocalTransport()
+    notifications.set_push_transport(transport)
+    yield transport
+    notifications.set_push_transport(None)
+
+
+def registered(sync_session_factory):
+    with sync_session_factory() as db:
+        return sorted((row.user_id, row.token) for row in db.query(DeviceToken))
+
+
+def test_register_deduplicates_and_moves_tokens(db_client, auth_headers, sync_session_factory):
+    """Test that a token is stored once and follows the latest signed-in user."""
+    asha = auth_headers("asha@example.com")
+    ravi = auth_headers("ravi@example.com")
+
+    for _ in range(2):
+        response = db_client.post("/api/v1/users/fcm-token", json={"token": "tablet", "platform": "android"},
+                                  headers=asha)
+        assert response.status_code == 200
+    db_client.post("/api/v1/users/fcm-token", json={"token": "phone"}, headers=asha)
+    assert registered(sync_session_factory) == [(1, "phone"), (1, "tablet")]
+
+    db_client.post("/api/v1/users/fcm-token", json={"token": "tablet"}, headers=ravi)
+    assert registered(sync_session_factory) == [(1, "phone"), (2, "tablet")]
+
+    response = db_client.request("DELETE", "/api/v1/users/fcm-token", json={"token": "tablet"}, headers=asha)
+    assert response.status_code == 404
+    response = db_client.request("DELETE", "/api/v1/users/fcm-token", json={"token": "tablet"}, headers=ravi)
+    assert response.status_code == 200
+    assert registered(sync_session_factory) == [(1, "phone")]
+
+
+def test_outbox_prunes_unregistered_tokens(db_client, auth_headers, async_session_factory, sync_session_factory,
+                                           local_transport):
+    """Test that tokens rejected by the provider are removed after a send."""
+    headers = auth_headers("asha@example.com")
+    for token in ("phone", "invalid-old-phone"):
+        db_client.post("/api/v1/users/fcm-token", json={"token": token}, headers=headers)
+    with sync_session_factory() as db:
+        enqueue_push(db, recipient_user_id=1, title="Reminder", body="Take Metformin")
+        db.commit()
+
+    pruned = device_token_registry.stats()["pruned"]
+    worker = OutboxWorker(session_factory=async_session_factory)
+    asyncio.run(worker.drain_once())
+
+    assert registered(sync_session_factory) == [(1, "phone")]
+    with sync_session_factory() as db:
+        assert db.query(NotificationOutbox).one().status == "sent"
+    assert device_token_registry.stats()["pruned"] == pruned + 1
+
+
+def test_invalid_argument_needs_a_successful_sibling():
+    """Test that INVALID_ARGUMENT only prunes when the payload itself was accepted."""
+    failed = [TokenResult("a", False, error="InvalidArgumentError")]
+    assert invalid_tokens(failed) == []
+    assert invalid_tokens(failed + [TokenResult("b", True, message_id="m1")]) == ["a"]
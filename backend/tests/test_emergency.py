@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.family import FamilyConnection
+from app.models.notification import DeviceToken, NotificationOutbox
+from app.models.user import User, UserProfile
+from app.services.emergency import EmergencyContacts, EmergencyLane, emergency_lane
+from app.services.outbox import OutboxWorker
+from app.utils import notifications
+from app.utils.metrics import LatencyHistogram
+from app.utils.notifications import LocalTransport, TokenResult
+
+
+class RecordingTransport(LocalTransport):
+    def __init__(self):
+        super().__init__()
+        self.multicasts = []
+        self.fail_tokens = set()
+
+    def send_multicast(self, tokens, title, body, data):
+        self.multicasts.append((title, list(tokens), data.get("type")))
+        return [
+            TokenResult(token, False, error="UnavailableError") if token in self.fail_tokens else result
+            for token, result in zip(tokens, super().send_multicast(tokens, title, body, data))
+        ]
+
+
+@pytest.fixture
+def transport():
+    transport = RecordingTransport()
+    notifications.set_push_transport(transport)
+    yield transport
+    notifications.set_push_transport(None)
+
+
+def seed(sync_session_factory, caregiver_tokens):
+    """Elder 1 with an accepted emergency contact (2), a plain caregiver (3) and a pending contact (4)."""
+    with sync_session_factory() as db:
+        for user_id in range(1, 5):
+            db.add(User(id=user_id, email=f"user{user_id}@example.com", hashed_password="x"))
+        db.add(UserProfile(user_id=1, first_name="Asha", last_name="Rao"))
+        for caregiver_id, emergency, status in ((2, True, "accepted"), (3, False, "accepted"), (4, True, "pending")):
+            db.add(FamilyConnection(elder_id=1, caregiver_id=caregiver_id, relationship_type="family",
+                                    status=status, emergency_contact=emergency))
+            db.add(DeviceToken(user_id=caregiver_id, token=f"{caregiver_tokens}{caregiver_id}"))
+        db.commit()
+
+
+def run_alert(lane, handle=True):
+    async def go():
+        async with lane.session_factory() as db:
+            await lane.trigger(db, 1, "fall", "Kitchen floor")
+        if handle:
+            await lane.handle(lane._get_queue().get_nowait())
+    asyncio.run(go())
+
+
+def outbox(sync_session_factory):
+    with sync_session_factory() as db:
+        entries = db.query(NotificationOutbox).order_by(NotificationOutbox.recipient_user_id, NotificationOutbox.id)
+        return [(entry.channel, entry.recipient_user_id, entry.status) for entry in entries]
+
+
+def test_alert_reaches_only_emergency_contacts(async_session_factory, sync_session_factory, transport):
+    """Test that the lane pushes to accepted emergency contacts and records latency."""
+    seed(sync_session_factory, "phone-")
+    lane = EmergencyLane(session_factory=async_session_factory, slo_seconds=5.0,
+                         contacts=EmergencyContacts(maxsize=10, ttl_seconds=60))
+    run_alert(lane)
+
+    assert transport.multicasts == [("Emergency Alert - Asha Rao", ["phone-2"], "emergency")]
+    assert outbox(sync_session_factory) == [("push", 2, "sent")]
+    stats = lane.stats()
+    assert stats["delivered"] == 1
+    assert stats["latency_seconds"]["count"] == 1
+    assert stats["latency_seconds"]["slo_breaches"] == 0
+    assert stats["latency_by_outcome"]["delivered"]["count"] == 1
+    lane.shutdown()
+
+
+def test_undelivered_alert_falls_back_to_outbox(async_session_factory, sync_session_factory, transport):
+    """Test that a contact whose only device is unregistered is emailed instead."""
+    seed(sync_session_factory, "invalid-")
+    lane = EmergencyLane(session_factory=async_session_factory,
+                         contacts=EmergencyContacts(maxsize=10, ttl_seconds=60))
+    run_alert(lane)
+
+    assert outbox(sync_session_factory) == [("push", 2, "skipped"), ("email", 2, "pending")]
+    stats = lane.stats()
+    assert (stats["fallbacks"], stats["delivered"]) == (1, 0)
+    assert stats["latency_seconds"]["count"] == 1  # alerts that reach no one still count against the SLO
+    assert stats["latency_by_outcome"]["fallback"]["count"] == 1
+    lane.shutdown()
+
+
+def test_each_unreached_contact_falls_back(async_session_factory, sync_session_factory, transport):
+    """Test that contacts are retried per caregiver even when another caregiver's device accepted."""
+    seed(sync_session_factory, "phone-")
+    with sync_session_factory() as db:
+        for user_id in (5, 6, 7):
+            db.add(User(id=user_id, email=f"user{user_id}@example.com", hashed_password="x"))
+            db.add(FamilyConnection(elder_id=1, caregiver_id=user_id, relationship_type="family",
+                                    status="accepted", emergency_contact=True))
+        db.add(DeviceToken(user_id=5, token="invalid-5"))  # unregistered app
+        db.add(DeviceToken(user_id=6, token="offline-6"))  # provider accepts nothing right now
+        db.commit()  # caregiver 7 has no device
+    transport.fail_tokens = {"offline-6"}
+    lane = EmergencyLane(session_factory=async_session_factory,
+                         contacts=EmergencyContacts(maxsize=10, ttl_seconds=60))
+    run_alert(lane)
+
+    assert outbox(sync_session_factory) == [
+        ("push", 2, "sent"),
+        ("push", 5, "skipped"), ("email", 5, "pending"),
+        ("push", 6, "pending"),
+        ("push", 7, "skipped"), ("email", 7, "pending"),
+    ]
+    with sync_session_factory() as db:
+        assert db.query(DeviceToken).filter_by(token="invalid-5").count() == 0
+        retry = db.query(NotificationOutbox).filter_by(recipient_user_id=6).one()
+        assert retry.next_attempt_at.replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc)
+    stats = lane.stats()
+    assert (stats["delivered"], stats["fallbacks"], stats["no_devices"]) == (1, 3, 2)
+    lane.shutdown()
+
+
+def test_unhandled_alert_is_delivered_by_the_outbox(async_session_factory, sync_session_factory, transport):
+    """Test that an acknowledged alert the lane never handled (e.g. a crash) is pushed after the grace period."""
+    seed(sync_session_factory, "phone-")
+    lane = EmergencyLane(session_factory=async_session_factory, outbox_grace_seconds=30,
+                         contacts=EmergencyContacts(maxsize=10, ttl_seconds=60))
+    run_alert(lane, handle=False)
+    worker = OutboxWorker(session_factory=async_session_factory)
+    now = datetime.now(timezone.utc)
+
+    assert asyncio.run(worker.drain_once(now)) == 0  # the lane has the grace period to itself
+    asyncio.run(worker.drain_once(now + timedelta(seconds=31)))
+    assert outbox(sync_session_factory) == [("push", 2, "sent")]
+    assert transport.multicasts == [("Emergency Alert - Asha Rao", ["phone-2"], "emergency")]
+
+    asyncio.run(lane.handle(lane._get_queue().get_nowait()))  # a late lane leaves the outbox's rows alone
+    assert len(transport.multicasts) == 1
+    lane.shutdown()
+
+
+def test_connection_change_invalidates_contacts(async_session_factory, sync_session_factory):
+    """Test that committed FamilyConnection changes drop the elder's cached recipients."""
+    seed(sync_session_factory, "phone-")
+
+    async def load():
+        async with async_session_factory() as db:
+            return await emergency_lane.contacts.get(db, 1)
+
+    assert asyncio.run(load()).caregiver_ids == (2,)
+    with sync_session_factory() as db:
+        db.query(FamilyConnection).filter_by(caregiver_id=4).one().status = "accepted"
+        db.commit()
+    assert asyncio.run(load()).caregiver_ids == (2, 4)
+
+
+def test_latency_histogram_quantiles_and_slo():
+    """Test cumulative buckets, bucket-bound quantiles and SLO breach counting."""
+    histogram = LatencyHistogram(buckets=(0.1, 1.0), slo_seconds=0.5)
+    for seconds in (0.05, 0.05, 0.7, 3.0):
+        histogram.observe(seconds)
+
+    stats = histogram.stats()
+    assert stats["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert stats["p50"] == 0.1
+    assert stats["p99"] == 3.0
+    assert stats["slo_breaches"] == 2
@@ -0,0 +1,128 @@
+import asyncio
+import csv
+import gc
+import gzip
+import io
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.health import HealthRecord, VitalSigns
+from app.models.medicine import MedicineLog
+from app.services.export import export_history
+
+
+def seed_history(db, user_id):
+    db.add(HealthRecord(user_id=user_id, record_type="diagnosis", title="Hypertension",
+                        date_recorded=datetime(2023, 5, 1).date()))
+    for hour in (9, 8):
+        db.add(VitalSigns(user_id=user_id, measurement_date=datetime(2024, 1, 1, hour), systolic_bp=120 + hour))
+    db.add(MedicineLog(user_id=user_id, medicine_id=1, scheduled_time=datetime(2024, 1, 1, 8), status="taken"))
+    db.commit()
+
+
+def test_ndjson_export_streams_own_history(db_client, auth_headers, sync_session_factory):
+    """Test that the NDJSON export has every kind, tagged and in time order, and only the caller's rows."""
+    headers = auth_headers("asha@example.com")
+    auth_headers("ravi@example.com")
+    with sync_session_factory() as db:
+        seed_history(db, user_id=1)
+        seed_history(db, user_id=2)
+
+    response = db_client.get("/api/v1/health/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="health-history.ndjson"' in response.headers["content-disposition"]
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["health_records", "vital_signs", "vital_signs", "medicine_logs"]
+    assert {line["user_id"] for line in lines} == {1}
+    assert [line["systolic_bp"] for line in lines[1:3]] == [128, 129]
+    assert lines[0]["date_recorded"] == "2023-05-01"
+
+
+def test_csv_export_one_kind(db_client, auth_headers, sync_session_factory):
+    """Test that CSV exports a single kind with a header row, and refuses several kinds."""
+    headers = auth_headers("asha@example.com")
+    with sync_session_factory() as db:
+        seed_history(db, user_id=1)
+
+    response = db_client.get("/api/v1/health/export", headers=headers,
+                             params={"format": "csv", "include": "vital_signs"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["systolic_bp"] for row in rows] == ["128", "129"]
+    assert rows[0]["bmi"] == ""
+
+    response = db_client.get("/api/v1/health/export", headers=headers, params={"format": "csv"})
+    assert response.status_code == 400
+
+
+def test_gzip_export(db_client, auth_headers, sync_session_factory):
+    """Test that gzip=true returns a gzip stream of the same NDJSON."""
+    headers = auth_headers("asha@example.com")
+    with sync_session_factory() as db:
+        seed_history(db, user_id=1)
+
+    plain = db_client.get("/api/v1/health/export", headers=headers).content
+    response = db_client.get("/api/v1/health/export", headers=headers, params={"gzip": "true"})
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="health-history.ndjson.gz"' in response.headers["content-disposition"]
+    assert gzip.decompress(response.content) == plain
+
+
+def _insert_vitals(db_url, count):
+    start = datetime(2020, 1, 1)
+    connection = sqlite3.connect(str(db_url))
+    connection.executemany(
+        "INSERT INTO vital_signs (user_id, measurement_date, systolic_bp, diastolic_bp, heart_rate) "
+        "VALUES (1, ?, 120, 80, 70)",
+        ((str(start + timedelta(minutes=i)),) for i in range(count))
+    )
+    connection.commit()
+    connection.close()
+
+
+def _rss():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _export_peak(db_url):
+    """Bytes exported and peak resident memory growth during a full vital_signs export."""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_url}", poolclass=NullPool)
+        gc.collect()
+        baseline = peak = _rss()
+        size = 0
+        async for chunk in export_history(engine, 1, ["vital_signs"], compress=True):
+            size += len(chunk)
+            peak = max(peak, _rss())
+        await engine.dispose()
+        return size, peak - baseline
+
+    return asyncio.run(run())
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="reads resident memory from procfs")
+def test_export_memory_is_flat(tmp_path, db_url):
+    """Test that exporting 1M readings takes about as much memory as exporting 10k."""
+    small_url = tmp_path / "small.db"
+    engine = create_engine(f"sqlite:///{small_url}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    _insert_vitals(small_url, 10_000)
+    _insert_vitals(db_url, 1_000_000)
+
+    small_size, small_growth = _export_peak(small_url)
+    size, growth = _export_peak(db_url)
+    assert size > 50 * small_size  # the history was really read
+    assert growth < 32 * 1024 * 1024
+    assert growth < small_growth + 16 * 1024 * 1024
@@ -0,0 +1,58 @@
+import json
+
+from app.models.family import FamilyConnection, FamilyMessage
+from app.models.notification import NotificationOutbox
+
+
+def test_messages_need_an_accepted_connection(db_client, auth_headers, sync_session_factory):
+    """Test that users can only message their accepted family connections."""
+    asha = auth_headers("asha@example.com")
+    auth_headers("ravi@example.com")
+    message = {"receiver_id": 2, "content": "Hello"}
+    with sync_session_factory() as db:
+        db.add(FamilyConnection(elder_id=1, caregiver_id=2, relationship_type="family", status="pending"))
+        db.commit()
+
+    assert db_client.post("/api/v1/family/messages", json=message, headers=asha).status_code == 404
+    assert db_client.post("/api/v1/family/messages", json={**message, "receiver_id": 99},
+                          headers=asha).status_code == 404
+    with sync_session_factory() as db:
+        assert db.query(FamilyMessage).count() == 0
+        assert db.query(NotificationOutbox).count() == 0
+        db.query(FamilyConnection).one().status = "accepted"
+        db.commit()
+
+    assert db_client.post("/api/v1/family/messages", json=message, headers=asha).status_code == 201
+
+
+def test_undecryptable_message_is_marked(db_client, auth_headers, sync_session_factory):
+    """Test that a message that fails to decrypt is returned with a decryption error, not as blank text."""
+    auth_headers("asha@example.com")
+    ravi = auth_headers("ravi@example.com")
+    with sync_session_factory() as db:
+        db.add(FamilyMessage(sender_id=1, receiver_id=2, content=json.dumps({"salt": "bm9wZQ==", "data": "x"}),
+                             is_encrypted=True))
+        db.add(FamilyMessage(sender_id=1, receiver_id=2, content="Plain note", is_encrypted=False))
+        db.commit()
+
+    items = db_client.get("/api/v1/family/messages", headers=ravi).json()["items"]
+    assert [(item["content"], item["decryption_error"]) for item in items] == [
+        ("Plain note", None),
+        ("", "Message could not be decrypted"),
+    ]
+
+
+def test_emergency_alert_is_recorded_before_it_is_acknowledged(db_client, auth_headers, sync_session_factory):
+    """Test that the 202 for an emergency comes after its outbox rows are committed."""
+    asha = auth_headers("asha@example.com")
+    auth_headers("ravi@example.com")
+    with sync_session_factory() as db:
+        db.add(FamilyConnection(elder_id=1, caregiver_id=2, relationship_type="family", status="accepted",
+                                emergency_contact=True))
+        db.commit()
+
+    response = db_client.post("/api/v1/family/emergency", json={"emergency_type": "fall"}, headers=asha)
+    assert response.status_code == 202
+    with sync_session_factory() as db:
+        entry = db.query(NotificationOutbox).one()
+        assert (entry.recipient_user_id, entry.dedup_key) == (2, f"emergency:{response.json()['alert_id']}:2")
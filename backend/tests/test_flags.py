@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from app.models.health import VitalSigns, VitalThreshold
+from app.services.flags import FlagEngine, Threshold, backfill
+from app.services.vitals import normalize
+from app.utils.units import to_canonical, to_canonical_array
+
+
+def test_unit_conversion_is_vectorized_and_strict():
+    """Test affine conversion per row, case-insensitive units and NaN for unknown units."""
+    values = np.array([98.6, 37.0, 300.0, np.nan])
+    converted = to_canonical_array(values, ["F", None, "furlongs", "c"], "temperature")
+    assert np.allclose(converted[:2], [37.0, 37.0])
+    assert np.isnan(converted[2:]).all()
+    assert to_canonical(7.0, "mmol/L", "glucose") == 126.109
+    assert to_canonical(1.0, "parsecs", "height") is None
+
+
+def test_engine_applies_units_and_per_user_overrides():
+    """Test that glucose in mmol/L and a user's own glucose target are both respected."""
+    engine = FlagEngine()
+    readings = [
+        normalize({"user_id": 1, "blood_glucose": 11.0, "glucose_unit": "mmol/L"}),  # 198 mg/dL
+        normalize({"user_id": 2, "blood_glucose": 198.0, "glucose_unit": "mg/dL"}),
+        normalize({"user_id": 1, "systolic_bp": 120, "heart_rate": 45, "temperature": 100.4, "temperature_unit": "F"}),
+        normalize({"user_id": 3, "oxygen_saturation": 99.0}),
+    ]
+    flagged, reasons = engine.evaluate(readings, {2: {"blood_glucose": Threshold(None, 220)}})
+
+    assert flagged.tolist() == [True, False, True, False]
+    assert reasons[0] == "blood_glucose 198.172 > 180"
+    assert reasons[2] == "heart_rate 45 < 50"
+    assert reasons[1] is None and reasons[3] is None
+
+
+def test_ingest_flags_with_user_thresholds(db_client, auth_headers, sync_session_factory):
+    """Test that uploads are flagged inline and threshold overrides take effect for new readings."""
+    headers = auth_headers("asha@example.com")
+    response = db_client.put("/api/v1/health/thresholds/blood_glucose", headers=headers,
+                             json={"high": 10.0, "unit": "mmol/L"})
+    glucose = next(t for t in response.json() if t["metric"] == "blood_glucose")
+    assert glucose == {"metric": "blood_glucose", "low": 70, "high": 180.156, "unit": "mg/dL", "is_override": True}
+
+    readings = [{"measurement_date": "2024-01-01T08:00:00", "device_name": "meter", "blood_glucose": 170},
+                {"measurement_date": "2024-01-01T09:00:00", "device_name": "meter", "blood_glucose": 190}]
+    db_client.post("/api/v1/health/vitals/bulk", json=readings, headers=headers)
+    single = db_client.post("/api/v1/health/vitals", headers=headers, json={
+        "measurement_date": "2024-01-01T10:00:00", "systolic_bp": 200, "diastolic_bp": 85
+    }).json()
+    assert single["is_flagged"] is True
+    assert single["flag_reason"] == "systolic_bp 200 > 180"
+
+    with sync_session_factory() as db:
+        rows = db.query(VitalSigns).order_by(VitalSigns.id).all()
+        assert [(row.is_flagged, row.flag_reason) for row in rows[:2]] == [
+            (False, None), (True, "blood_glucose 190 > 180.156")
+        ]
+    assert db_client.put("/api/v1/health/thresholds/heart_rate", headers=headers,
+                         json={"low": 40, "unit": "mmol/L"}).status_code == 400
+    response = db_client.put("/api/v1/health/thresholds/blood_glucose", headers=headers, json={"low": 200})
+    assert response.status_code == 400  # above the default high of 180
+    assert "180" in response.json()["detail"]
+    reset = db_client.delete("/api/v1/health/thresholds/blood_glucose", headers=headers).json()
+    assert not any(t["is_override"] for t in reset)
+
+
+def test_backfill_updates_only_changed_rows(db_url, sync_session_factory):
+    """Test that the backfill flags stored readings in batches and is idempotent."""
+    start = datetime(2024, 1, 1)
+    with sync_session_factory() as db:
+        for i in range(25):
+            db.add(VitalSigns(user_id=1 + i % 2, measurement_date=start + timedelta(hours=i),
+                              heart_rate=130 if i % 5 == 0 else 70, is_flagged=False))
+        db.add(VitalThreshold(user_id=2, metric="heart_rate", high=140))
+        db.commit()
+
+    engine = create_engine(f"sqlite:///{db_url}")
+    with engine.connect() as connection:
+        # i = 0, 10, 20 belong to user 1; 5 and 15 to user 2, whose limit is 140
+        assert backfill(connection, batch_size=7) == {"scanned": 25, "updated": 3, "flagged": 3}
+        assert backfill(connection, batch_size=7)["updated"] == 0
+    engine.dispose()
+    with sync_session_factory() as db:
+        flagged = db.query(VitalSigns).filter_by(is_flagged=True).order_by(VitalSigns.id).all()
+        assert [row.id for row in flagged] == [1, 11, 21]
+        assert flagged[0].flag_reason == "heart_rate 130 > 120"
+        assert flagged[0].updated_at is None
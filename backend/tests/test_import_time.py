@@ -0,0 +1,15 @@
+from benchmarks.import_time import LAZY_MODULES, measure
+
+
+def test_app_import_does_not_load_lazy_modules():
+    """Test that provider SDKs and NumPy stay unloaded until first use."""
+    imported = {row.module for row in measure("app.main")}
+    assert "app.main" in imported
+    assert not imported.intersection(LAZY_MODULES)
+
+
+def test_utils_package_loads_submodules_on_demand():
+    """Test that importing one utility module does not pull in the others."""
+    imported = {row.module for row in measure("app.utils.cache")}
+    assert "app.utils.notifications" not in imported
+    assert "app.utils.security" not in imported
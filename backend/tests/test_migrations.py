@@ -0,0 +1,138 @@
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, select, text, tuple_
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models import FamilyConnection, FamilyMessage, HealthRecord, Medicine, MedicineLog, VitalSigns
+from app.migrate import SchemaRevisionMismatch, alembic_config, check_revision, head_revision
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    yield engine
+    engine.dispose()
+
+
+def migrate(engine, revision="head", action="upgrade"):
+    config = alembic_config(engine.url.render_as_string(hide_password=False))
+    config.attributes["configure_logger"] = False
+    getattr(command, action)(config, revision)
+
+
+def test_migrations_match_models(engine):
+    """Test that upgrading to head yields exactly the schema the models declare."""
+    migrate(engine)
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_revision_check_fails_fast_until_migrated(engine):
+    """Test that startup refuses an unmigrated database and accepts a current one."""
+    with pytest.raises(SchemaRevisionMismatch, match="python -m app.migrate upgrade"):
+        check_revision(engine)
+
+    migrate(engine)
+    assert check_revision(engine) == (head_revision(), head_revision())
+
+
+def query_plan(connection, stmt):
+    compiled = stmt.compile(connection)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def keyset_page(model, owner_column, sort_column):
+    """The statement app.utils.pagination.paginate issues for a page after a cursor."""
+    position = datetime(2024, 1, 1) if sort_column.type.python_type is datetime else datetime(2024, 1, 1).date()
+    return (
+        select(model)
+        .where(owner_column == 1, sort_column <= position, tuple_(sort_column, model.id) < tuple_(position, 10))
+        .order_by(sort_column.desc(), model.id.desc())
+        .limit(51)
+    )
+
+
+@pytest.mark.parametrize("stmt, index", [
+    (select(MedicineLog).where(MedicineLog.user_id == 1, MedicineLog.scheduled_time >= datetime(2024, 1, 1))
+     .order_by(MedicineLog.scheduled_time), "ix_medicine_logs_user_scheduled"),
+    (select(VitalSigns).where(VitalSigns.user_id == 1).order_by(VitalSigns.measurement_date.desc()).limit(50),
+     "ix_vital_signs_user_measurement"),
+    (select(FamilyMessage).where(FamilyMessage.receiver_id == 1, FamilyMessage.is_read.is_(False))
+     .order_by(FamilyMessage.created_at.desc()), "ix_family_messages_receiver_unread"),
+    (select(FamilyConnection).where(FamilyConnection.caregiver_id == 1, FamilyConnection.status == "accepted"),
+     "ix_family_connections_caregiver_status"),
+    (select(FamilyConnection.caregiver_id).where(FamilyConnection.elder_id == 1,
+                                                 FamilyConnection.status == "accepted",
+                                                 FamilyConnection.emergency_contact.is_(True)),
+     "ix_family_connections_elder_status"),
+    (keyset_page(VitalSigns, VitalSigns.user_id, VitalSigns.measurement_date), "ix_vital_signs_user_measurement"),
+    (keyset_page(Medicine, Medicine.user_id, Medicine.created_at), "ix_medicines_user_created"),
+    (keyset_page(HealthRecord, HealthRecord.user_id, HealthRecord.date_recorded), "ix_health_records_user_recorded"),
+    (keyset_page(FamilyMessage, FamilyMessage.receiver_id, FamilyMessage.created_at),
+     "ix_family_messages_receiver_created"),
+])
+def test_hot_queries_use_composite_indexes(engine, stmt, index):
+    """Test that the migrated indexes serve the hot query shapes without a sort."""
+    migrate(engine)
+    with engine.connect() as connection:
+        plan = query_plan(connection, stmt)
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def table_state(connection, table, column):
+    kind = connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+    rows = connection.execute(text(f"SELECT id, {column} FROM {table} ORDER BY id")).all()
+    return kind, rows
+
+
+@pytest.mark.postgres
+def test_partition_migration_keeps_rows_both_ways(postgres_url):
+    """Test that 0005 partitions vital_signs and medicine_logs with their rows, and downgrading restores them."""
+    engine = create_engine(postgres_url, poolclass=NullPool)
+    migrate(engine, "0004")
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        connection.execute(text(
+            "INSERT INTO medicines (id, user_id, name, dosage, frequency, start_date) "
+            "VALUES (1, 1, 'Metformin', '500mg', 'daily', '2024-01-01')"
+        ))
+        for day in ("2024-01-15 08:00+00", "2024-02-10 08:00+00", "2024-02-11 08:00+00"):
+            connection.execute(text("INSERT INTO vital_signs (user_id, measurement_date) VALUES (1, :d)"), {"d": day})
+            connection.execute(text(
+                "INSERT INTO medicine_logs (user_id, medicine_id, scheduled_time) VALUES (1, 1, :d)"
+            ), {"d": day})
+    with engine.connect() as connection:
+        before = {
+            "vital_signs": table_state(connection, "vital_signs", "measurement_date"),
+            "medicine_logs": table_state(connection, "medicine_logs", "scheduled_time"),
+        }
+
+    migrate(engine, "0005")
+    with engine.begin() as connection:
+        for table, column in (("vital_signs", "measurement_date"), ("medicine_logs", "scheduled_time")):
+            assert table_state(connection, table, column) == ("p", before[table][1])
+            assert connection.execute(text(f"SELECT count(*) FROM {table}_y2024m02")).scalar() == 2
+        new_id = connection.execute(text(
+            "INSERT INTO vital_signs (user_id, measurement_date) VALUES (1, now()) RETURNING id"
+        )).scalar()
+        assert new_id == 4  # the id sequence carried over
+
+    migrate(engine, "0004", action="downgrade")
+    with engine.connect() as connection:
+        assert table_state(connection, "medicine_logs", "scheduled_time") == before["medicine_logs"]
+        kind, rows = table_state(connection, "vital_signs", "measurement_date")
+        assert (kind, rows[:3]) == before["vital_signs"]
+
+    migrate(engine)  # the later migrations also apply to partitioned tables
+    with engine.connect() as connection:
+        assert table_state(connection, "vital_signs", "measurement_date")[0] == "p"
+    engine.dispose()
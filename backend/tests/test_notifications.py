@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.utils import notifications
+from app.utils.notifications import LocalTransport, send_bulk_push_notifications
+
+
+@pytest.fixture
+def local_transport():
+    transport = LocalTransport()
+    notifications.set_push_transport(transport)
+    yield transport
+    notifications.set_push_transport(None)
+
+
+def test_bulk_push_chunks_at_provider_limit(local_transport):
+    """Test that large token lists are split into multicast-sized chunks."""
+    tokens = [f"token-{i}" for i in range(1234)] + ["invalid-old-phone"]
+    result = asyncio.run(send_bulk_push_notifications(tokens, "Medicine Reminder", "Time for Metformin"))
+
+    assert local_transport.calls == 3
+    assert result["success_count"] == 1234
+    assert result["failure_count"] == 1
+    assert [r.token for r in result["responses"]] == tokens
+    assert result["responses"][-1].error == "UnregisteredError"
+
+
+def test_bulk_push_chunk_failure_is_per_token(local_transport, monkeypatch):
+    """Test that a failing chunk marks only its own tokens as failed."""
+    send = local_transport.send_multicast
+
+    def flaky(tokens, title, body, data):
+        if tokens[0] == "token-0":
+            raise ConnectionError("provider down")
+        return send(tokens, title, body, data)
+
+    monkeypatch.setattr(local_transport, "send_multicast", flaky)
+    tokens = [f"token-{i}" for i in range(600)]
+    result = asyncio.run(send_bulk_push_notifications(tokens, "t", "b", max_concurrency=1))
+
+    assert result["failure_count"] == 500
+    assert result["success_count"] == 100
+    assert result["responses"][0].error == "ConnectionError"
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.family import FamilyConnection
+from app.models.notification import NotificationDedupKey, NotificationOutbox
+from app.services.outbox import OutboxWorker, enqueue_push
+from app.utils import notifications
+from app.utils.notifications import LocalTransport
+
+
+@pytest.fixture
+def local_transport():
+    transport = LocalTransport()
+    notifications.set_push_transport(transport)
+    yield transport
+    notifications.set_push_transport(None)
+
+
+def add_push(sync_session_factory, tokens, dedup_key=None, count=1):
+    with sync_session_factory() as db:
+        for _ in range(count):
+            entry = enqueue_push(db, recipient_user_id=None, title="Reminder", body="Take Metformin",
+                                 dedup_key=dedup_key)
+            payload = json.loads(entry.payload)
+            entry.payload = json.dumps({**payload, "tokens": tokens})
+        db.commit()
+
+
+def statuses(sync_session_factory):
+    with sync_session_factory() as db:
+        return [row.status for row in db.query(NotificationOutbox).order_by(NotificationOutbox.id)]
+
+
+def test_worker_batches_and_deduplicates(async_session_factory, sync_session_factory, local_transport):
+    """Test that identical pushes share one multicast and duplicate keys send once."""
+    add_push(sync_session_factory, ["phone-a"], dedup_key="reminder:1", count=2)
+    add_push(sync_session_factory, ["phone-b"])
+    worker = OutboxWorker(session_factory=async_session_factory)
+
+    assert asyncio.run(worker.drain_once()) == 3
+    assert statuses(sync_session_factory) == ["sent", "skipped", "sent"]
+    assert local_transport.calls == 1
+    assert worker.stats()["pending"] == 0
+
+
+def test_worker_retries_with_backoff(async_session_factory, sync_session_factory, local_transport):
+    """Test that failed deliveries are rescheduled, then given up on."""
+    add_push(sync_session_factory, ["invalid-phone"])
+    worker = OutboxWorker(session_factory=async_session_factory, max_attempts=2, base_backoff_seconds=60)
+    now = datetime.now(timezone.utc)
+
+    asyncio.run(worker.drain_once(now))
+    assert statuses(sync_session_factory) == ["pending"]
+    assert asyncio.run(worker.drain_once(now)) == 0  # not due yet
+    assert worker.stats()["pending"] == 1
+
+    asyncio.run(worker.drain_once(now + timedelta(minutes=2)))
+    assert statuses(sync_session_factory) == ["failed"]
+
+
+def test_sending_message_writes_outbox_row(db_client, auth_headers, sync_session_factory):
+    """Test that a family message and its notification commit together."""
+    headers = auth_headers("asha@example.com")
+    auth_headers("ravi@example.com")
+    with sync_session_factory() as db:
+        db.add(FamilyConnection(elder_id=2, caregiver_id=1, relationship_type="family", status="accepted"))
+        db.commit()
+
+    response = db_client.post(
+        "/api/v1/family/messages",
+        json={"receiver_id": 2, "content": "Did you take your medicine?"},
+        headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["content"] == "Did you take your medicine?"
+
+    with sync_session_factory() as db:
+        entry = db.query(NotificationOutbox).one()
+        assert entry.recipient_user_id == 2
+        assert entry.dedup_key == f"family_message:{response.json()['id']}"
+
+
+def test_dedup_key_claimed_by_another_row_is_skipped(async_session_factory, sync_session_factory, local_transport):
+    """Test that a row is skipped while another row (e.g. on another worker) holds its key, until that row fails."""
+    add_push(sync_session_factory, ["invalid-phone"], dedup_key="reminder:1")
+    worker = OutboxWorker(session_factory=async_session_factory, max_attempts=2, base_backoff_seconds=60)
+    now = datetime.now(timezone.utc)
+    asyncio.run(worker.drain_once(now))  # row 1 claims the key, then is retried later
+
+    add_push(sync_session_factory, ["phone-a"], dedup_key="reminder:1")
+    asyncio.run(worker.drain_once(now + timedelta(seconds=1)))
+    assert statuses(sync_session_factory) == ["pending", "skipped"]
+    with sync_session_factory() as db:
+        assert db.query(NotificationDedupKey).one().outbox_id == 1
+
+    asyncio.run(worker.drain_once(now + timedelta(minutes=2)))  # row 1 is given up on
+    with sync_session_factory() as db:
+        assert db.query(NotificationDedupKey).count() == 0
+    add_push(sync_session_factory, ["phone-a"], dedup_key="reminder:1")
+    asyncio.run(worker.drain_once(now + timedelta(minutes=2)))
+    assert statuses(sync_session_factory) == ["failed", "skipped", "sent"]
+    assert local_transport.sent == [("phone-a", "Reminder", "Take Metformin")]
+
+
+def test_malformed_payload_fails_alone(async_session_factory, sync_session_factory, local_transport):
+    """Test that a corrupt row is retried and given up on without holding back the rest of its batch."""
+    add_push(sync_session_factory, ["phone-a"])
+    add_push(sync_session_factory, ["phone-b"])
+    with sync_session_factory() as db:
+        db.query(NotificationOutbox).filter(NotificationOutbox.id == 1).one().payload = "{not json"
+        db.commit()
+    worker = OutboxWorker(session_factory=async_session_factory, max_attempts=2, base_backoff_seconds=60)
+    now = datetime.now(timezone.utc)
+
+    assert asyncio.run(worker.drain_once(now)) == 2
+    assert statuses(sync_session_factory) == ["pending", "sent"]
+    with sync_session_factory() as db:
+        assert db.query(NotificationOutbox).first().last_error.startswith("Malformed payload")
+
+    asyncio.run(worker.drain_once(now + timedelta(minutes=2)))
+    assert statuses(sync_session_factory) == ["failed", "sent"]
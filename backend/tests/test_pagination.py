@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from app.models.family import FamilyConnection
+from app.models.health import VitalSigns
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that cursors are opaque but decode to the row position."""
+    cursor = encode_cursor(datetime(2024, 1, 1, 8, 30), 42)
+    assert "2024" not in cursor
+    assert decode_cursor(cursor) == (datetime(2024, 1, 1, 8, 30), 42)
+
+
+def test_vitals_pages_cover_every_row_once(db_client, auth_headers, sync_session_factory):
+    """Test that walking the cursors returns all rows newest first, ties broken by id."""
+    headers = auth_headers("asha@example.com")
+    auth_headers("ravi@example.com")
+    start = datetime(2024, 1, 1, 8, 0)
+    with sync_session_factory() as db:
+        for i in range(7):
+            db.add(VitalSigns(user_id=1, measurement_date=start + timedelta(hours=i // 2), heart_rate=60 + i))
+        db.add(VitalSigns(user_id=2, measurement_date=start, heart_rate=99))
+        db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = db_client.get("/api/v1/health/vitals", params=params, headers=headers).json()
+        seen += [(item["measurement_date"], item["id"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [row_id for _, row_id in seen] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_page_size_and_cursor_are_validated(db_client, auth_headers):
+    """Test the hard page-size maximum and malformed cursors."""
+    headers = auth_headers("asha@example.com")
+    assert db_client.get("/api/v1/medicines/", params={"limit": 10000}, headers=headers).status_code == 422
+    assert db_client.get("/api/v1/medicines/", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
+    response = db_client.get("/api/v1/medicines/", headers=headers)
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+def test_messages_page_is_decrypted(db_client, auth_headers, sync_session_factory):
+    """Test that the inbox returns plaintext for encrypted messages."""
+    asha = auth_headers("asha@example.com")
+    ravi = auth_headers("ravi@example.com")
+    with sync_session_factory() as db:
+        db.add(FamilyConnection(elder_id=1, caregiver_id=2, relationship_type="family", status="accepted"))
+        db.commit()
+    for text in ("Good morning", "Did you take your medicine?"):
+        db_client.post("/api/v1/family/messages", json={"receiver_id": 2, "content": text}, headers=asha)
+
+    page = db_client.get("/api/v1/family/messages", params={"unread_only": True}, headers=ravi).json()
+    assert sorted(item["content"] for item in page["items"]) == ["Did you take your medicine?", "Good morning"]
+    assert db_client.get("/api/v1/family/messages", headers=asha).json()["items"] == []
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.services.partitions import (
+    PartitionMaintainer,
+    PartitionedTable,
+    create_partition_statements,
+    expired_partitions,
+    missing_partitions,
+    partition_month,
+    purge_default_statement,
+)
+
+VITALS = PartitionedTable("vital_signs", "measurement_date", retention_months=12)
+NOW = datetime(2024, 11, 20, 23, 30, tzinfo=timezone.utc)
+
+
+def test_missing_partitions_cover_months_ahead_across_year_end():
+    """Test that the current month and the next ones are created once."""
+    existing = ["vital_signs_default", "vital_signs_y2024m11", "vital_signs_y2024m12"]
+    assert missing_partitions(VITALS, existing, NOW, months_ahead=3) == [date(2025, 1, 1), date(2025, 2, 1)]
+
+
+def test_default_partition_rows_get_their_month_inside_retention():
+    """Test that months stuck in the default partition get a partition only while retention keeps them."""
+    existing = ["vital_signs_default", "vital_signs_y2024m11"]
+    stuck = [date(2023, 10, 1), date(2024, 3, 1), date(2030, 1, 1)]
+    assert missing_partitions(VITALS, existing, NOW, months_ahead=0, default_months=stuck) == [date(2024, 3, 1)]
+    assert purge_default_statement(VITALS, date(2023, 11, 1)) == (
+        "DELETE FROM vital_signs_default WHERE measurement_date < '2023-11-01 00:00:00+00'"
+    )
+
+
+def test_expired_partitions_respect_retention():
+    """Test that only whole months before the retention window are dropped, never the default."""
+    existing = ["vital_signs_default", "vital_signs_y2023m10", "vital_signs_y2023m11", "vital_signs_y2024m11"]
+    assert expired_partitions(VITALS, existing, NOW) == ["vital_signs_y2023m10"]
+    keep_all = VITALS._replace(retention_months=0)
+    assert expired_partitions(keep_all, existing, NOW) == []
+
+
+def test_partition_statements_move_default_rows_before_attaching():
+    """Test the DDL for a month: build detached, take rows from the default partition, attach."""
+    create, move, attach = create_partition_statements(VITALS, date(2024, 12, 1))
+    assert create.startswith("CREATE TABLE vital_signs_y2024m12 (LIKE vital_signs")
+    assert "DELETE FROM vital_signs_default" in move
+    assert attach.endswith("FOR VALUES FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')")
+    assert partition_month("vital_signs", "vital_signs_y2024m12") == date(2024, 12, 1)
+    assert partition_month("vital_signs", "vital_signs_default") is None
+
+
+def test_maintenance_is_a_no_op_without_postgres(db_url):
+    """Test that SQLite databases are left alone."""
+    engine = create_engine(f"sqlite:///{db_url}")
+    maintainer = PartitionMaintainer(tables=[VITALS], months_ahead=3)
+    assert maintainer.run_once(engine, NOW) == {"created": [], "dropped": [], "purged": {}}
+    assert maintainer.stats()["last_run_at"] == NOW.isoformat()
+    engine.dispose()
+
+
+@pytest.mark.postgres
+def test_maintenance_moves_and_purges_default_rows(postgres_url):
+    """Test on PostgreSQL that default-partition rows are moved into new partitions or purged."""
+    engine = create_engine(postgres_url, poolclass=NullPool)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE vital_signs (id serial, measurement_date timestamptz NOT NULL) "
+            "PARTITION BY RANGE (measurement_date)"
+        ))
+        connection.execute(text("CREATE TABLE vital_signs_default PARTITION OF vital_signs DEFAULT"))
+        for day in ("2023-01-05", "2024-03-05", "2024-03-06", "2024-11-20"):
+            connection.execute(text("INSERT INTO vital_signs (measurement_date) VALUES (:d)"), {"d": f"{day} 08:00+00"})
+
+    maintainer = PartitionMaintainer(tables=[VITALS], months_ahead=1)
+    changes = maintainer.run_once(engine, NOW)
+    assert changes == {
+        "created": ["vital_signs_y2024m03", "vital_signs_y2024m11", "vital_signs_y2024m12"],
+        "dropped": [],
+        "purged": {"vital_signs_default": 1},
+    }
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM vital_signs_default")).scalar() == 0
+        assert connection.execute(text("SELECT count(*) FROM vital_signs_y2024m03")).scalar() == 2
+        assert connection.execute(text("SELECT count(*) FROM vital_signs")).scalar() == 3
+    assert maintainer.stats()["purged"] == 1
+    engine.dispose()
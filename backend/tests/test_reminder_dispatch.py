@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, time, timezone
+
+import pytest
+
+from app.models.medicine import Medicine, MedicineReminder
+from app.models.notification import DeviceToken
+from app.models.user import User, UserProfile
+from app.services.reminder_dispatch import ReminderDispatcher
+from app.services.reminder_scheduler import DueReminder, ScheduledReminder
+from app.utils import notifications
+from app.utils.notifications import LocalTransport, get_reminder_template
+
+FIRE_AT = datetime(2024, 1, 1, 2, 30, tzinfo=timezone.utc)
+
+
+class RecordingTransport(LocalTransport):
+    def __init__(self):
+        super().__init__()
+        self.bodies = []
+
+    def send_multicast(self, tokens, title, body, data):
+        self.bodies.append((body, len(tokens)))
+        return super().send_multicast(tokens, title, body, data)
+
+
+@pytest.fixture
+def transport():
+    transport = RecordingTransport()
+    notifications.set_push_transport(transport)
+    yield transport
+    notifications.set_push_transport(None)
+
+
+def seed(sync_session_factory, users):
+    """Create one user per (language, medicine, push enabled) with a device and reminder."""
+    due = []
+    with sync_session_factory() as db:
+        for i, (language, medicine, push) in enumerate(users, start=1):
+            db.add(User(id=i, email=f"elder{i}@example.com", hashed_password="x"))
+            db.add(UserProfile(user_id=i, first_name="A", last_name="B",
+                               preferred_language=language, push_notifications=push))
+            db.add(Medicine(id=i, user_id=i, name=medicine, dosage="500mg", frequency="daily",
+                            start_date=FIRE_AT))
+            db.add(MedicineReminder(id=i, user_id=i, medicine_id=i, reminder_time=time(8, 0)))
+            db.add(DeviceToken(user_id=i, token=f"phone-{i}"))
+            due.append(DueReminder(
+                ScheduledReminder(i, i, i, time(8, 0), frozenset(range(1, 8)), "Asia/Kolkata"),
+                FIRE_AT
+            ))
+        db.commit()
+    return due
+
+
+def test_dispatch_sends_one_multicast_per_payload(async_session_factory, sync_session_factory, transport):
+    """Test that reminders sharing medicine, dosage and language share one provider call."""
+    due = seed(sync_session_factory, [
+        ("en", "Metformin", True),
+        ("en-IN", "Metformin", True),
+        ("hi", "Metformin", True),
+        ("en", "Amlodipine", True),
+        ("en", "Metformin", False),
+    ])
+    dispatcher = ReminderDispatcher(session_factory=async_session_factory)
+    asyncio.run(dispatcher.dispatch(due))
+
+    assert sorted(transport.bodies) == [
+        ("It's time to take your Amlodipine (500mg)", 1),
+        ("It's time to take your Metformin (500mg)", 2),
+        ("आपकी Metformin (500mg) लेने का समय हो गया है", 1),
+    ]
+    assert dispatcher.stats()["provider_calls"] == 3
+    with sync_session_factory() as db:
+        reminders = db.query(MedicineReminder).order_by(MedicineReminder.id).all()
+        assert all(r.notification_sent for r in reminders)
+        assert all(r.updated_at is None for r in reminders)
+
+
+def test_reminder_templates_are_cached_per_locale():
+    """Test that locale variants share a template and unknown languages fall back to English."""
+    assert get_reminder_template("hi") is get_reminder_template("hi")
+    assert get_reminder_template("hi_IN").locale == "hi"
+    assert get_reminder_template("xx").locale == "en"
+    assert get_reminder_template(None).render("Metformin", "500mg")["data"]["action"] == "take_medicine"
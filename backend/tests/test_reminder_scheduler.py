@@ -0,0 +1,165 @@
+import asyncio
+import threading
+from datetime import datetime, time, timedelta, timezone
+
+from app.models.medicine import MedicineReminder
+from app.services import reminder_scheduler as scheduler_module
+from app.services.reminder_scheduler import (
+    ReminderScheduler,
+    ScheduledReminder,
+    next_fire_time,
+    parse_days_of_week,
+    run_scheduler,
+)
+
+UTC = timezone.utc
+
+
+def reminder(reminder_id=1, at=time(8, 0), days="1,2,3,4,5,6,7", tz="Asia/Kolkata", **extra):
+    return ScheduledReminder(
+        reminder_id=reminder_id,
+        user_id=extra.pop("user_id", 1),
+        medicine_id=1,
+        reminder_time=at,
+        days_of_week=parse_days_of_week(days),
+        timezone=tz,
+        **extra
+    )
+
+
+def test_next_fire_time_uses_user_timezone_and_weekdays():
+    """Test that 08:00 IST on a chosen weekday is computed in UTC."""
+    monday_noon = datetime(2024, 1, 1, 12, 0, tzinfo=UTC)  # a Monday
+    fire = next_fire_time(reminder(days="3"), monday_noon)
+    assert fire == datetime(2024, 1, 3, 2, 30, tzinfo=UTC)  # Wednesday 08:00 IST
+
+
+def test_pop_due_fires_only_due_and_reschedules():
+    """Test that only due reminders fire and each comes back for the next day."""
+    scheduler = ReminderScheduler()
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=UTC)
+    scheduler.upsert(reminder(1, time(8, 0), tz="UTC"), start)
+    scheduler.upsert(reminder(2, time(9, 0), tz="UTC"), start)
+
+    due = scheduler.pop_due(datetime(2024, 1, 1, 8, 0, tzinfo=UTC))
+    assert [d.reminder.reminder_id for d in due] == [1]
+    assert scheduler.next_fire_at() == datetime(2024, 1, 1, 9, 0, tzinfo=UTC)
+
+    due = scheduler.pop_due(datetime(2024, 1, 2, 8, 30, tzinfo=UTC))
+    assert sorted(d.reminder.reminder_id for d in due) == [1, 2]
+
+
+def test_updates_and_removals_are_incremental():
+    """Test that replaced or removed reminders never fire with stale state."""
+    scheduler = ReminderScheduler()
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=UTC)
+    scheduler.upsert(reminder(1, time(8, 0), tz="UTC"), start)
+    scheduler.upsert(reminder(1, time(10, 0), tz="UTC"), start)
+    scheduler.upsert(reminder(2, time(8, 0), tz="UTC"), start)
+    scheduler.remove(2)
+
+    assert scheduler.pop_due(datetime(2024, 1, 1, 9, 0, tzinfo=UTC)) == []
+    assert [d.reminder.reminder_id for d in scheduler.pop_due(datetime(2024, 1, 1, 10, 0, tzinfo=UTC))] == [1]
+
+
+def test_snooze_overrides_then_clears():
+    """Test that a snoozed reminder fires at snooze time, then resumes its schedule."""
+    scheduler = ReminderScheduler()
+    start = datetime(2024, 1, 1, 8, 1, tzinfo=UTC)
+    snooze = start + timedelta(minutes=10)
+    scheduler.upsert(reminder(1, time(8, 0), tz="UTC", snooze_until=snooze), start)
+
+    due = scheduler.pop_due(snooze)
+    assert [d.fire_at for d in due] == [snooze]
+    assert scheduler.next_fire_at() == datetime(2024, 1, 2, 8, 0, tzinfo=UTC)
+
+
+def test_reconcile_drops_deleted_reminders(sync_session_factory):
+    """Test that a hard-deleted reminder stops firing once a reconciling sync runs."""
+    with sync_session_factory() as db:
+        for reminder_id in (1, 2):
+            db.add(MedicineReminder(id=reminder_id, user_id=1, medicine_id=1, reminder_time=time(8, 0)))
+        db.commit()
+
+    scheduler = ReminderScheduler()
+    start = datetime.now(UTC)
+    with sync_session_factory() as db:
+        assert scheduler.load(db, start) == 2
+        db.query(MedicineReminder).filter_by(id=2).delete()
+        db.commit()
+        scheduler.sync_changes(db, start + timedelta(seconds=15))
+        assert len(scheduler) == 2  # deletions leave no changed row to read
+        scheduler.sync_changes(db, start + timedelta(seconds=30), reconcile=True)
+    assert len(scheduler) == 1
+    assert scheduler.stats()["reconciled"] == 1
+    assert [d.reminder.reminder_id for d in scheduler.pop_due(start + timedelta(days=1))] == [1]
+
+
+def test_watermark_follows_the_database_clock(sync_session_factory):
+    """Test that an app clock running ahead of the database does not hide new reminders."""
+    scheduler = ReminderScheduler()
+    skewed = datetime.now(UTC) + timedelta(hours=1)
+    with sync_session_factory() as db:
+        scheduler.load(db, skewed)
+        db.add(MedicineReminder(id=1, user_id=1, medicine_id=1, reminder_time=time(8, 0)))
+        db.commit()
+        assert scheduler.sync_changes(db, skewed + timedelta(seconds=15)) == 1
+    assert scheduler.watermark < skewed - timedelta(minutes=30)
+
+
+def test_reconcile_applies_missed_updates(sync_session_factory):
+    """Test that an update stamped before the sync window (a long transaction) is applied by the reconcile."""
+    with sync_session_factory() as db:
+        db.add(MedicineReminder(id=1, user_id=1, medicine_id=1, reminder_time=time(8, 0)))
+        db.commit()
+
+    scheduler = ReminderScheduler()
+    start = datetime.now(UTC)
+    with sync_session_factory() as db:
+        scheduler.load(db, start)
+        stamped = scheduler.watermark - timedelta(minutes=5)
+        db.query(MedicineReminder).update({
+            MedicineReminder.reminder_time: time(9, 0),
+            MedicineReminder.created_at: stamped,
+            MedicineReminder.updated_at: stamped
+        })
+        db.commit()
+        assert scheduler.sync_changes(db, start) == 0
+        assert scheduler.sync_changes(db, start, reconcile=True) == 1
+        assert scheduler.sync_changes(db, start, reconcile=True) == 0  # unchanged rows are skipped
+    assert scheduler.stats()["reconciled"] == 1
+    assert scheduler.next_fire_at().time() == time(9, 0)
+
+
+def test_run_scheduler_applies_changes_on_the_loop(sync_session_factory, monkeypatch):
+    """Test that only the database read leaves the event loop thread."""
+    with sync_session_factory() as db:
+        db.add(MedicineReminder(id=1, user_id=1, medicine_id=1, reminder_time=time(8, 0)))
+        db.commit()
+    monkeypatch.setattr(scheduler_module, "SessionLocal", sync_session_factory)
+    scheduler = ReminderScheduler()
+    read_threads, apply_threads = [], []
+    read_changes, apply_changes = scheduler_module.read_changes, scheduler.apply_changes
+
+    def read(*args, **kwargs):
+        read_threads.append(threading.get_ident())
+        return read_changes(*args, **kwargs)
+
+    def apply(*args, **kwargs):
+        apply_threads.append(threading.get_ident())
+        return apply_changes(*args, **kwargs)
+
+    monkeypatch.setattr(scheduler_module, "read_changes", read)
+    monkeypatch.setattr(scheduler, "apply_changes", apply)
+
+    async def go():
+        task = asyncio.create_task(run_scheduler(scheduler, tick_seconds=0.01, sync_seconds=0.01))
+        while len(apply_threads) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(go())
+    assert set(apply_threads) == {loop_thread}
+    assert loop_thread not in read_threads
+    assert len(scheduler) == 1
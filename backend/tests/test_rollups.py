@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+
+from app.models.health import VitalRollupDaily, VitalRollupHourly, VitalSigns
+from app.services.rollups import DAILY, HOURLY, choose_resolution, rebuild
+
+
+def rollups(db, model, metric="systolic_bp"):
+    rows = db.query(model).filter_by(metric=metric).order_by(model.user_id, model.bucket_start).all()
+    return [(row.bucket_start.hour, row.sample_count, row.value_sum, row.value_min, row.value_max) for row in rows]
+
+
+def test_bulk_insert_updates_rollups_incrementally(db_client, auth_headers, sync_session_factory):
+    """Test that each upload adds to existing buckets and skipped duplicates add nothing."""
+    headers = auth_headers("asha@example.com")
+    first = [{"measurement_date": f"2024-01-01T08:{m:02d}:00", "device_name": "Omron", "systolic_bp": bp}
+             for m, bp in ((0, 120), (30, 140))]
+    second = [{"measurement_date": "2024-01-01T09:15:00", "device_name": "Omron", "systolic_bp": 110},
+              first[0]]
+    db_client.post("/api/v1/health/vitals/bulk", json=first, headers=headers)
+    db_client.post("/api/v1/health/vitals/bulk", json=second, headers=headers)
+
+    with sync_session_factory() as db:
+        assert rollups(db, VitalRollupHourly) == [(8, 2, 260.0, 120.0, 140.0), (9, 1, 110.0, 110.0, 110.0)]
+        assert rollups(db, VitalRollupDaily) == [(0, 3, 370.0, 110.0, 140.0)]
+        assert rollups(db, VitalRollupDaily, "heart_rate") == []
+
+
+def test_correction_and_delete_recompute_buckets(sync_session_factory):
+    """Test that ORM corrections rebuild min/max from the remaining readings."""
+    with sync_session_factory() as db:
+        high = VitalSigns(user_id=1, measurement_date=datetime(2024, 1, 1, 8, 5), systolic_bp=180)
+        normal = VitalSigns(user_id=1, measurement_date=datetime(2024, 1, 1, 8, 40), systolic_bp=120)
+        db.add_all([high, normal])
+        db.commit()
+        assert rollups(db, VitalRollupHourly) == [(8, 2, 300.0, 120.0, 180.0)]
+
+        high.systolic_bp = 130
+        db.commit()
+        assert rollups(db, VitalRollupHourly) == [(8, 2, 250.0, 120.0, 130.0)]
+
+        normal.measurement_date = datetime(2024, 1, 1, 10, 0)
+        db.commit()
+        assert rollups(db, VitalRollupHourly) == [(8, 1, 130.0, 130.0, 130.0), (10, 1, 120.0, 120.0, 120.0)]
+
+        db.delete(high)
+        db.commit()
+        assert rollups(db, VitalRollupHourly) == [(10, 1, 120.0, 120.0, 120.0)]
+        assert rollups(db, VitalRollupDaily) == [(0, 1, 120.0, 120.0, 120.0)]
+
+
+def test_rebuild_matches_incremental(db_url, sync_session_factory):
+    """Test that a full rebuild reproduces the incrementally maintained rollups."""
+    with sync_session_factory() as db:
+        for i in range(50):
+            db.add(VitalSigns(user_id=1 + i % 2, measurement_date=datetime(2024, 1, 1) + timedelta(minutes=97 * i),
+                              heart_rate=60 + i % 17, weight=70.5))
+        db.commit()
+        before = rollups(db, VitalRollupHourly, "heart_rate"), rollups(db, VitalRollupDaily, "weight")
+
+    engine = create_engine(f"sqlite:///{db_url}")
+    with engine.begin() as connection:
+        assert rebuild(connection, batch_users=1) == 2
+    engine.dispose()
+    with sync_session_factory() as db:
+        assert (rollups(db, VitalRollupHourly, "heart_rate"), rollups(db, VitalRollupDaily, "weight")) == before
+
+
+def test_resolution_fits_point_budget():
+    """Test hourly for short windows, daily for long ones, merged days beyond that."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert choose_resolution(start, start + timedelta(days=2), 200) == (HOURLY, 1)
+    assert choose_resolution(start, start + timedelta(days=90), 200) == (DAILY, 1)
+    assert choose_resolution(start, start + timedelta(days=365), 100) == (DAILY, 4)
+
+
+def test_trend_endpoint(db_client, auth_headers):
+    """Test that the trend endpoint reads daily rollups for a 90-day window."""
+    headers = auth_headers("asha@example.com")
+    readings = [{"measurement_date": f"2024-03-{day:02d}T0{hour}:00:00", "device_name": "Omron",
+                 "systolic_bp": 120 + day + hour}
+                for day in (1, 2) for hour in (7, 8)]
+    db_client.post("/api/v1/health/vitals/bulk", json=readings, headers=headers)
+
+    response = db_client.get("/api/v1/health/vitals/trend", headers=headers, params={
+        "metric": "systolic_bp", "start": "2024-01-01T00:00:00Z", "end": "2024-03-31T00:00:00Z"
+    })
+    body = response.json()
+    assert body["resolution"] == "day"
+    assert [(p["count"], p["mean"], p["min"], p["max"]) for p in body["points"]] == [
+        (2, 128.5, 128.0, 129.0), (2, 129.5, 129.0, 130.0)
+    ]
+    hourly = db_client.get("/api/v1/health/vitals/trend", headers=headers, params={
+        "metric": "systolic_bp", "start": "2024-03-01T00:00:00Z", "end": "2024-03-02T00:00:00Z"
+    }).json()
+    assert hourly["resolution"] == "hour"
+    assert len(hourly["points"]) == 2
+    assert db_client.get("/api/v1/health/vitals/trend", headers=headers,
+                         params={"metric": "mood"}).status_code == 422
@@ -0,0 +1,57 @@
+import pytest
+
+from app.utils import security
+from app.utils.security import conversation_key_id, decrypt_message, encrypt_message
+
+
+def test_envelope_round_trip_reuses_data_key():
+    """Test that envelope messages in one conversation share a wrapped data key."""
+    key_id = conversation_key_id(7, 3)
+    assert key_id == conversation_key_id(3, 7)
+
+    first = encrypt_message("Took my BP tablet", key_id=key_id)
+    second = encrypt_message("Feeling better today", key_id=key_id)
+    assert "salt" not in first
+    assert first["wrapped_key"] == second["wrapped_key"]
+    assert decrypt_message(first) == "Took my BP tablet"
+    assert decrypt_message(second) == "Feeling better today"
+
+
+def test_envelope_decrypts_after_key_cache_expiry():
+    """Test that the wrapped key alone is enough once the caches are cold."""
+    encrypted = encrypt_message("Doctor visit at 5pm", key_id="user:1")
+    security._encryption_keys.clear()
+    security._decryption_keys.clear()
+    assert decrypt_message(encrypted) == "Doctor visit at 5pm"
+
+
+def test_envelope_rejects_wrong_master_password():
+    """Test that a cached data key isn't handed out for another master key."""
+    encrypted = encrypt_message("private", password="master-one", key_id="user:2")
+    with pytest.raises(Exception):
+        decrypt_message(encrypted, password="master-two")
+
+
+def test_legacy_salt_format_still_decrypts():
+    """Test backward compatibility with salt-based messages."""
+    encrypted = encrypt_message("legacy message")
+    assert "salt" in encrypted
+    assert decrypt_message(encrypted) == "legacy message"
+
+
+def test_decrypt_messages_keeps_order_and_reports_errors():
+    """Test batch decryption across formats with a per-item failure."""
+    from app.utils.security import decrypt_messages
+
+    batch = [
+        encrypt_message("one", key_id="conversation:1:2"),
+        encrypt_message("two"),
+        {"encrypted_message": "garbage", "wrapped_key": "not-a-key"},
+        encrypt_message("four", key_id="conversation:1:2"),
+        {"unexpected": True},
+    ]
+    results = decrypt_messages(batch, chunk_size=2)
+
+    assert [r.plaintext for r in results] == ["one", "two", None, "four", None]
+    assert results[2].error and results[4].error
+    assert results[0].error is None
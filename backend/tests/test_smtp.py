@@ -0,0 +1,57 @@
+import asyncio
+import socket
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from app.utils.notifications import build_email_message
+from app.utils.smtp import SMTPPool
+
+
+class SinkHandler:
+    """Collects messages and counts the SMTP sessions that delivered them."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_sink():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = SinkHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+def test_send_many_reuses_pooled_connections(smtp_sink):
+    """Test that a batch is spread over at most pool_size persistent connections."""
+    handler, port = smtp_sink
+    messages = [
+        build_email_message(f"family{i}@example.com", "Daily digest", f"Digest {i}")
+        for i in range(25)
+    ]
+
+    async def scenario():
+        pool = SMTPPool("127.0.0.1", port, start_tls=False, pool_size=3)
+        results = await pool.send_many(messages)
+        await pool.send(build_email_message("one@example.com", "Single", "Hello"))
+        stats = pool.stats()
+        await pool.close()
+        return results, stats
+
+    results, stats = asyncio.run(scenario())
+    assert results == [None] * 25
+    assert len(handler.messages) == 26
+    assert stats["connections_opened"] <= 3
+    assert len(handler.sessions) <= 3
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import create_engine, update
+
+from app.config import settings
+from app.models.health import VitalSigns
+from app.services import vitals
+from app.services.vitals import backfill_canonical
+
+
+def reading(minute, device="Omron", **values):
+    return {"measurement_date": f"2024-01-01T08:{minute:02d}:00", "device_name": device,
+            "systolic_bp": 120 + minute, "diastolic_bp": 80, **values}
+
+
+def test_bulk_json_array_deduplicates(db_client, auth_headers, sync_session_factory):
+    """Test that repeats within an upload and across uploads are stored once."""
+    headers = auth_headers("asha@example.com")
+    batch = [reading(0), reading(1), reading(1), reading(2, device=None), reading(2, device=None)]
+    response = db_client.post("/api/v1/health/vitals/bulk", json=batch, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"received": 5, "inserted": 4, "duplicates": 1}
+
+    response = db_client.post("/api/v1/health/vitals/bulk", json=[reading(1), reading(3)], headers=headers)
+    assert response.json() == {"received": 2, "inserted": 1, "duplicates": 1}
+
+    with sync_session_factory() as db:
+        rows = db.query(VitalSigns).order_by(VitalSigns.id).all()
+        assert [row.systolic_bp for row in rows] == [120, 121, 122, 122, 123]
+        assert {row.temperature_unit for row in rows} == {"C"}
+
+
+def test_bulk_ndjson_stream(db_client, auth_headers, sync_session_factory):
+    """Test that NDJSON uploads are parsed line by line, ignoring blank lines."""
+    headers = auth_headers("asha@example.com")
+    body = "\n".join(json.dumps(reading(minute)) for minute in range(3)) + "\n\n"
+    response = db_client.post("/api/v1/health/vitals/bulk", content=body,
+                              headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.json() == {"received": 3, "inserted": 3, "duplicates": 0}
+    with sync_session_factory() as db:
+        assert db.query(VitalSigns).filter_by(user_id=1).count() == 3
+
+
+def test_invalid_reading_rejects_whole_upload(db_client, auth_headers, sync_session_factory):
+    """Test that one invalid row stores nothing and reports where it is."""
+    headers = auth_headers("asha@example.com")
+    body = "\n".join([json.dumps(reading(0)), json.dumps(reading(1, heart_rate="fast"))])
+    response = db_client.post("/api/v1/health/vitals/bulk", content=body,
+                              headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", 2, "heart_rate"]]
+
+    response = db_client.post("/api/v1/health/vitals/bulk", json=[reading(0), {"systolic_bp": 1}], headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "measurement_date"]
+    with sync_session_factory() as db:
+        assert db.query(VitalSigns).count() == 0
+
+
+def test_bulk_row_limit(db_client, auth_headers, monkeypatch):
+    """Test that uploads over vitals_bulk_max_rows are refused."""
+    headers = auth_headers("asha@example.com")
+    monkeypatch.setattr(settings, "vitals_bulk_max_rows", 2)
+    response = db_client.post("/api/v1/health/vitals/bulk", json=[reading(m) for m in range(3)], headers=headers)
+    assert response.status_code == 413
+
+
+def test_single_post_returns_existing_device_reading(db_client, auth_headers):
+    """Test that resending a device reading through the single endpoint does not duplicate it."""
+    headers = auth_headers("asha@example.com")
+    first = db_client.post("/api/v1/health/vitals", json=reading(0), headers=headers)
+    assert first.status_code == 201
+    again = db_client.post("/api/v1/health/vitals", json=reading(0), headers=headers)
+    assert again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+
+
+def test_writes_store_canonical_units_and_bmi(db_client, auth_headers, sync_session_factory):
+    """Test that readings in other units get canonical columns and a server-side BMI."""
+    headers = auth_headers("asha@example.com")
+    body = db_client.post("/api/v1/health/vitals", headers=headers, json={
+        "measurement_date": "2024-01-01T08:00:00", "temperature": 98.6, "temperature_unit": "F",
+        "weight": 154.0, "weight_unit": "lb", "height": 5.5, "height_unit": "ft", "bmi": 99.0,
+        "blood_glucose": 5.5, "glucose_unit": "mmol/L"
+    }).json()
+    assert (body["temperature_c"], body["weight_kg"], body["height_cm"], body["glucose_mg_dl"]) == (
+        37.0, 69.853, 167.64, 99.086
+    )
+    assert body["bmi"] == 24.9
+
+    response = db_client.post("/api/v1/health/vitals/bulk", json=[reading(0, weight_unit="stone")], headers=headers)
+    assert response.status_code == 422
+
+    with sync_session_factory() as db:
+        vital = db.query(VitalSigns).one()
+        vital.weight, vital.weight_unit = 70.0, "kg"
+        db.commit()
+        assert (vital.weight_kg, vital.bmi) == (70.0, 24.9)
+
+
+def test_canonical_backfill(db_url, sync_session_factory):
+    """Test that the backfill converts rows written before the canonical columns existed."""
+    with sync_session_factory() as db:
+        for i, (weight, unit) in enumerate(((176.0, "lb"), (80.0, "kg"), (None, None))):
+            db.add(VitalSigns(user_id=1, measurement_date=datetime(2024, 1, 1, i), weight=weight,
+                              weight_unit=unit, height=180.0, height_unit="cm", bmi=21.0))
+        db.commit()
+        db.execute(update(VitalSigns).values(weight_kg=None, height_cm=None, bmi=21.0))
+        db.commit()
+
+    engine = create_engine(f"sqlite:///{db_url}")
+    with engine.connect() as connection:
+        assert backfill_canonical(connection, batch_size=2) == {"scanned": 3, "updated": 3}
+        assert backfill_canonical(connection, batch_size=2)["updated"] == 0
+    engine.dispose()
+    with sync_session_factory() as db:
+        rows = db.query(VitalSigns).order_by(VitalSigns.id).all()
+        assert [(row.weight_kg, row.height_cm, row.bmi) for row in rows] == [
+            (79.832, 180.0, 24.6), (80.0, 180.0, 24.7), (None, 180.0, 21.0)
+        ]
+
+
+def test_concurrent_device_reading_returns_winner(db_client, auth_headers, monkeypatch):
+    """Test that losing the insert race to an identical device reading returns the stored row, not a 500."""
+    headers = auth_headers("asha@example.com")
+    first = db_client.post("/api/v1/health/vitals", json=reading(0), headers=headers).json()
+    checks = []
+
+    async def racing_check(db, vital):
+        checks.append(vital.measurement_date)
+        return None if len(checks) == 1 else await device_reading(db, vital)
+
+    device_reading = vitals._device_reading
+    monkeypatch.setattr(vitals, "_device_reading", racing_check)
+    again = db_client.post("/api/v1/health/vitals", json=reading(0), headers=headers)
+    assert again.status_code == 200
+    assert again.json()["id"] == first["id"]
+    assert len(checks) == 2